@@ -1,22 +1,29 @@
 """
 Excel Refresh Manager CLI
-사용법: python cli.py [명령어]
+사용법: python cli.py [--local | --remote] [명령어]
 
 명령어:
     list        파일 목록 조회
     add <경로>  파일 추가
+    add-bulk <경로|패턴|@목록파일>...  여러 파일 한 번에 추가
     delete <id> 파일 삭제
     settings    현재 설정 조회
     set <refresh> <inter>  설정 변경
     refresh     Excel 리프레시 실행
     init        DB 초기화
     status      API 서버 상태 확인
+
+실행 방식:
+    API 서버가 실행 중이면 서버로 요청하고, 없으면 DB와 새로고침 엔진을 직접 사용 (로컬 모드)
+    --local / --remote 또는 CLI_MODE=local|remote 환경 변수로 고정
+    명령 실행에 필요한 모듈만 import (list / add 는 db_manager만 사용)
 """
 
+import os
 import sys
-import requests
 
-API_URL = "http://127.0.0.1:8000"
+API_URL = os.environ.get("EXCEL_REFRESH_API", "http://127.0.0.1:8000")
+REQUEST_TIMEOUT = 30
 
 
 def print_help():
@@ -24,11 +31,13 @@ def print_help():
 Excel Refresh Manager CLI
 =========================
 
-사용법: python cli.py [명령어]
+사용법: python cli.py [--local | --remote] [명령어]
 
 명령어:
     list              파일 목록 조회
     add <경로>        파일 추가
+    add-bulk <...>    여러 파일 한 번에 추가
+                      (경로, 글롭 패턴, @목록파일 / --skip-missing: 없는 파일 제외)
     delete <id>       파일 삭제
     settings          현재 설정 조회
     set <r> <i>       설정 변경 (r: 리프레시 대기, i: 파일간 대기)
@@ -37,33 +46,190 @@ Excel Refresh Manager CLI
     status            API 서버 상태 확인
     help              도움말 표시
 
+옵션:
+    --local           API 서버 없이 DB / 새로고침 엔진 직접 사용
+    --remote          API 서버로만 요청 (서버가 없으면 오류)
+                      (지정하지 않으면 서버가 실행 중인지 확인해 자동 선택)
+
 예시:
     python cli.py list
     python cli.py add "C:\\data\\report.xlsx"
+    python cli.py add-bulk "C:\\data\\2024\\**\\*.xlsx" --skip-missing
+    python cli.py add-bulk @paths.txt
     python cli.py delete 3
     python cli.py set 10 5
     python cli.py refresh
+    python cli.py --local list
 """)
 
 
-def api_request(method, endpoint, json=None):
-    """API 요청 공통 함수"""
+def server_running(url=API_URL, timeout=0.3):
+    """API 서버 포트에 연결되는지만 확인 (requests를 import 하지 않음)"""
+    import socket
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
     try:
-        url = f"{API_URL}{endpoint}"
-        if method == "GET":
-            response = requests.get(url)
-        elif method == "POST":
-            response = requests.post(url, json=json)
-        elif method == "DELETE":
-            response = requests.delete(url)
-        elif method == "PUT":
-            response = requests.put(url, json=json)
-
-        return response.json(), response.status_code
-    except requests.exceptions.ConnectionError:
-        print("오류: 서버에 연결할 수 없습니다.")
-        print(f"서버가 {API_URL} 에서 실행 중인지 확인하세요.")
-        sys.exit(1)
+        with socket.create_connection((parts.hostname, parts.port or 80), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class RemoteClient:
+    """API 서버로 요청 (연결 재사용을 위해 requests.Session 사용)"""
+
+    mode = "remote"
+
+    def __init__(self, base_url=API_URL):
+        import requests
+
+        self.base_url = base_url
+        self.session = requests.Session()
+        self._connection_error = requests.exceptions.ConnectionError
+
+    def request(self, method, endpoint, json=None):
+        try:
+            response = self.session.request(method, f"{self.base_url}{endpoint}", json=json, timeout=REQUEST_TIMEOUT)
+            return response.json(), response.status_code
+        except self._connection_error:
+            print("오류: 서버에 연결할 수 없습니다.")
+            print(f"서버가 {self.base_url} 에서 실행 중인지 확인하세요. (서버 없이 실행: python cli.py --local ...)")
+            sys.exit(1)
+
+
+class LocalClient:
+    """
+    API 서버 없이 같은 요청을 db_manager / 새로고침 엔진으로 직접 처리
+    응답 형식(JSON, 상태 코드)은 API와 같게 맞춤
+    """
+
+    mode = "local"
+
+    def __init__(self):
+        from src.database import db_manager
+
+        self.db = db_manager
+        db_manager.create_table_if_not_exists()
+
+    def request(self, method, endpoint, json=None):
+        if method == "DELETE" and endpoint.startswith("/files/"):
+            return self.delete_file(endpoint.rsplit("/", 1)[1])
+        handler = {
+            ("GET", "/api"): self.status,
+            ("GET", "/files"): self.get_files,
+            ("POST", "/files"): self.add_file,
+            ("POST", "/files/bulk"): self.add_files_bulk,
+            ("GET", "/settings"): self.get_settings,
+            ("POST", "/settings"): self.update_settings,
+            ("POST", "/run-refresh"): self.run_refresh,
+            ("POST", "/init-db"): self.init_database,
+        }.get((method, endpoint))
+        if handler is None:
+            return {"detail": f"로컬 모드에서 지원하지 않는 요청입니다: {method} {endpoint}"}, 404
+        return handler(json) if json is not None else handler()
+
+    def status(self):
+        return {"message": f"서버 없음 - 로컬 모드 (DB: {self.db.DB_FILE})"}, 200
+
+    def get_files(self):
+        return self.db.get_paths_detailed(), 200
+
+    def add_file(self, body):
+        try:
+            self.db.add_path(body["path"])
+        except Exception as e:
+            return {"detail": str(e)}, 400
+        return {"message": "File path added successfully.", "path": body["path"]}, 200
+
+    def add_files_bulk(self, body):
+        paths = list(body.get("paths", [])) + self.db.expand_globs(body.get("globs", []))
+        if not paths:
+            return {"detail": "No paths given and no files matched the glob patterns."}, 400
+        report = self.db.add_paths(paths, skip_missing=body.get("skip_missing", False))
+        summary = {}
+        for item in report:
+            summary[item["status"]] = summary.get(item["status"], 0) + 1
+        return {"message": f"{summary.get('added', 0)} file path(s) added.", "summary": summary, "results": report}, 200
+
+    def delete_file(self, file_id):
+        if not str(file_id).isdigit():
+            return {"detail": f"잘못된 파일 ID: {file_id}"}, 422
+        self.db.delete_path_by_id(int(file_id))
+        return {"message": f"File ID {file_id} deleted successfully."}, 200
+
+    def _settings(self, updates=None):
+        # pydantic 모델은 설정을 다룰 때만 import (API와 같은 기본값 / 검증)
+        from src.api.models import RefreshSettings
+
+        return RefreshSettings(**{**self.db.load_settings(), **(updates or {})})
+
+    def get_settings(self):
+        return self._settings().model_dump(), 200
+
+    def update_settings(self, body):
+        try:
+            settings = self._settings(body)
+        except ValueError as e:
+            return {"detail": str(e)}, 422
+        self.db.save_settings(settings.model_dump())
+        return {"message": "Settings updated successfully.", "new_settings": settings.model_dump()}, 200
+
+    def run_refresh(self, body=None):
+        """로컬 모드에서는 새로고침이 끝날 때까지 기다림 (진행 로그는 콘솔에 표시)"""
+        from src.utils.logging_setup import setup_logging, job_context, new_job_id
+
+        settings = self._settings()
+        setup_logging()
+        job_id = new_job_id()
+        try:
+            from src.database.config import EXPORT_DIR
+            from src.excel import excelrefresh_time_delay as excel_refresher
+
+            with job_context(job_id):
+                report = excel_refresher.run_all_refreshes(
+                    refresh_delay=settings.refresh_delay,
+                    inter_file_delay=settings.inter_file_delay,
+                    export_dir=EXPORT_DIR if settings.export_parquet else None,
+                    workers=settings.workers
+                )
+        except Exception as e:
+            return {"detail": f"An error occurred during the refresh process: {e}"}, 500
+        if not report:
+            return {"message": "새로고침할 파일이 없습니다.", "job_id": job_id}, 200
+        failed = sum(1 for item in report["files"] if not item["ok"])
+        message = (f"{len(report['files'])}개 파일 완료 (실패/미실행 {failed}개) - "
+                   f"예상 {report['predicted_makespan_sec']}초 / 실제 {report['actual_makespan_sec']}초")
+        return {"message": message, "job_id": job_id}, 200
+
+    def init_database(self):
+        from src.database import place
+
+        try:
+            place.populate_db_from_initial_list()
+        except Exception as e:
+            return {"detail": f"Failed to initialize database: {e}"}, 500
+        return {"message": "Database successfully populated with the initial file list."}, 200
+
+
+CLI_MODE = os.environ.get("CLI_MODE", "auto")
+_client = None
+
+
+def get_client():
+    """auto: 서버가 실행 중이면 RemoteClient, 아니면 LocalClient (첫 요청 때 한 번만 결정)"""
+    global _client
+    if _client is None:
+        mode = CLI_MODE
+        if mode == "auto":
+            mode = "remote" if server_running() else "local"
+        _client = RemoteClient() if mode == "remote" else LocalClient()
+    return _client
+
+
+def api_request(method, endpoint, json=None):
+    """API 요청 공통 함수 (로컬 모드에서는 같은 요청을 직접 처리)"""
+    return get_client().request(method, endpoint, json)
 
 
 def cmd_status():
@@ -95,6 +261,34 @@ def cmd_add(path):
         print(f"오류: {data.get('detail', '추가 실패')}")
 
 
+def cmd_add_bulk(args):
+    """여러 파일 한 번에 추가 (글롭 패턴은 서버에서 확장)"""
+    paths, globs = [], []
+    skip_missing = "--skip-missing" in args
+    for arg in args:
+        if arg == "--skip-missing":
+            continue
+        if arg.startswith("@"):
+            with open(arg[1:], encoding="utf-8") as f:
+                paths.extend(line.strip() for line in f if line.strip())
+        elif any(c in arg for c in "*?["):
+            globs.append(arg)
+        else:
+            paths.append(arg)
+
+    data, status = api_request("POST", "/files/bulk", {"paths": paths, "globs": globs, "skip_missing": skip_missing})
+    if status != 200:
+        print(f"오류: {data.get('detail', '추가 실패')}")
+        return
+
+    labels = {"added": "추가", "exists": "이미 등록", "duplicate": "중복", "missing": "파일 없음"}
+    for item in data["results"]:
+        mark = "" if item["on_disk"] else " (디스크에 없음)"
+        print(f"  [{labels.get(item['status'], item['status'])}] {item['path']}{mark}")
+    print("-" * 60)
+    print("  " + ", ".join(f"{labels.get(k, k)} {v}개" for k, v in data["summary"].items()))
+
+
 def cmd_delete(file_id):
     """파일 삭제"""
     data, status = api_request("DELETE", f"/files/{file_id}")
@@ -146,6 +340,12 @@ def cmd_init():
 
 
 def main():
+    global CLI_MODE
+    for flag in ("--local", "--remote"):
+        if flag in sys.argv:
+            sys.argv.remove(flag)
+            CLI_MODE = flag[2:]
+
     if len(sys.argv) < 2:
         print_help()
         return
@@ -163,6 +363,11 @@ def main():
             print("사용법: python cli.py add <파일경로>")
             return
         cmd_add(sys.argv[2])
+    elif cmd == "add-bulk":
+        if len(sys.argv) < 3:
+            print("사용법: python cli.py add-bulk <경로|패턴|@목록파일>... [--skip-missing]")
+            return
+        cmd_add_bulk(sys.argv[2:])
     elif cmd == "delete":
         if len(sys.argv) < 3:
             print("사용법: python cli.py delete <파일ID>")
@@ -1,39 +1,61 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
+import logging
 
-from src.database import db_manager
-from src.api.file_routes import router as file_router
-from src.api.refresh_routes import router as refresh_router
-from src.chatbot.router import router as chatbot_router
+# FastAPI / 라우터 / OCR 모듈은 앱을 만들 때 import (시작 메뉴만 표시할 때는 불러오지 않음)
+
+logger = logging.getLogger(__name__)
 
 
 # --- Event Handlers ---
 @asynccontextmanager
-async def lifespan(_app: FastAPI):
+async def lifespan(_app):
     """Ensure the database and table exist on application startup."""
+    from src.database import db_manager
+
     db_manager.create_table_if_not_exists()
-    print("FastAPI server started. Database is ready.")
+    if _app.state.include_ui:
+        from src.chatbot import chatbot_routes
+        chatbot_routes.startup()
+    logger.info("FastAPI server started. Database is ready.")
     yield
+    if _app.state.include_ui:
+        from src.chatbot import chatbot_routes
+        chatbot_routes.shutdown()
 
 
 # --- App Factory ---
-def create_app(include_ui: bool = True) -> FastAPI:
+def create_app(include_ui: bool = True):
     """FastAPI 앱 생성"""
+    from fastapi import FastAPI
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.responses import FileResponse, Response
+    from src.api.file_routes import router as file_router
+    from src.api.refresh_routes import router as refresh_router
+    from src.api.admin_routes import router as admin_router
+    from src.utils import metrics
+    from src.utils.logging_setup import setup_logging
+    from src.utils.profiling import ProfilingMiddleware
+
+    setup_logging()
     app = FastAPI(
         title="Excel Refresh API",
         description="An API to manage a list of Excel files and trigger a refresh process.",
         version="1.0.0",
         lifespan=lifespan,
     )
+    app.state.include_ui = include_ui
+    # X-Profile 헤더 / ?_profile= 요청만 프로파일링 (결과는 /admin/profiles)
+    app.add_middleware(ProfilingMiddleware)
 
     # API Routers
     app.include_router(file_router)
     app.include_router(refresh_router)
+    app.include_router(admin_router)
 
     if include_ui:
         # Static files & UI
+        from src.chatbot.router import router as chatbot_router
+
         app.mount("/static", StaticFiles(directory="static"), name="static")
         app.include_router(chatbot_router)
 
@@ -45,11 +67,20 @@ def create_app(include_ui: bool = True) -> FastAPI:
     async def read_root():
         return {"status": "ok", "message": "Excel Refresh API is running"}
 
+    @app.get("/metrics", summary="Prometheus metrics")
+    async def read_metrics():
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
     return app
 
 
-# Default app instance (for uvicorn main:app)
-app = create_app(include_ui=True)
+def __getattr__(name):
+    """Default app instance (for uvicorn main:app), created on first access"""
+    if name == "app":
+        global app
+        app = create_app(include_ui=True)
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def show_startup_menu() -> str:
@@ -69,11 +100,11 @@ def show_startup_menu() -> str:
 
 
 if __name__ == "__main__":
-    import uvicorn
-
     choice = show_startup_menu()
 
     if choice == "1":
+        import uvicorn
+
         print("\nAPI 서버를 시작합니다...")
         print("API 문서: http://127.0.0.1:8000/docs")
         api_only_app = create_app(include_ui=False)
@@ -85,9 +116,11 @@ if __name__ == "__main__":
         run()
 
     elif choice == "3":
+        import uvicorn
+
         print("\n웹 UI 서버를 시작합니다...")
         print("브라우저에서 http://127.0.0.1:8000 접속하세요")
-        uvicorn.run(app, host="127.0.0.1", port=8000)
+        uvicorn.run(create_app(include_ui=True), host="127.0.0.1", port=8000)
 
     elif choice == "0":
         print("프로그램을 종료합니다.")
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Header, Request
+from typing import Optional
+from src.api import routes
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def _client_host(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+@router.get("/profiles", summary="List Stored Profiles")
+async def list_profiles(request: Request, x_admin_token: Optional[str] = Header(None)):
+    return await routes.list_profiles(x_admin_token, _client_host(request))
+
+
+@router.get("/profiles/{profile_id}", summary="Profile Metadata")
+async def get_profile(request: Request, profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    return await routes.get_profile(profile_id, x_admin_token, _client_host(request))
+
+
+@router.get("/profiles/{profile_id}/{name}", summary="Download a Profile File")
+async def download_profile_file(request: Request, profile_id: str, name: str, x_admin_token: Optional[str] = Header(None)):
+    return await routes.download_profile_file(profile_id, name, x_admin_token, _client_host(request))
+
+
+@router.delete("/profiles/{profile_id}", summary="Delete a Profile")
+async def delete_profile(request: Request, profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    return await routes.delete_profile(profile_id, x_admin_token, _client_host(request))
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
-from typing import List
-from src.api.models import FilePathWithId, FilePath
+from typing import List, Optional
+from src.api.models import FilePathWithId, FilePath, BulkFilePaths, PathSettingsUpdate, DependencyUpdate
 from src.api import routes
 
 router = APIRouter(prefix="/files", tags=["Files"])
@@ -16,11 +16,41 @@ async def add_file(file: FilePath):
     return await routes.add_file(file)
 
 
+@router.post("/bulk", summary="Add Many Files (Paths or Glob Patterns)")
+async def add_files_bulk(files: BulkFilePaths):
+    return await routes.add_files_bulk(files)
+
+
+@router.get("/groups", summary="List File Groups")
+async def get_groups():
+    return await routes.get_groups()
+
+
+@router.get("/browse", summary="Browse Folders and Excel Files (Paged)")
+async def browse_folder(path: Optional[str] = None, offset: int = 0, limit: int = 200, prefix: Optional[str] = None):
+    return await routes.browse_folder(path, offset, limit, prefix)
+
+
+@router.get("/browse/search", summary="Search Excel Files Recursively")
+async def search_excel_files(path: str, query: Optional[str] = None, max_results: int = 500, max_depth: Optional[int] = None):
+    return await routes.search_excel_files(path, query, max_results, max_depth)
+
+
 @router.put("/{file_id}", summary="Update a File Path")
 async def update_file(file_id: int, file: FilePath):
     return await routes.update_file(file_id, file)
 
 
+@router.patch("/{file_id}/settings", summary="Update Per-File Settings")
+async def update_file_settings(file_id: int, update: PathSettingsUpdate):
+    return await routes.update_file_settings(file_id, update)
+
+
+@router.put("/{file_id}/dependencies", summary="Set Files That Must Be Refreshed First")
+async def set_file_dependencies(file_id: int, update: DependencyUpdate):
+    return await routes.set_file_dependencies(file_id, update)
+
+
 @router.delete("/{file_id}", summary="Delete a File")
 async def delete_file(file_id: int):
     return await routes.delete_file(file_id)
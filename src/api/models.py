@@ -1,16 +1,45 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 
 class FilePath(BaseModel):
     path: str
 
 
+class BulkFilePaths(BaseModel):
+    paths: List[str] = []
+    globs: List[str] = []          # e.g. "C:\\data\\2024\\**\\*.xlsx"
+    skip_missing: bool = False     # do not register paths that do not exist on disk
+
+
+class DependencyUpdate(BaseModel):
+    depends_on: List[int]          # file IDs that must be refreshed first
+
+
 class FilePathWithId(BaseModel):
     id: int
     file_path: str
+    group_name: str = "default"
+    priority: int = 0
+    timeout_sec: Optional[int] = None
+    wait_strategy: str = "fixed"
+    enabled: bool = True
+
+
+class PathSettingsUpdate(BaseModel):
+    """Per-file settings; only the fields that are sent are changed."""
+    group_name: Optional[str] = None
+    priority: Optional[int] = None
+    timeout_sec: Optional[int] = None    # null: use the global refresh_delay
+    wait_strategy: Optional[str] = None  # fixed / poll
+    enabled: Optional[bool] = None
+
+
+MAX_REFRESH_WORKERS = 8  # each worker is a separate Excel process
 
 
 class RefreshSettings(BaseModel):
-    refresh_delay: int = 10
-    inter_file_delay: int = 5
+    refresh_delay: int = Field(10, ge=0)
+    inter_file_delay: int = Field(5, ge=0)
+    export_parquet: bool = False
+    workers: int = Field(1, ge=1, le=MAX_REFRESH_WORKERS)  # parallel Excel instances used by the refresh planner
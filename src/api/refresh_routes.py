@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from typing import Optional
 from src.api.models import RefreshSettings
 from src.api import routes
 
@@ -16,8 +17,33 @@ async def update_settings(new_settings: RefreshSettings):
 
 
 @router.post("/run-refresh", summary="Run the Excel Refresh Process")
-async def run_refresh():
-    return await routes.run_refresh()
+async def run_refresh(group: Optional[str] = None, profile: Optional[str] = None):
+    return await routes.run_refresh(group_name=group, profile_kind=profile)
+
+
+@router.get("/refresh-runs", summary="Refresh History")
+async def get_refresh_runs(file_path: Optional[str] = None, since: Optional[float] = None, limit: int = 200):
+    return await routes.get_refresh_runs(file_path, since, limit)
+
+
+@router.get("/refresh-runs/durations", summary="Per-File Refresh Duration Statistics")
+async def get_refresh_durations():
+    return await routes.get_refresh_durations()
+
+
+@router.get("/refresh-plan", summary="Preview the Refresh Plan and Predicted Duration")
+async def preview_refresh_plan(workers: Optional[int] = None, group: Optional[str] = None):
+    return await routes.preview_refresh_plan(workers, group)
+
+
+@router.get("/refresh-plans", summary="Predicted vs. Actual Durations of Past Runs")
+async def get_plan_reports(limit: int = 20):
+    return await routes.get_plan_reports(limit)
+
+
+@router.get("/jobs/{job_id}/logs", summary="Log Lines of a Refresh or OCR Job")
+async def get_job_logs(job_id: str, after: int = 0, limit: int = 500, level: Optional[str] = None):
+    return await routes.get_job_logs(job_id, after, limit, level)
 
 
 @router.post("/init-db", summary="Initialize Database")
@@ -1,13 +1,37 @@
+import logging
+
 from fastapi import HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from typing import List
-from src.api.models import FilePath, FilePathWithId, RefreshSettings
+from src.api.models import MAX_REFRESH_WORKERS, FilePath, FilePathWithId, RefreshSettings, BulkFilePaths, PathSettingsUpdate, DependencyUpdate
 from src.database import db_manager
 from src.excel import excelrefresh_time_delay as excel_refresher
 from src.database import place
+from src.utils.dir_listing import DirectoryListingCache
+from src.utils.metrics import CACHE_HIT_RATIO
+from src.utils.logging_setup import job_context, new_job_id, read_job_log
+from src.utils import profiling
+from src.utils.profiling import profile, KINDS as PROFILE_KINDS
+
+logger = logging.getLogger(__name__)
 
 
-# In-memory storage for settings (can be moved to a config file or DB later)
-settings = RefreshSettings()
+def load_settings() -> RefreshSettings:
+    """Global refresh settings persisted in the database (defaults for unset or out-of-range keys)."""
+    data = db_manager.load_settings()
+    try:
+        return RefreshSettings(**data)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors()}
+        logger.warning("Ignoring invalid stored settings: %s", ", ".join(sorted(map(str, invalid))))
+        return RefreshSettings(**{key: value for key, value in data.items() if key not in invalid})
+
+# Folder listing cache for browse_folder (network shares are slow to list)
+listing_cache = DirectoryListingCache(ttl=10.0, max_dirs=256)
+CACHE_HIT_RATIO.labels(cache="dir_listing").set_function(lambda: listing_cache.stats()["hit_ratio"])
+# Recursive search visits many folders; a separate cache keeps it from evicting browse listings
+search_cache = DirectoryListingCache(ttl=10.0, max_dirs=1024)
 
 
 async def read_root():
@@ -17,8 +41,7 @@ async def read_root():
 
 async def get_files():
     """Retrieves a list of all file paths stored in the database."""
-    files = db_manager.get_all_paths_with_ids()
-    return [{"id": id, "file_path": path} for id, path in files]
+    return db_manager.get_paths_detailed()
 
 
 async def add_file(file: FilePath):
@@ -30,6 +53,21 @@ async def add_file(file: FilePath):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+async def add_files_bulk(files: BulkFilePaths):
+    """Adds many file paths (explicit paths and/or glob patterns) in one transaction."""
+    paths = list(files.paths) + db_manager.expand_globs(files.globs)
+    if not paths:
+        raise HTTPException(status_code=400, detail="No paths given and no files matched the glob patterns.")
+    try:
+        report = db_manager.add_paths(paths, skip_missing=files.skip_missing)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    summary = {}
+    for item in report:
+        summary[item["status"]] = summary.get(item["status"], 0) + 1
+    return {"message": f"{summary.get('added', 0)} file path(s) added.", "summary": summary, "results": report}
+
+
 async def update_file(file_id: int, file: FilePath):
     """Updates an existing file path identified by its ID."""
     success = db_manager.update_path_by_id(file_id, file.path)
@@ -38,6 +76,68 @@ async def update_file(file_id: int, file: FilePath):
     return {"message": f"File ID {file_id} updated successfully.", "new_path": file.path}
 
 
+async def update_file_settings(file_id: int, update: PathSettingsUpdate):
+    """Updates per-file settings (group, priority, timeout, wait strategy, enabled)."""
+    fields = update.model_dump(exclude_unset=True)
+    try:
+        found = db_manager.update_path_settings(file_id, **fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not found:
+        raise HTTPException(status_code=404, detail=f"File ID {file_id} not found or nothing to update.")
+    return {"message": f"File ID {file_id} settings updated.", "updated": fields}
+
+
+async def get_groups():
+    """Lists file groups."""
+    return db_manager.get_groups()
+
+
+async def get_refresh_runs(file_path: str = None, since: float = None, limit: int = 200):
+    """Refresh history, newest first."""
+    return db_manager.get_refresh_runs(file_path, since, min(limit, 5000))
+
+
+async def get_refresh_durations():
+    """Per-file duration statistics over recent runs."""
+    return db_manager.get_duration_stats()
+
+
+async def set_file_dependencies(file_id: int, update: DependencyUpdate):
+    """Sets the files that must be refreshed before this one."""
+    from src.database.config import MASTER_DB
+
+    try:
+        db_manager.set_dependencies(file_id, update.depends_on, forbidden_paths=(MASTER_DB,))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": f"File ID {file_id} now depends on {len(update.depends_on)} file(s)."}
+
+
+async def preview_refresh_plan(workers: int = None, group_name: str = None):
+    """Predicted schedule and total duration for the next refresh run."""
+    from src.database.config import MASTER_DB
+    from src.excel.refresh_planner import build_plan
+
+    if workers is not None and not 1 <= workers <= MAX_REFRESH_WORKERS:
+        raise HTTPException(status_code=400, detail=f"workers must be between 1 and {MAX_REFRESH_WORKERS}.")
+    settings = load_settings()
+    try:
+        plan = build_plan(settings.refresh_delay, settings.inter_file_delay,
+                          workers or settings.workers, group_name, MASTER_DB)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    plan.pop("entries")
+    return plan
+
+
+async def get_plan_reports(limit: int = 20):
+    """Predicted vs. actual durations of recent refresh runs."""
+    return db_manager.get_plan_reports(min(limit, 200))
+
+
 async def delete_file(file_id: int):
     """Deletes a file path from the database by its ID."""
     db_manager.delete_path_by_id(file_id)
@@ -46,49 +146,77 @@ async def delete_file(file_id: int):
 
 async def get_settings():
     """Retrieves the current refresh and inter-file delay settings."""
-    return settings
+    return load_settings()
 
 
 async def update_settings(new_settings: RefreshSettings):
-    """Updates the refresh and inter-file delay settings."""
-    global settings
-    settings = new_settings
-    return {"message": "Settings updated successfully.", "new_settings": settings}
+    """
+    Updates (and persists) the refresh settings.
+    Only the fields the client sent are changed; omitted fields keep their stored values.
+    """
+    merged = RefreshSettings(**{**load_settings().model_dump(), **new_settings.model_dump(exclude_unset=True)})
+    db_manager.save_settings(merged.model_dump())
+    return {"message": "Settings updated successfully.", "new_settings": merged}
 
 
-def _run_refresh_background(refresh_delay: int, inter_file_delay: int):
-    """Background task to run Excel refresh process."""
-    try:
-        excel_refresher.run_all_refreshes(
-            refresh_delay=refresh_delay,
-            inter_file_delay=inter_file_delay
-        )
-    except Exception as e:
-        print(f"Background refresh error: {e}")
+def _run_refresh_background(refresh_delay: int, inter_file_delay: int, export_parquet: bool = False,
+                            group_name: str = None, workers: int = 1, job_id: str = None,
+                            profile_kind: str = None):
+    """
+    Background task to run Excel refresh process (its log lines go to the job's log stream).
+    With profile_kind set, the run is profiled and stored under the job ID.
+    """
+    from src.database.config import EXPORT_DIR
+    job_id = job_id or new_job_id()
+    with job_context(job_id), profile(profile_kind, f"refresh {group_name or 'all'}", profile_id=job_id):
+        try:
+            excel_refresher.run_all_refreshes(
+                refresh_delay=refresh_delay,
+                inter_file_delay=inter_file_delay,
+                export_dir=EXPORT_DIR if export_parquet else None,
+                group_name=group_name,
+                workers=workers
+            )
+        except Exception as e:
+            logger.exception("Background refresh error: %s", e)
 
 
-async def run_refresh(background_tasks: BackgroundTasks = None):
+async def run_refresh(background_tasks: BackgroundTasks = None, group_name: str = None, profile_kind: str = None):
     """
     Triggers the process to refresh all Excel files in the database.
     This is a non-blocking call; the process runs in the background.
+    profile_kind (cpu / memory / all) profiles the run; download it from /admin/profiles/{job_id}.
     """
     import threading
 
+    if profile_kind is not None and profile_kind not in PROFILE_KINDS:
+        raise HTTPException(status_code=400, detail=f"profile must be one of {', '.join(PROFILE_KINDS)}.")
+    settings = load_settings()
+    job_id = new_job_id()
     try:
         if background_tasks:
             background_tasks.add_task(
                 _run_refresh_background,
                 refresh_delay=settings.refresh_delay,
-                inter_file_delay=settings.inter_file_delay
+                inter_file_delay=settings.inter_file_delay,
+                export_parquet=settings.export_parquet,
+                group_name=group_name,
+                workers=settings.workers,
+                job_id=job_id,
+                profile_kind=profile_kind
             )
         else:
             # BackgroundTasks가 없으면 스레드로 실행
             thread = threading.Thread(
                 target=_run_refresh_background,
-                args=(settings.refresh_delay, settings.inter_file_delay)
+                args=(settings.refresh_delay, settings.inter_file_delay, settings.export_parquet, group_name,
+                      settings.workers, job_id, profile_kind)
             )
             thread.start()
-        return {"message": "Excel refresh process initiated successfully."}
+        response = {"message": "Excel refresh process initiated successfully.", "job_id": job_id}
+        if profile_kind:
+            response["profile_id"] = job_id
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred during the refresh process: {str(e)}")
 
@@ -105,9 +233,10 @@ async def init_database():
         raise HTTPException(status_code=500, detail=f"Failed to initialize database: {str(e)}")
 
 
-async def browse_folder(path: str = None):
+async def browse_folder(path: str = None, offset: int = 0, limit: int = 200, prefix: str = None):
     """
-    Browse folder structure and return files/folders.
+    Browse folder structure and return one page of folders/Excel files.
+    Listings are cached for a few seconds and re-read when the folder's mtime changes.
     """
     import os
 
@@ -129,26 +258,75 @@ async def browse_folder(path: str = None):
             path = "/"
 
     try:
-        items = []
-        for name in os.listdir(path):
-            full_path = os.path.join(path, name)
-            try:
-                is_dir = os.path.isdir(full_path)
-                # Excel 파일만 표시 (폴더는 항상 표시)
-                if is_dir or name.lower().endswith(('.xlsx', '.xlsm', '.xls')):
-                    items.append({
-                        "name": name,
-                        "path": full_path,
-                        "type": "folder" if is_dir else "file"
-                    })
-            except PermissionError:
-                continue
-
-        # 폴더 먼저, 그 다음 파일 (이름순 정렬)
-        items.sort(key=lambda x: (x["type"] != "folder", x["name"].lower()))
-
-        return {"items": items, "current_path": path}
+        page = listing_cache.page(path, offset=max(offset, 0), limit=min(max(limit, 1), 2000), prefix=prefix)
+        return {**page, "current_path": path}
     except PermissionError:
         raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
-    except FileNotFoundError:
+    except (FileNotFoundError, NotADirectoryError):
         raise HTTPException(status_code=404, detail="경로를 찾을 수 없습니다.")
+
+
+def _search_excel_files(path: str, query: str, max_results: int, max_depth: int):
+    import os
+
+    if not path or not os.path.isdir(path):
+        raise HTTPException(status_code=404, detail="경로를 찾을 수 없습니다.")
+    result = search_cache.search_files(path, query=query, max_results=min(max_results, 5000), max_depth=max_depth)
+    return {**result, "root": path}
+
+
+async def search_excel_files(path: str, query: str = None, max_results: int = 500, max_depth: int = None):
+    """
+    Recursively search Excel files under a folder.
+    The walk runs in the threadpool (slow network shares must not block the event loop)
+    and uses its own listing cache so it doesn't evict browse_folder listings.
+    """
+    return await run_in_threadpool(_search_excel_files, path, query, max_results, max_depth)
+
+
+async def get_job_logs(job_id: str, after: int = 0, limit: int = 500, level: str = None):
+    """Log lines of a background job (refresh run or OCR job); poll again with after=next."""
+    result = read_job_log(job_id, after=max(after, 0), limit=min(max(limit, 1), 5000), min_level=level)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No logs for job {job_id}.")
+    return result
+
+
+def _require_admin(token: str = None, client_host: str = None):
+    if not profiling.check_admin_token(token, client_host):
+        raise HTTPException(status_code=403, detail="Invalid or missing admin token.")
+
+
+async def list_profiles(admin_token: str = None, client_host: str = None):
+    """Stored profiles (API requests, refresh runs and OCR jobs), newest first."""
+    _require_admin(admin_token, client_host)
+    return profiling.list_profiles()
+
+
+async def get_profile(profile_id: str, admin_token: str = None, client_host: str = None):
+    """Metadata and downloadable files of one profile."""
+    _require_admin(admin_token, client_host)
+    meta = profiling.get_profile(profile_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+    return meta
+
+
+async def download_profile_file(profile_id: str, name: str, admin_token: str = None, client_host: str = None):
+    """One result file (cpu.prof for snakeviz/pstats, cpu.txt, cpu.html, memory.txt, memory.snapshot)."""
+    import os
+    from fastapi.responses import FileResponse
+
+    _require_admin(admin_token, client_host)
+    path = profiling.profile_file(profile_id, name)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"File {name} not found in profile {profile_id}.")
+    return FileResponse(path, filename=f"{profile_id}_{name}")
+
+
+async def delete_profile(profile_id: str, admin_token: str = None, client_host: str = None):
+    """Deletes a stored profile."""
+    _require_admin(admin_token, client_host)
+    if not profiling.delete_profile(profile_id):
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+    return {"message": f"Profile {profile_id} deleted."}
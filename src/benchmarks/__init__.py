@@ -0,0 +1,12 @@
+"""
+벤치마크 모음
+새로고침 스케줄링(가짜 Excel), 엑셀 -> DB 적재, 데이터 검색, 폴더 목록 조회, OCR 처리량,
+명령줄 시작 / 모듈 import 시간을 합성 데이터로 측정하고 JSON으로 저장 / 기준 결과(baseline)와 비교
+
+    python -m src.benchmarks                          전체 (scale=small)
+    python -m src.benchmarks --suite refresh browse   일부만
+    python -m src.benchmarks --scale medium --out bench.json
+    python -m src.benchmarks --save-baseline          현재 결과를 기준으로 저장
+    python -m src.benchmarks --baseline benchmarks/baseline.json --tolerance 0.2
+                                                      기준 대비 20% 이상 느려진 항목이 있으면 종료 코드 1
+"""
@@ -0,0 +1,194 @@
+"""
+가짜 Excel 백엔드
+win32com.client.DispatchEx("Excel.Application") 대신 사용해 excelrefresh_time_delay의 실제 코드
+(run_all_refreshes -> 계획 -> 작업자 스레드 -> refresh_excel)를 Excel 없이 실행
+열기 / RefreshAll / 저장 / 매크로 단계마다 지정한 분포에서 뽑은 시간만큼 대기
+
+    backend = FakeExcelBackend(refresh=LatencyModel("lognormal", median=0.05, sigma=0.6))
+    with installed(backend):
+        excel_refresher.run_all_refreshes(refresh_delay=0, inter_file_delay=0, workers=4)
+"""
+import importlib.util
+import math
+import os
+import random
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+class LatencyModel:
+    """
+    지연 시간 분포 (초)
+    - fixed: 항상 median
+    - uniform: low ~ high
+    - lognormal: 중앙값 median, 로그 표준편차 sigma (오래 걸리는 파일이 가끔 섞이는 실제 분포에 가까움)
+    """
+
+    def __init__(self, kind: str = "lognormal", median: float = 0.05, sigma: float = 0.5,
+                 low: Optional[float] = None, high: Optional[float] = None, seed: int = 0):
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"알 수 없는 분포: {kind}")
+        self.kind = kind
+        self.median = median
+        self.sigma = sigma
+        self.low = low if low is not None else median * 0.5
+        self.high = high if high is not None else median * 1.5
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, scale: float = 1.0) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.median
+            elif self.kind == "uniform":
+                value = self._rng.uniform(self.low, self.high)
+            else:
+                value = self._rng.lognormvariate(math.log(self.median), self.sigma)
+        return value * scale
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "median": self.median, "sigma": self.sigma, "low": self.low, "high": self.high}
+
+
+class FakeExcelBackend:
+    """
+    DispatchEx 대체 함수와 호출 통계를 제공
+    RefreshAll 시간은 파일 크기에 비례해 늘어남 (1 + size_mb / size_scale_mb 배)
+    """
+
+    def __init__(
+        self,
+        open_latency: Optional[LatencyModel] = None,
+        refresh: Optional[LatencyModel] = None,
+        save: Optional[LatencyModel] = None,
+        macro: Optional[LatencyModel] = None,
+        failure_rate: float = 0.0,
+        size_scale_mb: float = 10.0,
+        seed: int = 0
+    ):
+        self.open_latency = open_latency or LatencyModel("fixed", median=0.005)
+        self.refresh = refresh or LatencyModel("lognormal", median=0.05, sigma=0.5, seed=seed)
+        self.save = save or LatencyModel("fixed", median=0.005)
+        self.macro = macro or LatencyModel("fixed", median=0.01)
+        self.failure_rate = failure_rate
+        self.size_scale_mb = size_scale_mb
+        self._rng = random.Random(seed + 1)
+        self._lock = threading.Lock()
+        self.stats = {"instances": 0, "max_concurrent": 0, "refreshed": 0, "failed": 0, "busy_sec": 0.0}
+        self._alive = 0
+
+    def dispatch(self, prog_id: str) -> "FakeApplication":
+        with self._lock:
+            self.stats["instances"] += 1
+            self._alive += 1
+            self.stats["max_concurrent"] = max(self.stats["max_concurrent"], self._alive)
+        return FakeApplication(self)
+
+    def _sleep(self, seconds: float):
+        time.sleep(seconds)
+        with self._lock:
+            self.stats["busy_sec"] += seconds
+
+    def _released(self):
+        with self._lock:
+            self._alive -= 1
+
+    def _should_fail(self) -> bool:
+        if not self.failure_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.failure_rate
+
+
+class FakeWorkbook:
+    def __init__(self, backend: FakeExcelBackend, path: str):
+        self._backend = backend
+        self.path = path
+        self.Connections = []  # poll 대기 방식에서 진행 중인 연결 없음으로 처리됨
+        try:
+            self._size_mb = os.path.getsize(path) / (1024 * 1024)
+        except OSError:
+            self._size_mb = 0.0
+
+    def RefreshAll(self):
+        backend = self._backend
+        backend._sleep(backend.refresh.sample(1 + self._size_mb / backend.size_scale_mb))
+        if backend._should_fail():
+            with backend._lock:
+                backend.stats["failed"] += 1
+            raise RuntimeError(f"가짜 새로고침 실패: {os.path.basename(self.path)}")
+        with backend._lock:
+            backend.stats["refreshed"] += 1
+
+    def Save(self):
+        self._backend._sleep(self._backend.save.sample())
+
+    def Close(self, save_changes=False):
+        pass
+
+
+class _FakeWorkbooks:
+    def __init__(self, backend: FakeExcelBackend):
+        self._backend = backend
+
+    def Open(self, path: str) -> FakeWorkbook:
+        self._backend._sleep(self._backend.open_latency.sample())
+        return FakeWorkbook(self._backend, path)
+
+
+class FakeApplication:
+    CalculationState = 0  # xlDone
+
+    def __init__(self, backend: FakeExcelBackend):
+        self._backend = backend
+        self.Visible = True
+        self.Workbooks = _FakeWorkbooks(backend)
+        self._quit = False
+
+    @property
+    def Application(self):
+        return self
+
+    def Run(self, macro_name: str):
+        self._backend._sleep(self._backend.macro.sample())
+
+    def Quit(self):
+        if not self._quit:
+            self._quit = True
+            self._backend._released()
+
+
+def _stub_com_modules() -> Dict[str, types.ModuleType]:
+    """pywin32가 없는 환경(Linux/CI)에서 excelrefresh_time_delay를 import 할 수 있도록 최소 모듈 등록"""
+    client = types.ModuleType("win32com.client")
+    client.DispatchEx = None
+    package = types.ModuleType("win32com")
+    package.client = client
+    pythoncom = types.ModuleType("pythoncom")
+    pythoncom.CoInitialize = lambda: None
+    pythoncom.CoUninitialize = lambda: None
+    return {"win32com": package, "win32com.client": client, "pythoncom": pythoncom}
+
+
+@contextmanager
+def installed(backend: FakeExcelBackend):
+    """블록 안에서 excelrefresh_time_delay가 backend의 가짜 Excel을 사용하도록 교체 (종료 시 복구)"""
+    added = {}
+    if importlib.util.find_spec("win32com") is None:
+        added = {name: module for name, module in _stub_com_modules().items() if name not in sys.modules}
+        sys.modules.update(added)
+    from src.excel import excelrefresh_time_delay as refresher
+
+    client = refresher.win32com.client
+    original = client.DispatchEx
+    client.DispatchEx = backend.dispatch
+    try:
+        yield backend
+    finally:
+        client.DispatchEx = original
+        for name in added:
+            sys.modules.pop(name, None)
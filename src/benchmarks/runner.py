@@ -0,0 +1,160 @@
+"""
+벤치마크 실행 / 결과 저장 / 기준 결과와 비교 (사용법은 src/benchmarks/__init__.py 참고)
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from .suites import SCALES, SUITES, SkipSuite
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmarks" / "baseline.json"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=5)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suites(names: List[str], scale: str = "small", seed: int = 0) -> Dict[str, Any]:
+    """선택한 항목을 각각 새 임시 폴더에서 실행"""
+    params = SCALES[scale]
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "seed": seed,
+            "params": params,
+        },
+        "suites": {},
+    }
+    for name in names:
+        print(f"[{name}] 실행 중...", file=sys.stderr)
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as workdir:
+            try:
+                result = {"metrics": SUITES[name](workdir, params, seed)}
+            except SkipSuite as e:
+                result = {"skipped": str(e)}
+            except Exception as e:
+                result = {"error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc(limit=5)}
+        result["wall_sec"] = round(time.perf_counter() - start, 2)
+        report["suites"][name] = result
+    return report
+
+
+def _direction(metric: str) -> Optional[int]:
+    """1: 클수록 좋음, -1: 작을수록 좋음, None: 비교하지 않음"""
+    if metric.endswith("_per_sec"):
+        return 1
+    if metric.endswith(("_sec", "_ms")):
+        return -1
+    return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> Dict[str, Any]:
+    """
+    기준 결과 대비 변화율 (양수 = 개선, 음수 = 악화)
+    악화가 tolerance(비율)를 넘으면 regression으로 표시
+    이번 실행에서 오류가 난 항목, 기준 결과에 있던 지표가 사라진 경우도 regression
+    """
+    rows, regressions = [], []
+    for suite, result in current["suites"].items():
+        base_metrics = baseline.get("suites", {}).get(suite, {}).get("metrics") or {}
+        metrics = result.get("metrics") or {}
+        if "error" in result:
+            row = {"suite": suite, "metric": "(error)", "baseline": None, "current": None,
+                   "change_pct": None, "regression": True, "reason": result["error"]}
+            rows.append(row)
+            regressions.append(row)
+            continue
+        for metric, value in metrics.items():
+            direction = _direction(metric)
+            base = base_metrics.get(metric)
+            if direction is None or not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+                continue
+            change = (value - base) / base * direction
+            row = {"suite": suite, "metric": metric, "baseline": base, "current": value,
+                   "change_pct": round(change * 100, 1), "regression": change < -tolerance}
+            rows.append(row)
+            if row["regression"]:
+                regressions.append(row)
+        for metric, base in base_metrics.items():
+            if metric in metrics or _direction(metric) is None or not isinstance(base, (int, float)):
+                continue
+            row = {"suite": suite, "metric": metric, "baseline": base, "current": None, "change_pct": None,
+                   "regression": True, "reason": result.get("skipped") or "지표 없음"}
+            rows.append(row)
+            regressions.append(row)
+    if baseline.get("meta", {}).get("scale") != current["meta"]["scale"]:
+        print("경고: 기준 결과와 규모(scale)가 다릅니다.", file=sys.stderr)
+    return {"tolerance": tolerance, "baseline_commit": baseline.get("meta", {}).get("commit"),
+            "rows": rows, "regressions": regressions}
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    lines = [f"{'suite':<12} {'metric':<36} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in comparison["rows"]:
+        if row["change_pct"] is None:
+            lines.append(f"{row['suite']:<12} {row['metric']:<36} {str(row['baseline'] or '-'):>12} {'-':>12} "
+                         f"{'-':>9}  << regression ({row['reason']})")
+            continue
+        mark = "  << regression" if row["regression"] else ""
+        lines.append(f"{row['suite']:<12} {row['metric']:<36} {row['baseline']:>12} {row['current']:>12} "
+                     f"{row['change_pct']:>+8.1f}%{mark}")
+    lines.append(f"{len(comparison['regressions'])}개 항목이 {comparison['tolerance']:.0%} 이상 느려졌거나 측정되지 않았습니다."
+                 if comparison["regressions"] else "기준 대비 느려진 항목이 없습니다.")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.benchmarks", description="벤치마크 실행")
+    parser.add_argument("--suite", nargs="+", choices=list(SUITES), default=list(SUITES), help="실행할 항목")
+    parser.add_argument("--scale", choices=list(SCALES), default="small", help="데이터 규모")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="결과 JSON 저장 경로 (없으면 표준 출력)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="비교할 기준 결과 JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준 결과로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="regression 판단 기준 (0.2 = 20%% 악화)")
+    args = parser.parse_args(argv)
+    # 측정 중 진행 로그(새로고침 시작/완료 등)는 숨기고 오류만 표시
+    logging.getLogger("src").setLevel(logging.ERROR)
+
+    report = run_suites(args.suite, args.scale, args.seed)
+
+    baseline_path = Path(args.baseline)
+    exit_code = 0
+    if baseline_path.exists() and not args.save_baseline:
+        comparison = compare(report, json.loads(baseline_path.read_text(encoding="utf-8")), args.tolerance)
+        report["comparison"] = comparison
+        print(format_comparison(comparison), file=sys.stderr)
+        exit_code = 1 if comparison["regressions"] else 0
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+        print(f"결과 저장: {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(text, encoding="utf-8")
+        print(f"기준 결과 저장: {baseline_path}", file=sys.stderr)
+    return exit_code
@@ -0,0 +1,297 @@
+"""
+벤치마크 항목
+각 함수는 작업 폴더(workdir)와 규모 설정(params)을 받아 {지표 이름: 값}을 반환
+필요한 패키지가 없으면 SkipSuite를 발생시켜 결과에 건너뛴 이유를 남김
+
+지표 이름 규칙 (기준 비교 시 방향 판단에 사용):
+    *_sec, *_ms      작을수록 좋음
+    *_per_sec        클수록 좋음
+    그 외            참고용 (비교하지 않음)
+"""
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Any, Callable, List
+
+from .fake_excel import FakeExcelBackend, LatencyModel, installed
+from . import synthetic
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES: Dict[str, Dict[str, Any]] = {
+    "small": {"refresh_files": 40, "refresh_workers": [1, 2, 4], "refresh_median_sec": 0.02, "plan_files": 500,
+              "load_rows": [1_000, 10_000], "browse_entries": 20_000, "ocr_images": 8, "repeats": 5},
+    "medium": {"refresh_files": 120, "refresh_workers": [1, 2, 4, 8], "refresh_median_sec": 0.05, "plan_files": 2_000,
+               "load_rows": [10_000, 50_000], "browse_entries": 100_000, "ocr_images": 32, "repeats": 5},
+    "large": {"refresh_files": 300, "refresh_workers": [1, 4, 8], "refresh_median_sec": 0.05, "plan_files": 5_000,
+              "load_rows": [50_000, 200_000], "browse_entries": 300_000, "ocr_images": 100, "repeats": 3},
+}
+
+
+class SkipSuite(Exception):
+    """실행 환경에 필요한 패키지/파일이 없어 항목을 건너뜀"""
+
+
+def _median_ms(fn: Callable[[], Any], repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def _isolated_db(workdir: str):
+    """db_manager / tracing이 작업 폴더의 파일을 쓰도록 전환, 원래 값을 복구하는 함수 반환"""
+    from src.database import db_manager
+    from src.utils import tracing
+
+    saved = (db_manager.DB_FILE, tracing.TRACE_DIR)
+    db_manager.DB_FILE = os.path.join(workdir, "bench_paths.db")
+    tracing.TRACE_DIR = os.path.join(workdir, "traces")
+    db_manager.create_table_if_not_exists()
+
+    def restore():
+        db_manager.DB_FILE, tracing.TRACE_DIR = saved
+    return restore
+
+
+# --- 새로고침 ---
+
+def bench_refresh(workdir: str, params: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    """
+    가짜 Excel로 run_all_refreshes 전체 실행 (계획, 작업자 스레드, 이력 기록 포함)
+    작업자 수별 전체 소요 시간과 계획 예측 오차, 그리고 파일 수가 많을 때의 계획 수립 시간
+    """
+    from src.database import db_manager
+    from src.excel import refresh_planner
+
+    restore = _isolated_db(workdir)
+    try:
+        files = synthetic.generate_refresh_files(os.path.join(workdir, "refresh"), params["refresh_files"], seed=seed)
+        db_manager.add_paths(files)
+        metrics: Dict[str, Any] = {"files": len(files)}
+        backend = FakeExcelBackend(
+            refresh=LatencyModel("lognormal", median=params["refresh_median_sec"], sigma=0.6, seed=seed), seed=seed
+        )
+        with installed(backend):
+            from src.excel import excelrefresh_time_delay as refresher
+
+            # 첫 실행은 이력이 없어 파일 크기로 추정 -> 이후 실행은 이력 기반 계획
+            refresher.run_all_refreshes(refresh_delay=0, inter_file_delay=0, workers=1)
+            serial = None
+            for workers in params["refresh_workers"]:
+                report = refresher.run_all_refreshes(refresh_delay=0, inter_file_delay=0, workers=workers)
+                actual = report["actual_makespan_sec"]
+                serial = serial or actual
+                metrics[f"refresh_w{workers}_makespan_sec"] = actual
+                metrics[f"refresh_w{workers}_speedup"] = round(serial / actual, 2) if actual else None
+                metrics[f"refresh_w{workers}_plan_error_pct"] = report["error_pct"]
+        metrics["fake_excel_max_concurrent"] = backend.stats["max_concurrent"]
+
+        # 계획 수립만 (이력 있는 파일 수천 개)
+        entries = [{"file_path": f"f{i}.xlsx", "priority": i % 3, "timeout_sec": None} for i in range(params["plan_files"])]
+        stats = {e["file_path"]: {"avg_sec": 5 + (i * 7919) % 300} for i, e in enumerate(entries)}
+        dependencies = {f"f{i}.xlsx": [f"f{i - 1}.xlsx"] for i in range(1, params["plan_files"], 50)}
+
+        def plan():
+            estimates = refresh_planner.estimate_durations(entries, stats)
+            refresh_planner.plan_refresh(entries, estimates, workers=4, dependencies=dependencies)
+        metrics[f"plan_{params['plan_files']}_files_ms"] = _median_ms(plan, params["repeats"])
+        return metrics
+    finally:
+        restore()
+
+
+# --- 엑셀 적재 / 검색 ---
+
+def bench_load_and_search(workdir: str, params: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    """ExcelToDBLoader로 합성 워크북 적재, 이후 search_data 검색 지연 시간"""
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        raise SkipSuite("pandas가 설치되어 있지 않습니다")
+    if not synthetic.OPENPYXL_AVAILABLE:
+        raise SkipSuite("openpyxl이 설치되어 있지 않습니다")
+    from src.chatbot.data_loader import ExcelToDBLoader
+
+    metrics: Dict[str, Any] = {}
+    loader = ExcelToDBLoader(os.path.join(workdir, "bench_chatbot.db"))
+    for rows in params["load_rows"]:
+        path = synthetic.generate_workbook(os.path.join(workdir, f"sales_{rows}.xlsx"), rows, seed=seed)
+        start = time.perf_counter()
+        loader.load_excel_to_db(path, table_name=f"sales_{rows}")
+        elapsed = time.perf_counter() - start
+        metrics[f"load_{rows}_rows_sec"] = round(elapsed, 3)
+        metrics[f"load_{rows}_rows_per_sec"] = round(rows / elapsed, 1)
+
+    table = f"sales_{params['load_rows'][-1]}"
+    repeats = params["repeats"]
+    metrics["search_hit_one_table_ms"] = _median_ms(lambda: loader.search_data("익진", table), repeats)
+    metrics["search_miss_one_table_ms"] = _median_ms(lambda: loader.search_data("존재하지않는값", table), repeats)
+    metrics["search_hit_all_tables_ms"] = _median_ms(lambda: loader.search_data("Steel"), repeats)
+    return metrics
+
+
+# --- 폴더 목록 ---
+
+def _browse_function():
+    """api.routes.browse_folder (FastAPI가 없으면 같은 캐시를 직접 호출)"""
+    try:
+        with installed(FakeExcelBackend()):
+            from src.api import routes
+    except ImportError:
+        from src.utils.dir_listing import DirectoryListingCache
+
+        cache = DirectoryListingCache(ttl=10.0, max_dirs=256)
+        return "DirectoryListingCache", cache, lambda path, **kw: cache.page(path, **kw)
+    routes.listing_cache.invalidate()
+    loop = asyncio.new_event_loop()
+    return "routes.browse_folder", routes.listing_cache, \
+        lambda path, **kw: loop.run_until_complete(routes.browse_folder(path, **kw))
+
+
+def bench_browse(workdir: str, params: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    """browse_folder: 큰 폴더 첫 조회 / 캐시 조회 / 이름 필터 / 하위 폴더 검색"""
+    from src.utils.dir_listing import generate_tree
+
+    root = generate_tree(os.path.join(workdir, "tree"), params["browse_entries"])
+    flat = os.path.join(root, "flat")
+    via, cache, browse = _browse_function()
+    repeats = params["repeats"]
+
+    def cold():
+        cache.invalidate()
+        browse(flat)
+    metrics: Dict[str, Any] = {"via": via, "entries": params["browse_entries"]}
+    metrics["browse_cold_page_ms"] = _median_ms(cold, repeats)
+    browse(flat)
+    metrics["browse_cached_page_ms"] = _median_ms(lambda: browse(flat, offset=1000), repeats)
+    metrics["browse_prefix_filter_ms"] = _median_ms(lambda: browse(flat, prefix="report_0001"), repeats)
+    cache.invalidate()
+    start = time.perf_counter()
+    found = cache.search_files(root, max_results=10_000_000)
+    metrics["search_excel_cold_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    metrics["search_excel_cached_ms"] = _median_ms(lambda: cache.search_files(root, max_results=10_000_000), repeats)
+    metrics["excel_files_found"] = len(found["items"])
+    return metrics
+
+
+# --- OCR ---
+
+def bench_ocr(workdir: str, params: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    """렌더링한 이미지 폴더의 OCR 처리량 (배치 인식 / 폴더 일괄 처리 파이프라인)"""
+    try:
+        import easyocr  # noqa: F401
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        raise SkipSuite("easyocr / Pillow가 설치되어 있지 않습니다")
+    font = synthetic.find_font()
+    if font is None:
+        raise SkipSuite("한글 폰트를 찾을 수 없습니다 (BENCH_FONT 환경 변수로 지정)")
+    from src.chatbot.ocr_processor import OnDeviceOCR
+    from src.chatbot.ocr_preprocess import PreprocessConfig
+
+    images = synthetic.generate_image_folder(os.path.join(workdir, "images"), params["ocr_images"], font, seed=seed)
+    engine = OnDeviceOCR(gpu=False, preprocess=PreprocessConfig(max_long_edge=1600, grayscale=True))
+    start = time.perf_counter()
+    engine.warm_up(background=False)
+    metrics: Dict[str, Any] = {"images": len(images), "model_load_sec": round(time.perf_counter() - start, 2)}
+
+    start = time.perf_counter()
+    engine.recognize_batch(images)
+    elapsed = time.perf_counter() - start
+    metrics["recognize_batch_sec"] = round(elapsed, 3)
+    metrics["recognize_batch_images_per_sec"] = round(len(images) / elapsed, 2)
+
+    # 폴더 일괄 처리는 파일 이름을 바꾸므로 복사본 사용
+    folder = os.path.join(workdir, "images_organize")
+    shutil.copytree(os.path.dirname(images[0]), folder)
+    stats = engine.batch_organize_images(folder) or {}
+    metrics["organize_images_per_sec"] = stats.get("images_per_sec")
+    return metrics
+
+
+# --- 시작 시간 ---
+
+IMPORT_MODULES = ["src.database.db_manager", "src.excel.refresh_planner", "src.api.routes", "src.chatbot.chatbot_routes"]
+
+
+def _spawn_ms(args: List[str], repeats: int, env: Dict[str, str]) -> float:
+    """새 파이썬 프로세스 실행 ~ 종료 시간 (실패하면 RuntimeError)"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, env=env, input="0\n",
+                                capture_output=True, text=True, timeout=120)
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "실패")
+    return round(statistics.median(samples), 1)
+
+
+def _import_ms(module: str, env: Dict[str, str]) -> float:
+    """python -X importtime 의 누적 시간 (해당 모듈과 그 모듈이 불러온 모듈 전체)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=PROJECT_ROOT,
+                            env=env, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return round(int(parts[1]) / 1000, 1)
+    raise RuntimeError(f"{module}의 import 시간을 찾을 수 없습니다")
+
+
+def bench_startup(workdir: str, params: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    """
+    cli.py 로컬 모드 명령 / main.py 시작 메뉴까지의 프로세스 시간과 주요 모듈 import 시간
+    패키지가 없어 실행할 수 없는 항목은 unavailable에 이유를 남김
+    """
+    env = {**os.environ, "EXCEL_PATHS_DB": os.path.join(workdir, "bench_cli.db"), "CLI_MODE": "local",
+           "LOG_DIR": os.path.join(workdir, "logs")}
+    repeats = params["repeats"]
+    cli = os.path.join(PROJECT_ROOT, "cli.py")
+    sample = os.path.join(workdir, "sample.xlsx")
+    open(sample, "wb").close()
+
+    metrics: Dict[str, Any] = {}
+    unavailable: Dict[str, str] = {}
+    commands = {
+        "python_baseline_ms": ["-c", "pass"],
+        "cli_add_local_ms": [cli, "add", sample],
+        "cli_list_local_ms": [cli, "list"],
+        "main_menu_ms": [os.path.join(PROJECT_ROOT, "main.py")],  # 메뉴 표시 후 0(종료) 입력
+        "create_app_ms": ["-c", "import main; main.app"],
+    }
+    for name, args in commands.items():
+        try:
+            metrics[name] = _spawn_ms(args, repeats, env)
+        except RuntimeError as e:
+            unavailable[name] = str(e)
+    for module in IMPORT_MODULES:
+        name = f"import_{module.replace('.', '_')}_ms"
+        try:
+            metrics[name] = _import_ms(module, env)
+        except RuntimeError as e:
+            unavailable[name] = str(e)
+    if unavailable:
+        metrics["unavailable"] = unavailable
+    return metrics
+
+
+SUITES: Dict[str, Callable[[str, Dict[str, Any], int], Dict[str, Any]]] = {
+    "refresh": bench_refresh,
+    "load_search": bench_load_and_search,
+    "browse": bench_browse,
+    "ocr": bench_ocr,
+    "startup": bench_startup,
+}
+
+
+def suite_names() -> List[str]:
+    return list(SUITES)
@@ -0,0 +1,96 @@
+"""
+벤치마크용 합성 데이터 생성 (같은 seed면 같은 데이터)
+- 엑셀 워크북: 날짜/거래처/품목/수량/단가/금액/비고 컬럼의 거래 내역
+- 새로고침 대상 파일: 크기만 다른 빈 파일 (가짜 Excel은 내용을 읽지 않음)
+- 이미지 폴더: 한글/영문 텍스트를 렌더링한 PNG
+"""
+import os
+import random
+from datetime import date, timedelta
+from typing import List, Optional
+
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+CLIENTS = ["(주)한빛상사", "대성물산", "익진엔지니어링", "Blue Ocean Ltd", "서울유통", "Hanil Trading", "미래건설", "동방기계"]
+ITEMS = ["볼트 M8", "너트 M10", "배관 자재", "전선 2.5SQ", "Steel Plate", "페인트 18L", "Cable Tray", "안전모"]
+NOTES = ["", "", "", "긴급", "분할 납품", "단가 조정", "Back order", "검수 완료"]
+HEADERS = ["날짜", "거래처", "품목", "수량", "단가", "금액", "비고"]
+
+
+def generate_workbook(path: str, rows: int, sheets: int = 1, seed: int = 0) -> str:
+    """rows행짜리 시트 sheets개를 가진 .xlsx 생성 (write-only 모드로 메모리 사용 일정)"""
+    if not OPENPYXL_AVAILABLE:
+        raise ImportError("openpyxl이 설치되어 있지 않습니다. pip install openpyxl")
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    workbook = Workbook(write_only=True)
+    for s in range(sheets):
+        sheet = workbook.create_sheet(f"거래내역{s + 1}")
+        sheet.append(HEADERS)
+        for _ in range(rows):
+            quantity = rng.randint(1, 500)
+            price = round(rng.uniform(100, 50000), -1)
+            sheet.append([
+                start + timedelta(days=rng.randint(0, 730)),
+                rng.choice(CLIENTS),
+                rng.choice(ITEMS),
+                quantity,
+                price,
+                quantity * price,
+                rng.choice(NOTES),
+            ])
+    workbook.save(path)
+    return path
+
+
+def generate_refresh_files(directory: str, count: int, max_size_mb: float = 20.0, seed: int = 0) -> List[str]:
+    """
+    새로고침 대상 파일 count개 생성 (크기는 0.1MB ~ max_size_mb, 파일 시스템이 지원하면 희소 파일)
+    크기는 refresh_planner가 이력이 없는 파일의 소요 시간을 추정할 때 사용됨
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"report_{i:04d}.xlsx")
+        with open(path, "wb") as f:
+            f.truncate(int(rng.uniform(0.1, max_size_mb) * 1024 * 1024))
+        paths.append(path)
+    return paths
+
+
+def generate_image_folder(directory: str, count: int, font_path: str,
+                          size: tuple = (1600, 1200), seed: int = 0) -> List[str]:
+    """텍스트 4줄을 렌더링한 PNG count개 생성 (줄 조합/기울기는 seed로 결정)"""
+    from src.chatbot.ocr_preprocess import render_synthetic_image, _SAMPLE_LINES
+
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        lines = rng.sample(_SAMPLE_LINES, k=min(4, len(_SAMPLE_LINES)))
+        angle = rng.choice([-3.0, 0.0, 0.0, 3.0])
+        path = os.path.join(directory, f"scan_{i:04d}.png")
+        with open(path, "wb") as f:
+            f.write(render_synthetic_image(lines, font_path, size=size, angle=angle))
+        paths.append(path)
+    return paths
+
+
+def find_font(preferred: Optional[str] = None) -> Optional[str]:
+    """한글을 렌더링할 수 있는 TTF 경로 (BENCH_FONT 환경 변수 > 인자 > 알려진 경로)"""
+    candidates = [
+        os.environ.get("BENCH_FONT"),
+        preferred,
+        r"C:\Windows\Fonts\malgun.ttf",
+        "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+        "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    ]
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    return None
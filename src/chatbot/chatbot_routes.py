@@ -1,21 +1,94 @@
 import os
 import json
+import atexit
+import logging
+import asyncio
 from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 from .ocr_processor import OnDeviceOCR
+from .ocr_cache import OCRResultCache
+from .ocr_preprocess import PreprocessConfig
+from .ocr_jobs import OCRJobManager
+from .ocr_export import aggregate_ocr_results
+from .folder_watcher import FolderWatcher
 from .lmstudio_client import LMStudioClient
 from .data_loader import ExcelToDBLoader
+from .session_store import ConversationSessionStore
+from . import table_stream
+from src.database.config import EXPORT_DIR
+from src.utils.metrics import CACHE_HIT_RATIO, WATCH_QUEUE_DEPTH
+from src.utils.tracing import start_trace, span
+from src.utils.profiling import KINDS as PROFILE_KINDS
+
+logger = logging.getLogger(__name__)
 
 # 전역 인스턴스 초기화
-ocr_engine = OnDeviceOCR(gpu=False)
+# OCR 모델은 첫 요청 시 로드되고, OCR_IDLE_TTL초 동안 사용하지 않으면 해제됨
+# OCR_WARMUP=1 이면 서버 시작 직후 백그라운드에서 미리 로드
+ocr_engine = OnDeviceOCR(
+    gpu=False,
+    idle_ttl=float(os.environ.get("OCR_IDLE_TTL", "600")),
+    cache=OCRResultCache("ocr_cache.db"),
+    preprocess=PreprocessConfig(max_long_edge=1600, grayscale=True)
+)
+atexit.register(ocr_engine.cache.close)
+if os.environ.get("OCR_WARMUP") == "1":
+    ocr_engine.warm_up(background=True)
+# 폴더 OCR 백그라운드 작업 (작업 1개가 여러 프로세스를 쓰므로 동시 실행은 1개로 제한)
+ocr_jobs = OCRJobManager(ocr_engine, journal_dir="ocr_jobs", max_concurrent=1)
 lm_client = LMStudioClient()
-db_loader = ExcelToDBLoader("chatbot_data.db")
+# 새로고침 후 내보낸 Arrow 캐시 폴더 (CHATBOT_ARROW_DIR로 변경 가능)
+db_loader = ExcelToDBLoader(
+    "chatbot_data.db",
+    arrow_dir=os.environ.get("CHATBOT_ARROW_DIR") or os.path.join(EXPORT_DIR, "arrow")
+)
+
+# 세션별 대화 기록 저장 (LRU/TTL 제한, 워커 간 공유를 위해 SQLite에 영속화)
+conversation_sessions = ConversationSessionStore(
+    max_sessions=1000,
+    idle_ttl=60 * 60 * 24,
+    token_budget=3000,
+    db_path="chatbot_sessions.db"
+)
+atexit.register(conversation_sessions.close)
+
+
+def _watch_dirs(name: str) -> List[str]:
+    return [d for d in os.environ.get(name, "").split(os.pathsep) if d.strip()]
+
+
+def _ocr_watched_images(paths: List[str]) -> List[str]:
+    """감시 폴더의 새 이미지: OCR 작업 큐에서 (동시 실행 제한을 지켜) 인식 후 파일명 정리"""
+    return ocr_jobs.run_exclusive(_recognize_and_rename, paths).result()
+
+
+def _recognize_and_rename(paths: List[str]) -> List[str]:
+    new_paths = []
+    for path, raw in zip(paths, ocr_engine.recognize_batch(paths)):
+        if isinstance(raw, Exception):
+            logger.warning("OCR 실패 (%s): %s", path, raw)
+            continue
+        new_paths.append(ocr_engine.rename_by_results(path, ocr_engine.filter_results(raw, 0.6)))
+    return new_paths
+
 
-# 세션별 대화 기록 저장
-conversation_sessions: Dict[str, List[Dict[str, str]]] = {}
+# 폴더 감시 (WATCH_IMAGE_DIRS / WATCH_EXCEL_DIRS 에 os.pathsep 으로 구분한 폴더 지정)
+# WATCH_POLLING=1 이면 이벤트 대신 주기적 스캔 사용 (네트워크 드라이브 등)
+folder_watcher = FolderWatcher(
+    image_dirs=_watch_dirs("WATCH_IMAGE_DIRS"),
+    excel_dirs=_watch_dirs("WATCH_EXCEL_DIRS"),
+    on_images=_ocr_watched_images,
+    on_workbook=db_loader.load_all_sheets,
+    use_events=os.environ.get("WATCH_POLLING") != "1"
+)
+
+# /metrics 조회 시점에 계산되는 값
+CACHE_HIT_RATIO.labels(cache="ocr").set_function(lambda: ocr_engine.cache.stats()["hit_ratio"])
+for _queue in ("pending", "image_queue", "excel_queue"):
+    WATCH_QUEUE_DEPTH.labels(queue=_queue).set_function(lambda name=_queue: folder_watcher.stats()[name])
 
 class ChatRequest(BaseModel):
     message: str
@@ -43,6 +116,38 @@ class OCRBatchRequest(BaseModel):
     folder_path: str
     max_length: int = 30
     log_filename: str = "ocr_batch_process.log"
+    workers: Optional[int] = None  # 인식 프로세스 수 (None이면 CPU 코어 수의 절반)
+    batch_size: int = 8            # 한 번의 인식 호출에 묶을 이미지 수
+    profile: Optional[str] = None  # cpu / memory / all: 작업 프로파일 저장 (/admin/profiles/<job_id>)
+
+class OCRRecognizeBatchRequest(BaseModel):
+    file_paths: List[str]
+    min_confidence: float = 0.5
+    batch_size: int = 8
+
+class OCRAggregateRequest(BaseModel):
+    folder_path: Optional[str] = None       # 폴더 내 모든 이미지
+    file_paths: Optional[List[str]] = None  # 또는 이미지 경로 리스트
+    output: str = "both"                    # excel / db / both
+    output_path: Optional[str] = None       # None이면 <폴더>/ocr_results.xlsx
+    table_name: str = "ocr_results"
+    if_exists: str = "replace"              # replace: 기존 테이블 교체 / append: 기존 테이블에 추가
+    min_confidence: float = 0.6
+    batch_size: int = 8
+
+# --- 앱 시작/종료 ---
+
+def startup():
+    """앱 시작 시 호출 - 비정상 종료된 OCR 작업 재개, 폴더 감시 시작"""
+    ocr_jobs.resume_incomplete()
+    if folder_watcher.image_dirs or folder_watcher.excel_dirs:
+        folder_watcher.start()
+
+def shutdown():
+    """앱 종료 시 호출 - 실행 중인 OCR 작업 중단 (다음 시작 시 재개)"""
+    folder_watcher.stop()
+    ocr_jobs.shutdown()
+    conversation_sessions.flush()
 
 # --- 챗봇 및 데이터 관련 함수 ---
 
@@ -77,6 +182,86 @@ async def get_table_data(table_name: str, limit: int = 100):
     """테이블 데이터 조회"""
     return db_loader.query_table(table_name, limit)
 
+def _parse_filters(filters: Optional[List[str]]) -> List[tuple]:
+    """'컬럼:연산자:값' 형식의 필터 문자열 파싱 (예: 금액:gt:10000, 비고:isnull)"""
+    parsed = []
+    for f in filters or []:
+        parts = f.split(":", 2)
+        if len(parts) < 2:
+            raise HTTPException(status_code=400, detail=f"잘못된 필터 형식: {f} (컬럼:연산자:값)")
+        parsed.append((parts[0], parts[1].lower(), parts[2] if len(parts) == 3 else None))
+    return parsed
+
+def _parse_columns(columns: Optional[str]) -> Optional[List[str]]:
+    """쉼표로 구분된 컬럼 목록 파싱"""
+    if not columns:
+        return None
+    return [c.strip() for c in columns.split(",") if c.strip()]
+
+async def browse_table(
+    table_name: str,
+    columns: Optional[str] = None,
+    filters: Optional[List[str]] = None,
+    after: Optional[int] = None,
+    limit: int = 100
+):
+    """keyset 페이지 단위 테이블 조회"""
+    try:
+        return db_loader.browse_table(
+            table_name, _parse_columns(columns), _parse_filters(filters), after, max(1, min(limit, 1000))
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def list_arrow_caches():
+    """새로고침 후 내보낸 Arrow 캐시 목록"""
+    return {"caches": db_loader.list_arrow_caches()}
+
+async def browse_arrow_cache(
+    name: str,
+    columns: Optional[str] = None,
+    filters: Optional[List[str]] = None,
+    offset: int = 0,
+    limit: int = 100
+):
+    """Arrow 캐시를 memory-map으로 바로 페이지 조회 (SQLite 적재 없음)"""
+    try:
+        return db_loader.browse_arrow_cache(
+            name, _parse_columns(columns), _parse_filters(filters), offset, max(1, min(limit, 1000))
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+async def stream_table(
+    table_name: str,
+    columns: Optional[str] = None,
+    filters: Optional[List[str]] = None,
+    format: str = "ndjson"
+):
+    """테이블 전체를 NDJSON 또는 Arrow IPC 스트림으로 전송"""
+    if format not in ("ndjson", "arrow"):
+        raise HTTPException(status_code=400, detail="format은 ndjson 또는 arrow만 지원합니다.")
+    if format == "arrow" and not table_stream.PYARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="pyarrow가 설치되어 있지 않습니다.")
+    try:
+        schema, batches = db_loader.iter_table_rows(
+            table_name, _parse_columns(columns), _parse_filters(filters)
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "arrow":
+        return StreamingResponse(table_stream.arrow_stream(schema, batches), media_type=table_stream.ARROW_MEDIA_TYPE)
+    return StreamingResponse(table_stream.ndjson_stream(schema, batches), media_type=table_stream.NDJSON_MEDIA_TYPE)
+
 async def get_table_summary(table_name: str):
     """테이블 요약 정보 조회"""
     return db_loader.get_data_summary(table_name)
@@ -86,57 +271,89 @@ async def search_data(query: str, table_name: Optional[str] = None):
     return db_loader.search_data(query, table_name)
 
 async def chat(request: ChatRequest):
-    """챗봇 대화 수행"""
+    """챗봇 대화 수행 (단계별 소요 시간은 trace_id로 조회: python -m src.utils.tracing show <trace_id>)"""
     context = ""
     data_used = []
 
-    if request.use_data:
-        # 간단한 키워드 기반 데이터 검색을 컨텍스트로 활용
-        search_results = db_loader.search_data(request.message)
-        if search_results:
-            context = json.dumps(search_results[:5], ensure_ascii=False)
-            data_used = search_results[:5]
-
-    history = conversation_sessions.get(request.session_id, [])
-    response = lm_client.chat(
-        request.message, 
-        context=context, 
-        conversation_history=history
-    )
-
-    if response["status"] == "success":
-        # 대화 기록 업데이트
-        history.append({"role": "user", "content": request.message})
-        history.append({"role": "assistant", "content": response["message"]})
-        conversation_sessions[request.session_id] = history[-10:]  # 최근 10개 유지
+    with start_trace("chat", session=request.session_id) as root:
+        if request.use_data:
+            # 간단한 키워드 기반 데이터 검색을 컨텍스트로 활용
+            with span("search") as current:
+                search_results = db_loader.search_data(request.message)
+                current.set(results=len(search_results))
+            if search_results:
+                with span("build_prompt"):
+                    context = json.dumps(search_results[:5], ensure_ascii=False)
+                data_used = search_results[:5]
+
+        history = conversation_sessions.get(request.session_id)
+        with span("llm") as current:
+            response = lm_client.chat(
+                request.message, 
+                context=context, 
+                conversation_history=history
+            )
+            current.set(status=response["status"], **(response.get("usage") or {}))
+
+        if response["status"] == "success":
+            # 대화 기록 업데이트 (토큰 예산 초과 시 오래된 메시지부터 제거)
+            conversation_sessions.append(request.session_id, [
+                {"role": "user", "content": request.message},
+                {"role": "assistant", "content": response["message"]}
+            ])
 
     return {
         "response": response.get("message", "응답을 생성할 수 없습니다."),
         "data_used": data_used,
-        "status": response["status"]
+        "status": response["status"],
+        "trace_id": root.trace_id
     }
 
 async def clear_session(session_id: str):
     """대화 세션 초기화"""
-    conversation_sessions[session_id] = []
+    conversation_sessions.clear(session_id)
     return {"status": "success", "message": f"Session {session_id} cleared"}
 
 async def ask_with_sql(request: SQLQueryRequest):
     """자연어 질문을 SQL로 변환하여 실행"""
-    # 테이블 스키마 정보 수집
-    files = db_loader.get_loaded_files()
-    table_info = ""
-    for f in files:
-        if not request.table_name or f['table_name'] == request.table_name:
-            summary = db_loader.get_data_summary(f['table_name'])
-            table_info += f"Table: {f['table_name']}, Columns: {[c['name'] for c in summary['columns']]}\n"
-
-    sql_res = lm_client.generate_sql_query(request.question, table_info)
-    if sql_res["status"] == "success":
-        data = db_loader.execute_sql(sql_res["sql"])
-        return {"sql": sql_res["sql"], "data": data}
-    else:
-        raise HTTPException(status_code=500, detail="SQL 생성 실패")
+    with start_trace("ask_sql", table=request.table_name or "all") as root:
+        # 테이블 스키마 정보 수집
+        with span("build_prompt"):
+            files = db_loader.get_loaded_files()
+            table_info = ""
+            for f in files:
+                if not request.table_name or f['table_name'] == request.table_name:
+                    table_info += db_loader.describe_for_prompt(f['table_name']) + "\n"
+
+        with span("llm"):
+            sql_res = lm_client.generate_sql_query(request.question, table_info)
+        if sql_res["status"] != "success":
+            raise HTTPException(status_code=500, detail="SQL 생성 실패")
+
+        try:
+            with span("sql") as current:
+                result = db_loader.execute_sql_paged(sql_res["sql"])
+                current.set(rows=result.get("row_count"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except TimeoutError as e:
+            raise HTTPException(status_code=408, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"SQL 실행 실패: {e}")
+    return {"sql": sql_res["sql"], **result, "trace_id": root.trace_id}
+
+async def get_sql_page(cursor_id: str):
+    """SQL 결과 다음 페이지 조회"""
+    try:
+        return db_loader.fetch_sql_page(cursor_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except TimeoutError as e:
+        raise HTTPException(status_code=408, detail=str(e))
+
+async def get_sql_stats():
+    """최근 SQL 실행 시간 통계"""
+    return db_loader.sql_executor.get_query_stats()
 
 # --- OCR 관련 함수 ---
 
@@ -156,12 +373,95 @@ async def process_single_ocr(request: OCRProcessRequest):
 async def process_batch_ocr(request: OCRBatchRequest):
     """폴더 단위 배치 OCR 처리"""
     try:
-        ocr_engine.batch_organize_images(request.folder_path, request.max_length, request.log_filename)
+        stats = ocr_engine.batch_organize_images(
+            request.folder_path, request.max_length, request.log_filename,
+            workers=request.workers, batch_size=request.batch_size
+        )
         log_path = os.path.join(request.folder_path, request.log_filename)
-        return {"status": "success", "message": "배치 작업 완료", "log_path": log_path}
+        return {"status": "success", "message": "배치 작업 완료", "log_path": log_path, "stats": stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def submit_ocr_job(request: OCRBatchRequest):
+    """폴더 OCR을 백그라운드 작업으로 등록"""
+    if request.profile is not None and request.profile not in PROFILE_KINDS:
+        raise HTTPException(status_code=400, detail=f"profile은 {', '.join(PROFILE_KINDS)} 중 하나여야 합니다.")
+    try:
+        return ocr_jobs.submit(
+            request.folder_path,
+            max_length=request.max_length,
+            log_filename=request.log_filename,
+            workers=request.workers,
+            batch_size=request.batch_size,
+            profile=request.profile
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+async def list_ocr_jobs():
+    """OCR 작업 목록"""
+    return {"jobs": ocr_jobs.list_jobs()}
+
+async def get_ocr_job(job_id: str, include_events: bool = False):
+    """OCR 작업 진행 상황 조회"""
+    job = ocr_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return job.to_dict(include_events=include_events)
+
+async def cancel_ocr_job(job_id: str):
+    """OCR 작업 취소"""
+    if not ocr_jobs.cancel(job_id):
+        raise HTTPException(status_code=400, detail=f"취소할 수 없는 작업입니다: {job_id}")
+    return {"status": "success", "message": f"Job {job_id} cancel requested"}
+
+async def stream_ocr_job_events(job_id: str):
+    """OCR 작업 진행 상황을 SSE로 전송"""
+    job = ocr_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+
+    async def events():
+        sent = 0
+        while True:
+            new_events = job.events[sent:]
+            for event in new_events:
+                yield f"event: file\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            sent += len(new_events)
+            yield f"event: progress\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+            if job.finished_at and sent >= len(job.events):
+                yield f"event: end\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+                break
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+def _recognize_with_stats(paths: List[str], batch_size: int):
+    """배치 인식 결과와 그 실행의 통계 (다음 실행이 last_batch_stats를 덮어쓰기 전에 복사)"""
+    outputs = ocr_engine.recognize_batch(paths, batch_size)
+    return outputs, dict(ocr_engine.last_batch_stats)
+
+async def recognize_batch_ocr(request: OCRRecognizeBatchRequest):
+    """여러 이미지를 배치 추론으로 인식하여 텍스트 결과 반환 (파일명 변경 없음)"""
+    try:
+        # 디코딩/인식은 이벤트 루프 밖에서, OCR 작업 큐의 동시 실행 제한을 지켜 실행
+        outputs, stats = await asyncio.wrap_future(
+            ocr_jobs.run_exclusive(_recognize_with_stats, request.file_paths, request.batch_size)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    results = []
+    for path, raw in zip(request.file_paths, outputs):
+        if isinstance(raw, Exception):
+            results.append({"file_path": path, "status": "error", "error": str(raw)})
+        else:
+            results.append({
+                "file_path": path,
+                "status": "success",
+                "results": ocr_engine.filter_results(raw, request.min_confidence)
+            })
+    return {"results": results, "stats": stats}
+
 async def process_ocr_to_excel(request: OCRProcessRequest):
     """OCR 수행 후 패턴을 추출하여 엑셀로 저장"""
     try:
@@ -178,6 +478,62 @@ async def process_ocr_to_excel(request: OCRProcessRequest):
         return {"status": "success", "excel_path": excel_path, "data_count": len(results)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def aggregate_ocr_to_output(request: OCRAggregateRequest):
+    """여러 이미지의 OCR 결과를 하나의 엑셀 파일 및/또는 챗봇 DB 테이블로 저장"""
+    from .ocr_processor import VALID_IMAGE_EXTENSIONS
+
+    if request.output not in ("excel", "db", "both"):
+        raise HTTPException(status_code=400, detail="output은 excel, db, both 중 하나여야 합니다.")
+    if request.if_exists not in ("replace", "append"):
+        raise HTTPException(status_code=400, detail="if_exists는 replace 또는 append여야 합니다.")
+    if not request.table_name.replace("_", "").isalnum():
+        raise HTTPException(status_code=400, detail=f"사용할 수 없는 테이블 이름입니다: {request.table_name}")
+
+    if request.file_paths:
+        image_paths = request.file_paths
+    elif request.folder_path and os.path.isdir(request.folder_path):
+        image_paths = sorted(
+            os.path.join(request.folder_path, f) for f in os.listdir(request.folder_path)
+            if f.lower().endswith(VALID_IMAGE_EXTENSIONS)
+        )
+    else:
+        raise HTTPException(status_code=404, detail="유효한 폴더 경로 또는 파일 목록이 필요합니다.")
+    if not image_paths:
+        raise HTTPException(status_code=400, detail="처리할 이미지가 없습니다.")
+
+    output_path = None
+    if request.output in ("excel", "both"):
+        output_path = request.output_path or os.path.join(
+            request.folder_path or os.path.dirname(image_paths[0]), "ocr_results.xlsx"
+        )
+    try:
+        # 폴더 전체 OCR은 오래 걸리므로 이벤트 루프 밖에서, OCR 작업 큐의 동시 실행 제한을 지켜 실행
+        return await asyncio.wrap_future(ocr_jobs.run_exclusive(
+            aggregate_ocr_results,
+            ocr_engine,
+            image_paths,
+            output_path=output_path,
+            db_loader=db_loader if request.output in ("db", "both") else None,
+            table_name=request.table_name,
+            min_confidence=request.min_confidence,
+            batch_size=request.batch_size,
+            if_exists=request.if_exists
+        ))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def get_watcher_status():
+    """폴더 감시 상태 조회"""
+    return folder_watcher.stats()
+
+async def get_ocr_cache_stats():
+    """OCR 캐시 상태 조회"""
+    if ocr_engine.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **ocr_engine.cache.stats()}
+
 async def get_local_image(path: str):
     """로컬 이미지 파일을 미리보기용으로 반환"""
     if not os.path.exists(path):
@@ -1,32 +1,45 @@
 """
 엑셀 데이터를 SQLite DB로 변환하는 모듈
 """
+import logging
 import sqlite3
 import os
-from typing import List, Dict, Any, Optional
+import json
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from pathlib import Path
 
+from .sql_executor import SafeSQLExecutor
+from . import table_stats
+from src.utils.metrics import SQLITE_SECONDS
+
 try:
     import pandas as pd
     PANDAS_AVAILABLE = True
 except ImportError:
     PANDAS_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
 
 class ExcelToDBLoader:
     """엑셀 파일을 SQLite DB로 변환하는 클래스"""
 
-    def __init__(self, db_path: str = "chatbot_data.db"):
+    def __init__(self, db_path: str = "chatbot_data.db", arrow_dir: Optional[str] = None):
         """
         Args:
             db_path: SQLite 데이터베이스 파일 경로
+            arrow_dir: parquet_export의 Arrow 캐시 폴더 (<export_dir>/arrow, None이면 사용 안 함)
         """
         self.db_path = db_path
+        self.arrow_dir = arrow_dir
         self._init_db()
+        self.sql_executor = SafeSQLExecutor(db_path)
 
     def _init_db(self):
         """데이터베이스 초기화 - 메타데이터 테이블 생성"""
         with sqlite3.connect(self.db_path) as conn:
+            # SQL 페이지 커서가 읽기 연결을 열어 두는 동안에도 엑셀 적재(쓰기)가 막히지 않도록 WAL 사용
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
             # 로드된 파일 메타데이터 테이블
             cursor.execute("""
@@ -42,6 +55,16 @@ class ExcelToDBLoader:
                     loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            # 로드 시점에 계산한 테이블/컬럼 통계 캐시
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS table_stats (
+                    table_name TEXT PRIMARY KEY,
+                    row_count INTEGER,
+                    column_stats TEXT,
+                    sample_data TEXT,
+                    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
             conn.commit()
 
     def load_excel_to_db(
@@ -84,6 +107,21 @@ class ExcelToDBLoader:
         except Exception as e:
             raise Exception(f"엑셀 파일 읽기 실패: {e}")
 
+        return self._store_dataframe(df, excel_path, file_name, sheet_name, table_name)
+
+    def _store_dataframe(
+        self,
+        df: "pd.DataFrame",
+        source_path: str,
+        file_name: str,
+        sheet_name: str,
+        table_name: str,
+        if_exists: str = "replace"
+    ) -> Dict[str, Any]:
+        """
+        DataFrame을 테이블로 저장하고 메타데이터/통계 기록
+        if_exists="append"면 기존 테이블 뒤에 추가하고, 통계는 처음 만들 때 계산한 값을 두고 행 수만 갱신
+        """
         # 컬럼명 정리 (공백, 특수문자 처리)
         df.columns = [
             "".join(c if c.isalnum() or c == '_' else '_' for c in str(col))
@@ -91,9 +129,18 @@ class ExcelToDBLoader:
         ]
 
         # SQLite에 저장
-        with sqlite3.connect(self.db_path) as conn:
-            # 기존 테이블 삭제 후 새로 생성
-            df.to_sql(table_name, conn, if_exists='replace', index=False)
+        with SQLITE_SECONDS.labels(operation="load").time(), sqlite3.connect(self.db_path) as conn:
+            has_stats = conn.execute("SELECT 1 FROM table_stats WHERE table_name = ?", (table_name,)).fetchone()
+            # replace: 기존 테이블 삭제 후 새로 생성 / append: 기존 테이블에 추가 (없으면 생성)
+            df.to_sql(table_name, conn, if_exists=if_exists, index=False)
+            row_count = len(df)
+            if if_exists == "replace" or has_stats is None:
+                # 컬럼 통계 (요약/프롬프트 생성 시 재계산하지 않도록 로드 시점에 계산)
+                self._save_stats(conn, table_name, row_count, table_stats.compute_column_stats(df),
+                                 table_stats.sample_rows(df))
+            if if_exists == "append":
+                row_count = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+                conn.execute("UPDATE table_stats SET row_count = ? WHERE table_name = ?", (row_count, table_name))
 
             # 메타데이터 저장
             cursor = conn.cursor()
@@ -102,11 +149,11 @@ class ExcelToDBLoader:
                 (file_path, file_name, sheet_name, table_name, row_count, column_count, columns)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
-                excel_path,
+                source_path,
                 file_name,
                 sheet_name,
                 table_name,
-                len(df),
+                row_count,
                 len(df.columns),
                 ",".join(df.columns)
             ))
@@ -114,13 +161,83 @@ class ExcelToDBLoader:
 
         return {
             "status": "success",
-            "file_path": excel_path,
+            "file_path": source_path,
             "table_name": table_name,
-            "row_count": len(df),
+            "row_count": row_count,
             "column_count": len(df.columns),
             "columns": list(df.columns)
         }
 
+    def list_arrow_caches(self) -> List[Dict[str, Any]]:
+        """parquet_export가 만든 Arrow 캐시 목록 (이름별 최신 버전)"""
+        from src.excel.parquet_export import list_arrow_caches
+
+        if not self.arrow_dir:
+            return []
+        return [
+            {"name": name, "arrow_path": path, "size": os.path.getsize(path)}
+            for name, path in list_arrow_caches(self.arrow_dir).items()
+        ]
+
+    def browse_arrow_cache(
+        self,
+        name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Arrow 캐시를 SQLite로 옮기지 않고 memory-map으로 바로 페이지 조회
+
+        Args:
+            name: 캐시 이름 (<파일명>__<시트명>)
+            columns: 조회할 컬럼 (None이면 전체)
+            filters: (컬럼, 연산자, 값) 조건 리스트 - FILTER_OPERATORS와 같은 연산자
+            offset: 건너뛸 행 수
+            limit: 페이지 크기
+
+        Returns:
+            {"name", "columns", "data", "total_rows", "next_offset"}
+        """
+        from src.excel.parquet_export import list_arrow_caches, query_arrow_cache
+
+        path = list_arrow_caches(self.arrow_dir).get(name) if self.arrow_dir else None
+        if path is None:
+            raise KeyError(f"Arrow 캐시를 찾을 수 없습니다: {name}")
+        return {"name": name, **query_arrow_cache(path, columns, filters, offset, limit)}
+
+    def load_records(
+        self,
+        records: List[Dict[str, Any]],
+        table_name: str,
+        source_path: str,
+        file_name: str = "OCR",
+        columns: Optional[List[str]] = None,
+        if_exists: str = "replace"
+    ) -> Dict[str, Any]:
+        """
+        엑셀 이외의 데이터(OCR 결과 등)를 테이블로 로드
+
+        Args:
+            records: 행 딕셔너리 리스트
+            table_name: 생성할 테이블 이름
+            source_path: loaded_files에 기록할 출처 (테이블마다 고유해야 함)
+            file_name: loaded_files에 기록할 파일명
+            columns: 컬럼 순서 (None이면 첫 행 기준)
+            if_exists: replace(기존 테이블 교체) / append(기존 테이블에 추가, 나눠서 저장할 때)
+
+        Returns:
+            로드 결과 정보 (row_count는 저장 후 테이블 전체 행 수)
+        """
+        if not PANDAS_AVAILABLE:
+            raise ImportError("pandas 라이브러리가 필요합니다. 'pip install pandas'를 실행하세요.")
+        if if_exists not in ("replace", "append"):
+            raise ValueError(f"if_exists는 replace 또는 append여야 합니다: {if_exists}")
+
+        df = pd.DataFrame(records, columns=columns)
+        return self._store_dataframe(df, source_path, file_name, table_name, table_name, if_exists)
+
     def load_all_sheets(self, excel_path: str) -> List[Dict[str, Any]]:
         """
         엑셀 파일의 모든 시트를 각각의 테이블로 로드
@@ -173,6 +290,137 @@ class ExcelToDBLoader:
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in rows]
 
+    # 필터 연산자 -> SQL 조건 (값이 필요 없는 연산자는 None 값 사용)
+    FILTER_OPERATORS = {
+        "eq": "= ?", "ne": "!= ?", "lt": "< ?", "le": "<= ?", "gt": "> ?", "ge": ">= ?",
+        "like": "LIKE ?", "isnull": "IS NULL", "notnull": "IS NOT NULL"
+    }
+
+    def _build_select(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None
+    ) -> Tuple[str, List[str], str, List[Any]]:
+        """
+        컬럼/필터를 실제 스키마로 검증한 뒤 SELECT 절과 WHERE 조건 생성
+
+        Returns:
+            (select 절, 선택된 컬럼 리스트, where 조건, 파라미터)
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,))
+        if cursor.fetchone() is None:
+            raise KeyError(f"테이블을 찾을 수 없습니다: {table_name}")
+
+        cursor.execute(f'PRAGMA table_info("{table_name}")')
+        all_columns = [row[1] for row in cursor.fetchall()]
+
+        selected = columns or all_columns
+        unknown = [c for c in selected if c not in all_columns]
+        if unknown:
+            raise ValueError(f"존재하지 않는 컬럼: {', '.join(unknown)}")
+
+        conditions, params = [], []
+        for col, op, value in filters or []:
+            if col not in all_columns:
+                raise ValueError(f"존재하지 않는 컬럼: {col}")
+            if op not in self.FILTER_OPERATORS:
+                raise ValueError(f"지원하지 않는 필터 연산자: {op}")
+            conditions.append(f'"{col}" {self.FILTER_OPERATORS[op]}')
+            if "?" in self.FILTER_OPERATORS[op]:
+                params.append(value)
+
+        select_clause = ", ".join(f'"{c}"' for c in selected)
+        where_clause = " AND ".join(conditions)
+        return select_clause, selected, where_clause, params
+
+    def browse_table(
+        self,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+        after: Optional[int] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        rowid 기반 keyset 페이지 조회 (OFFSET 없이 일정한 속도)
+
+        Args:
+            table_name: 테이블 이름
+            columns: 조회할 컬럼 (None이면 전체)
+            filters: (컬럼, 연산자, 값) 조건 리스트 - SQL WHERE로 전달됨
+            after: 이전 페이지의 next_after 값 (None이면 처음부터)
+            limit: 페이지 크기
+
+        Returns:
+            {"columns", "data", "next_after"} - next_after가 None이면 마지막 페이지
+        """
+        limit = max(1, limit)  # 0 / 음수면 다음 페이지 기준 rowid가 없음
+        with SQLITE_SECONDS.labels(operation="browse").time(), sqlite3.connect(self.db_path) as conn:
+            select_clause, selected, where_clause, params = self._build_select(
+                conn, table_name, columns, filters
+            )
+            conditions = [where_clause] if where_clause else []
+            if after is not None:
+                conditions.append("rowid > ?")
+                params.append(after)
+            where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            cursor = conn.cursor()
+            cursor.execute(
+                f'SELECT rowid, {select_clause} FROM "{table_name}" {where_sql} ORDER BY rowid LIMIT ?',
+                params + [limit + 1]
+            )
+            rows = cursor.fetchmany(limit + 1)
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "table_name": table_name,
+            "columns": selected,
+            "data": [dict(zip(selected, row[1:])) for row in rows],
+            "next_after": rows[-1][0] if has_more else None
+        }
+
+    def iter_table_rows(
+        self,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+        batch_size: int = 1000
+    ) -> Tuple[List[Tuple[str, str]], Iterator[List[tuple]]]:
+        """
+        테이블 전체를 batch_size 단위로 스트리밍 (메모리 사용량 일정)
+
+        Returns:
+            ([(컬럼명, 선언 타입)], 행 배치 이터레이터)
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            # 검증은 스트리밍 시작 전에 수행해 잘못된 요청을 즉시 거부
+            select_clause, selected, where_clause, params = self._build_select(
+                conn, table_name, columns, filters
+            )
+            types = {row[1]: row[2] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+        schema = [(col, types.get(col, "")) for col in selected]
+        where_sql = f"WHERE {where_clause}" if where_clause else ""
+        sql = f'SELECT {select_clause} FROM "{table_name}" {where_sql} ORDER BY rowid'
+
+        def batches() -> Iterator[List[tuple]]:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            try:
+                cursor = conn.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                conn.close()
+
+        return schema, batches()
+
     def search_data(self, query: str, table_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         데이터 검색 (간단한 LIKE 검색)
@@ -186,7 +434,7 @@ class ExcelToDBLoader:
         """
         results = []
 
-        with sqlite3.connect(self.db_path) as conn:
+        with SQLITE_SECONDS.labels(operation="search").time(), sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
 
             # 검색할 테이블 목록
@@ -236,28 +484,113 @@ class ExcelToDBLoader:
 
     def execute_sql(self, sql: str) -> List[Dict[str, Any]]:
         """
-        SQL 쿼리 직접 실행 (SELECT만 허용)
+        SQL 쿼리 직접 실행 (SELECT만 허용, 첫 페이지만 반환)
+
+        Args:
+            sql: SQL 쿼리문
+
+        Returns:
+            쿼리 결과 (최대 sql_executor.page_size 행)
+        """
+        return self.sql_executor.execute(sql, keep_cursor=False)["data"]
+
+    def execute_sql_paged(self, sql: str) -> Dict[str, Any]:
+        """
+        SQL 쿼리를 읽기 전용 연결에서 시간/행 수 제한을 두고 실행
 
         Args:
             sql: SQL 쿼리문
 
         Returns:
-            쿼리 결과
+            첫 페이지 결과와 다음 페이지 커서 (next_cursor)
         """
-        # SELECT만 허용
-        sql_upper = sql.strip().upper()
-        if not sql_upper.startswith("SELECT"):
-            raise ValueError("SELECT 쿼리만 실행할 수 있습니다.")
+        return self.sql_executor.execute(sql)
+
+    def fetch_sql_page(self, cursor_id: str) -> Dict[str, Any]:
+        """execute_sql_paged 결과의 다음 페이지 조회"""
+        return self.sql_executor.fetch_page(cursor_id)
 
+    def _save_stats(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        row_count: int,
+        column_stats: List[Dict[str, Any]],
+        sample_data: List[Dict[str, Any]]
+    ):
+        """테이블 통계 저장 (테이블이 교체될 때마다 갱신)"""
+        conn.execute("""
+            INSERT OR REPLACE INTO table_stats (table_name, row_count, column_stats, sample_data)
+            VALUES (?, ?, ?, ?)
+        """, (
+            table_name,
+            row_count,
+            json.dumps(column_stats, ensure_ascii=False),
+            json.dumps(sample_data, ensure_ascii=False)
+        ))
+
+    def get_table_stats(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """저장된 테이블 통계 조회 (없으면 None)"""
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            rows = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            return [dict(zip(columns, row)) for row in rows]
+            row = conn.execute(
+                "SELECT row_count, column_stats, sample_data, computed_at FROM table_stats WHERE table_name = ?",
+                (table_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "row_count": row[0],
+            "column_stats": json.loads(row[1]),
+            "sample_data": json.loads(row[2]),
+            "computed_at": row[3]
+        }
+
+    def refresh_table_stats(self, table_name: str) -> Dict[str, Any]:
+        """기존 테이블의 통계를 다시 계산 (통계 도입 이전에 로드된 테이블용)"""
+        if not PANDAS_AVAILABLE:
+            raise ImportError("pandas가 설치되어 있지 않습니다.")
+        with sqlite3.connect(self.db_path) as conn:
+            df = pd.read_sql_query(f'SELECT * FROM "{table_name}"', conn)
+            column_stats = table_stats.compute_column_stats(df)
+            self._save_stats(conn, table_name, len(df), column_stats, table_stats.sample_rows(df))
+            conn.commit()
+        return self.get_table_stats(table_name)
+
+    def _stats_or_backfill(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        저장된 통계 조회, 없으면(통계 도입 이전에 로드된 테이블) 한 번 계산해 저장
+        pandas가 없거나 계산에 실패하면 None
+        """
+        stats = self.get_table_stats(table_name)
+        if stats is not None or not PANDAS_AVAILABLE:
+            return stats
+        try:
+            return self.refresh_table_stats(table_name)
+        except Exception as e:  # 테이블이 없거나 읽기 실패 -> 직접 조회로 대체
+            logger.warning("테이블 통계 계산 실패 (%s): %s", table_name, e)
+            return None
+
+    def describe_for_prompt(self, table_name: str) -> str:
+        """SQL 생성 프롬프트용 테이블 설명 (통계가 없으면 컬럼 이름만)"""
+        stats = self._stats_or_backfill(table_name)
+        if stats is None:
+            columns = [c["name"] for c in self.get_table_schema(table_name)]
+            return f"Table: {table_name}, Columns: {columns}"
+        return table_stats.format_stats_for_prompt(table_name, stats["column_stats"])
 
     def get_data_summary(self, table_name: str) -> Dict[str, Any]:
-        """테이블 데이터 요약 정보"""
+        """테이블 데이터 요약 정보 (저장된 통계 사용, 없으면 계산해 저장하고 pandas가 없을 때만 직접 조회)"""
+        stats = self._stats_or_backfill(table_name)
+        if stats is not None:
+            return {
+                "table_name": table_name,
+                "row_count": stats["row_count"],
+                "columns": [{"name": c["name"], "type": c["type"]} for c in stats["column_stats"]],
+                "sample_data": stats["sample_data"],
+                "column_stats": stats["column_stats"],
+                "computed_at": stats["computed_at"]
+            }
+
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
 
@@ -282,7 +615,6 @@ class ExcelToDBLoader:
                 "sample_data": sample_data
             }
 
-
 # 사용 예시
 if __name__ == "__main__":
     loader = ExcelToDBLoader("chatbot_data.db")
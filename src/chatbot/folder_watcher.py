@@ -0,0 +1,306 @@
+"""
+폴더 감시 모듈
+지정한 폴더에 새로 생긴 이미지는 OCR로, 새로 생기거나 바뀐 엑셀 파일은 DB 로드로 전달
+- 파일 시스템 이벤트 감시 (watchdog: Linux inotify / Windows ReadDirectoryChangesW), 없으면 주기적 스캔
+- 쓰기 중인 파일은 크기/수정 시각이 일정 시간 변하지 않을 때까지 대기 (debounce)
+- 크기 제한이 있는 큐: 처리가 밀리면 파일을 대기 목록에 두고 큐에 자리가 날 때까지 넣지 않음
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+# 엑셀 잠금 파일(~$), 임시 저장 파일 등은 무시
+IGNORED_PREFIXES = ('~$', '.~')
+IGNORED_SUFFIXES = ('.tmp', '.part', '.crdownload')
+
+
+def _signature(path: str) -> Optional[Tuple[int, float]]:
+    """(크기, 수정 시각) - 파일이 없으면 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime
+
+
+if WATCHDOG_AVAILABLE:
+    class _EventHandler(FileSystemEventHandler):
+        def __init__(self, notify: Callable[[str], None]):
+            self._notify = notify
+
+        def on_created(self, event):
+            if not event.is_directory:
+                self._notify(event.src_path)
+
+        def on_modified(self, event):
+            if not event.is_directory:
+                self._notify(event.src_path)
+
+        def on_moved(self, event):
+            if not event.is_directory:
+                self._notify(event.dest_path)
+
+
+class FolderWatcher:
+    """폴더를 감시해 새 이미지/엑셀 파일을 처리 함수에 전달"""
+
+    def __init__(
+        self,
+        image_dirs: List[str],
+        excel_dirs: List[str],
+        on_images: Callable[[List[str]], List[str]],
+        on_workbook: Callable[[str], Any],
+        debounce: float = 2.0,
+        poll_interval: float = 5.0,
+        queue_size: int = 256,
+        image_batch_size: int = 8,
+        use_events: bool = True,
+        max_handled: int = 10000
+    ):
+        """
+        Args:
+            image_dirs: 이미지 감시 폴더
+            excel_dirs: 엑셀 감시 폴더
+            on_images: 이미지 경로 리스트 처리 함수 (처리 후 파일 경로 리스트 반환 - 이름 변경 이벤트 무시용)
+            on_workbook: 엑셀 파일 1개 처리 함수
+            debounce: 마지막 변경 후 이 시간(초) 동안 크기/수정 시각이 그대로여야 처리
+            poll_interval: 이벤트 감시를 사용할 수 없을 때 폴더 스캔 간격(초)
+            queue_size: 종류별 처리 대기 큐 크기
+            image_batch_size: OCR에 한 번에 넘길 최대 이미지 수
+            use_events: False면 watchdog이 있어도 주기적 스캔 사용 (네트워크 드라이브 등)
+            max_handled: 중복 이벤트 확인용으로 기억할 처리 완료 파일 수 (오래된 것부터 잊음)
+        """
+        self.image_dirs = [os.path.abspath(d) for d in image_dirs]
+        self.excel_dirs = [os.path.abspath(d) for d in excel_dirs]
+        self.on_images = on_images
+        self.on_workbook = on_workbook
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.image_batch_size = image_batch_size
+        self.max_handled = max_handled
+        self.mode = "watchdog" if use_events and WATCHDOG_AVAILABLE else "polling"
+
+        self._image_queue: "queue.Queue[str]" = queue.Queue(maxsize=queue_size)
+        self._excel_queue: "queue.Queue[str]" = queue.Queue(maxsize=queue_size)
+        # 경로 -> (마지막 이벤트 시각, 마지막으로 확인한 서명)
+        self._pending: Dict[str, Tuple[float, Optional[Tuple[int, float]]]] = {}
+        # 경로 -> 처리한 시점의 서명 (같은 내용에 대한 중복 이벤트 무시, LRU로 max_handled개까지)
+        self._handled: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._observer = None
+        self._counters = {"images": 0, "workbooks": 0, "errors": 0, "backpressure": 0}
+        self.last_error: Optional[str] = None
+
+    # --- 분류 ---
+
+    def _kind(self, path: str) -> Optional[str]:
+        name = os.path.basename(path)
+        lower = name.lower()
+        if name.startswith(IGNORED_PREFIXES) or lower.endswith(IGNORED_SUFFIXES):
+            return None
+        directory = os.path.dirname(os.path.abspath(path))
+        if lower.endswith(IMAGE_EXTENSIONS) and directory in self.image_dirs:
+            return "image"
+        if lower.endswith(EXCEL_EXTENSIONS) and directory in self.excel_dirs:
+            return "excel"
+        return None
+
+    # --- 이벤트 수신 ---
+
+    def _notify(self, path: str):
+        """파일 변경 알림 (감시 스레드에서 호출, 가볍게 유지)"""
+        path = os.path.abspath(path)
+        if self._kind(path) is None:
+            return
+        with self._lock:
+            previous = self._pending.get(path)
+            self._pending[path] = (time.monotonic(), previous[1] if previous else None)
+
+    def _snapshot(self, directories: List[str]) -> Dict[str, Tuple[int, float]]:
+        snapshot = {}
+        for directory in directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            st = entry.stat()
+                            snapshot[entry.path] = (st.st_size, st.st_mtime)
+            except OSError:
+                continue
+        return snapshot
+
+    def _poll_loop(self):
+        """이벤트 감시를 사용할 수 없을 때: 주기적으로 폴더를 스캔해 바뀐 파일 알림"""
+        directories = sorted(set(self.image_dirs + self.excel_dirs))
+        known = self._snapshot(directories)  # 시작 시점에 있던 파일은 처리하지 않음
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot(directories)
+            for path, sig in current.items():
+                if known.get(path) != sig:
+                    self._notify(path)
+            known = current
+
+    # --- debounce / 큐 투입 ---
+
+    def _is_handled(self, path: str, sig: Tuple[int, float]) -> bool:
+        with self._lock:
+            if self._handled.get(path) != sig:
+                return False
+            self._handled.move_to_end(path)
+            return True
+
+    def _mark_handled(self, path: str, sig: Tuple[int, float]):
+        with self._lock:
+            self._handled[path] = sig
+            self._handled.move_to_end(path)
+            while len(self._handled) > self.max_handled:
+                self._handled.popitem(last=False)
+
+    def _settle_loop(self):
+        """변경이 멈춘 파일을 큐에 넣음 (큐가 가득 차면 대기 목록에 그대로 둠)"""
+        interval = min(0.5, self.debounce / 2) if self.debounce else 0.1
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            with self._lock:
+                candidates = list(self._pending.items())
+
+            for path, (last_event, last_sig) in candidates:
+                if now - last_event < self.debounce:
+                    continue
+                sig = _signature(path)
+                if sig is None:  # 삭제되었거나 이름이 바뀜
+                    with self._lock:
+                        self._pending.pop(path, None)
+                    continue
+                if sig != last_sig:  # 아직 쓰는 중일 수 있으므로 한 번 더 확인
+                    with self._lock:
+                        if path in self._pending:
+                            self._pending[path] = (now, sig)
+                    continue
+                if self._is_handled(path, sig):
+                    with self._lock:
+                        self._pending.pop(path, None)
+                    continue
+
+                target = self._image_queue if self._kind(path) == "image" else self._excel_queue
+                try:
+                    target.put_nowait(path)
+                except queue.Full:
+                    self._counters["backpressure"] += 1
+                    continue  # 대기 목록에 남겨 두고 다음 주기에 다시 시도
+                with self._lock:
+                    if self._pending.get(path, (None, None))[1] == sig:
+                        self._pending.pop(path, None)
+                self._mark_handled(path, sig)
+
+    # --- 처리 ---
+
+    def _image_worker(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._image_queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.image_batch_size:
+                try:
+                    batch.append(self._image_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                for new_path in self.on_images(batch) or []:
+                    # OCR 후 이름이 바뀐 파일은 새 파일로 다시 처리하지 않음
+                    sig = _signature(new_path)
+                    if sig is not None:
+                        self._mark_handled(os.path.abspath(new_path), sig)
+                self._counters["images"] += len(batch)
+            except Exception as e:
+                self._counters["errors"] += 1
+                self.last_error = f"{batch}: {e}"
+                logger.exception("폴더 감시 OCR 처리 중 오류: %s", e)
+
+    def _excel_worker(self):
+        while not self._stop.is_set():
+            try:
+                path = self._excel_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self.on_workbook(path)
+                self._counters["workbooks"] += 1
+            except Exception as e:
+                self._counters["errors"] += 1
+                self.last_error = f"{path}: {e}"
+                logger.exception("폴더 감시 엑셀 로드 중 오류 (%s): %s", path, e)
+
+    # --- 시작/종료 ---
+
+    def start(self):
+        """감시 시작 (존재하지 않는 폴더는 건너뜀, stop 후 다시 시작 가능)"""
+        if self._threads:
+            return  # 이미 실행 중
+        directories = [d for d in sorted(set(self.image_dirs + self.excel_dirs)) if os.path.isdir(d)]
+        if not directories:
+            logger.warning("감시할 폴더가 없어 폴더 감시를 시작하지 않습니다.")
+            return
+
+        self._stop.clear()
+        if self.mode == "watchdog":
+            self._observer = Observer()
+            handler = _EventHandler(self._notify)
+            for directory in directories:
+                self._observer.schedule(handler, directory, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            self._threads.append(threading.Thread(target=self._poll_loop, name="watch-poll", daemon=True))
+
+        self._threads += [
+            threading.Thread(target=self._settle_loop, name="watch-settle", daemon=True),
+            threading.Thread(target=self._image_worker, name="watch-ocr", daemon=True),
+            threading.Thread(target=self._excel_worker, name="watch-excel", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("폴더 감시 시작 (%s): %s", self.mode, ", ".join(directories))
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+            self._observer = None
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "mode": self.mode,
+            "running": bool(self._threads) and not self._stop.is_set(),
+            "image_dirs": self.image_dirs,
+            "excel_dirs": self.excel_dirs,
+            "pending": pending,
+            "image_queue": self._image_queue.qsize(),
+            "excel_queue": self._excel_queue.qsize(),
+            **self._counters,
+            "last_error": self.last_error,
+        }
@@ -3,8 +3,11 @@ LM Studio API 클라이언트
 LM Studio는 OpenAI 호환 API를 제공하므로 동일한 방식으로 호출 가능
 """
 import json
+import time
 from typing import List, Dict, Any, Optional, Generator
 
+from src.utils.metrics import LLM_SECONDS, LLM_TOKENS, LLM_TOKENS_PER_SECOND
+
 try:
     import requests
     REQUESTS_AVAILABLE = True
@@ -12,6 +15,15 @@ except ImportError:
     REQUESTS_AVAILABLE = False
 
 
+def _record_request(endpoint: str, elapsed: float, ok: bool, completion_tokens: Optional[int] = None):
+    """요청 지연 시간 / 생성 토큰 수 / 초당 토큰 수 기록"""
+    LLM_SECONDS.labels(endpoint=endpoint, outcome="success" if ok else "error").observe(elapsed)
+    if ok and completion_tokens:
+        LLM_TOKENS.labels(endpoint=endpoint).inc(completion_tokens)
+        if elapsed > 0:
+            LLM_TOKENS_PER_SECOND.labels(endpoint=endpoint).observe(completion_tokens / elapsed)
+
+
 class LMStudioClient:
     """LM Studio API 클라이언트"""
 
@@ -112,6 +124,16 @@ class LMStudioClient:
             "content": message
         })
 
+        start = time.perf_counter()
+        result = self._complete(messages, temperature, max_tokens)
+        _record_request(
+            "chat", time.perf_counter() - start, result["status"] == "success",
+            (result.get("usage") or {}).get("completion_tokens")
+        )
+        return result
+
+    def _complete(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> Dict[str, Any]:
+        """chat/completions 호출 (스트리밍 없음)"""
         try:
             response = requests.post(
                 f"{self.base_url}/chat/completions",
@@ -197,6 +219,9 @@ class LMStudioClient:
             "content": message
         })
 
+        start = time.perf_counter()
+        chunks = 0  # 스트리밍 응답은 usage가 없으므로 조각 수를 토큰 수로 근사
+        ok = True
         try:
             response = requests.post(
                 f"{self.base_url}/chat/completions",
@@ -224,12 +249,16 @@ class LMStudioClient:
                             delta = data["choices"][0].get("delta", {})
                             content = delta.get("content", "")
                             if content:
+                                chunks += 1
                                 yield content
                         except json.JSONDecodeError:
                             continue
 
         except Exception as e:
+            ok = False
             yield f"\n[오류: {str(e)}]"
+        finally:
+            _record_request("chat_stream", time.perf_counter() - start, ok, chunks)
 
     def generate_sql_query(
         self,
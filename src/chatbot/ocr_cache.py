@@ -0,0 +1,219 @@
+"""
+OCR 결과 캐시
+이미지 내용 해시 + 언어 + 모델 버전 + 인식 설정을 키로 readtext 원본 결과를 SQLite에 저장
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+
+def content_hash(data: bytes) -> str:
+    """이미지 바이트의 내용 해시"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def easyocr_version() -> str:
+    """설치된 easyocr 버전 (easyocr를 import하지 않고 조회, 프로세스당 1번만)"""
+    try:
+        from importlib.metadata import version
+        return version("easyocr")
+    except Exception:
+        return "unknown"
+
+
+def normalize_raw_results(raw_results: list) -> list:
+    """readtext 결과의 numpy 값을 JSON 저장 가능한 기본 타입으로 변환"""
+    return [
+        ([[float(x), float(y)] for x, y in bbox], str(text), float(conf))
+        for bbox, text, conf in raw_results
+    ]
+
+
+class OCRResultCache:
+    """
+    크기 제한이 있는 영속 OCR 결과 캐시 (LRU 제거)
+    - 스레드별 SQLite 연결 재사용
+    - 조회 시 last_access 갱신은 모아서 한 번에 기록 (조회가 매번 쓰기가 되지 않도록)
+    - 항목 수/총 크기는 메모리에서 누적하고, 다른 프로세스의 변경을 반영하려고 resync_every번 저장마다 DB와 맞춤
+    """
+
+    def __init__(
+        self,
+        db_path: str = "ocr_cache.db",
+        max_entries: int = 20000,
+        max_bytes: int = 200 * 1024 * 1024,
+        touch_batch_size: int = 64,
+        resync_every: int = 500
+    ):
+        """
+        Args:
+            db_path: 캐시 SQLite 파일 경로
+            max_entries: 최대 항목 수
+            max_bytes: 저장된 결과의 최대 총 크기 (바이트)
+            touch_batch_size: 이 개수만큼 적중이 쌓이면 last_access를 한 번에 기록
+            resync_every: 누적한 항목 수/크기를 DB 값으로 다시 맞추는 저장 횟수 간격
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.touch_batch_size = touch_batch_size
+        self.resync_every = resync_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._touched: Dict[str, float] = {}  # cache_key -> 아직 기록하지 않은 last_access
+        self._count = 0
+        self._bytes = 0
+        self._puts_since_sync = 0
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 (처음 호출할 때만 생성)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # DB 파일에 유지되므로 한 번만 설정
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ocr_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    image_hash TEXT NOT NULL,
+                    results TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_access ON ocr_cache (last_access)")
+        with self._lock:
+            self._sync_totals(conn)
+
+    @staticmethod
+    def make_key(image_hash: str, languages: List[str], settings: Optional[Dict[str, Any]] = None) -> str:
+        """캐시 키: 이미지 해시 + 언어 + 모델 버전 + 인식 설정"""
+        meta = json.dumps({
+            "languages": sorted(languages),
+            "model": easyocr_version(),
+            "settings": settings or {}
+        }, sort_keys=True)
+        return f"{image_hash}:{hashlib.sha1(meta.encode('utf-8')).hexdigest()[:16]}"
+
+    # --- 내부 (self._lock 보유 상태에서 호출) ---
+
+    def _sync_totals(self, conn: sqlite3.Connection):
+        self._count, self._bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()
+        self._puts_since_sync = 0
+
+    def _write_touches(self, conn: sqlite3.Connection):
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        with conn:
+            conn.executemany(
+                "UPDATE ocr_cache SET last_access = ? WHERE cache_key = ?",
+                [(accessed, key) for key, accessed in touched.items()]
+            )
+
+    def _evict(self, conn: sqlite3.Connection):
+        """항목 수/총 크기 제한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+        if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+        self._write_touches(conn)  # 최근 적중이 LRU 순서에 반영되도록 먼저 기록
+        to_delete = []
+        for key, size in conn.execute("SELECT cache_key, size FROM ocr_cache ORDER BY last_access"):
+            if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            self._count -= 1
+            self._bytes -= size
+        with conn:
+            conn.executemany("DELETE FROM ocr_cache WHERE cache_key = ?", to_delete)
+
+    # --- 공개 API ---
+
+    def get(self, cache_key: str) -> Optional[list]:
+        """캐시된 원본 결과 [(bbox, text, confidence)] 조회"""
+        conn = self._connect()
+        row = conn.execute("SELECT results FROM ocr_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[cache_key] = time.time()
+            if len(self._touched) >= self.touch_batch_size:
+                self._write_touches(conn)
+        return [(bbox, text, conf) for bbox, text, conf in json.loads(row[0])]
+
+    def put(self, cache_key: str, raw_results: list):
+        """원본 결과 저장 후 크기 제한 초과분 제거"""
+        payload = json.dumps(normalize_raw_results(raw_results), ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        conn = self._connect()
+        with self._lock:
+            previous = conn.execute("SELECT size FROM ocr_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+            with conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO ocr_cache (cache_key, image_hash, results, size, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (cache_key, cache_key.split(":", 1)[0], payload, size, now, now))
+            self._touched.pop(cache_key, None)
+            self._count += 0 if previous else 1
+            self._bytes += size - (previous[0] if previous else 0)
+            self._puts_since_sync += 1
+            if self._puts_since_sync >= self.resync_every:
+                self._sync_totals(conn)
+            self._evict(conn)
+
+    def flush(self):
+        """모아 둔 last_access 갱신 기록"""
+        conn = self._connect()
+        with self._lock:
+            self._write_touches(conn)
+
+    def clear(self):
+        conn = self._connect()
+        with self._lock:
+            self._touched.clear()
+            with conn:
+                conn.execute("DELETE FROM ocr_cache")
+            self._sync_totals(conn)
+
+    def close(self):
+        """남은 last_access 갱신을 기록하고 모든 스레드의 연결을 닫음"""
+        self.flush()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        with self._lock:
+            self._sync_totals(conn)
+            count, total = self._count, self._bytes
+            lookups = self.hits + self.misses
+            return {
+                "entries": count,
+                "bytes": total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+            }
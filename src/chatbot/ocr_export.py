@@ -0,0 +1,190 @@
+"""
+여러 이미지의 OCR 결과를 하나의 출력으로 모으는 모듈
+- 단일 엑셀 파일 (openpyxl write-only 모드로 스트리밍 저장)
+- 챗봇 SQLite 테이블 (ExcelToDBLoader로 로드해 바로 질의 가능)
+모든 행에 원본 이미지 정보(파일명, 경로, 처리 시각)를 함께 기록
+"""
+import os
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator
+
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+
+PROVENANCE_COLUMNS = ["source_file", "source_path", "processed_at"]
+FIELD_COLUMNS = PROVENANCE_COLUMNS + ["field", "value", "raw", "label", "bbox"]
+
+
+def ocr_columns(field_names: List[str]) -> List[str]:
+    """OCR 박스 행 컬럼: 출처 + 박스 정보 + 필드별 값"""
+    return PROVENANCE_COLUMNS + ["box_index", "text", "confidence", "bbox"] + list(field_names)
+
+
+def ocr_rows(image_path: str, results: List[Dict[str, Any]], extracted: Dict[str, Any],
+             field_names: List[str], processed_at: str) -> Iterator[Dict[str, Any]]:
+    """이미지 1개의 OCR 박스 행 (각 행에는 해당 박스에서 찾은 필드 값만 기록)"""
+    found: Dict[int, Dict[str, List[str]]] = {}
+    for match in extracted["matches"]:
+        found.setdefault(match["box_index"], {}).setdefault(match["field"], []).append(match["raw"])
+
+    for box_index, result in enumerate(results):
+        row = {
+            "source_file": os.path.basename(image_path),
+            "source_path": image_path,
+            "processed_at": processed_at,
+            "box_index": box_index,
+            "text": result["text"],
+            "confidence": round(float(result["confidence"]), 4),
+            "bbox": str(result.get("bbox")),
+        }
+        box_fields = found.get(box_index, {})
+        for name in field_names:
+            row[name] = ", ".join(box_fields.get(name, []))
+        yield row
+
+
+def field_rows(image_path: str, extracted: Dict[str, Any], processed_at: str) -> Iterator[Dict[str, Any]]:
+    """이미지 1개의 추출 필드 행 (라벨과 짝지어진 값 먼저, 이어서 전체 매칭)"""
+    base = {"source_file": os.path.basename(image_path), "source_path": image_path, "processed_at": processed_at}
+    for pair in extracted["pairs"]:
+        yield {**base, "field": pair["field"], "value": pair["value"], "raw": pair["raw"],
+               "label": pair["label"], "bbox": str(pair["value_bbox"])}
+    for match in extracted["matches"]:
+        yield {**base, "field": match["field"], "value": match["value"], "raw": match["raw"],
+               "label": "", "bbox": str(match["bbox"])}
+
+
+class OCRWorkbookWriter:
+    """OCR 결과를 하나의 엑셀 파일에 스트리밍으로 추가 (메모리에 전체 시트를 올리지 않음)"""
+
+    def __init__(self, output_path: str, field_names: List[str]):
+        if not OPENPYXL_AVAILABLE:
+            raise ImportError("openpyxl 라이브러리가 필요합니다. 'pip install openpyxl'을 실행하세요.")
+        self.output_path = output_path
+        self.ocr_columns = ocr_columns(field_names)
+        self._workbook = Workbook(write_only=True)
+        self._ocr_sheet = self._workbook.create_sheet("ocr")
+        self._fields_sheet = self._workbook.create_sheet("fields")
+        self._errors_sheet = self._workbook.create_sheet("errors")
+        self._ocr_sheet.append(self.ocr_columns)
+        self._fields_sheet.append(FIELD_COLUMNS)
+        self._errors_sheet.append(["source_file", "source_path", "error"])
+
+    def add_rows(self, ocr: List[Dict[str, Any]], fields: List[Dict[str, Any]]):
+        for row in ocr:
+            self._ocr_sheet.append([row[c] for c in self.ocr_columns])
+        for row in fields:
+            self._fields_sheet.append([row[c] for c in FIELD_COLUMNS])
+
+    def add_error(self, image_path: str, error: str):
+        self._errors_sheet.append([os.path.basename(image_path), image_path, error])
+
+    def close(self):
+        self._workbook.save(self.output_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def aggregate_ocr_results(
+    ocr_engine,
+    image_paths: List[str],
+    output_path: Optional[str] = None,
+    db_loader=None,
+    table_name: str = "ocr_results",
+    min_confidence: float = 0.6,
+    batch_size: int = 8,
+    chunk_size: int = 64,
+    if_exists: str = "replace"
+) -> Dict[str, Any]:
+    """
+    여러 이미지를 배치 인식하고 결과를 하나의 엑셀 파일 및/또는 DB 테이블로 저장
+    DB에는 청크마다 바로 기록하므로 메모리에는 청크 1개 분량만 유지되고,
+    중간에 실패해도 이미 처리한 청크는 테이블에 남음
+
+    Args:
+        ocr_engine: OnDeviceOCR 인스턴스
+        image_paths: 이미지 경로 리스트
+        output_path: 저장할 엑셀 파일 경로 (None이면 엑셀 저장 안 함)
+        db_loader: ExcelToDBLoader (None이면 DB 저장 안 함)
+        table_name: DB 테이블 이름 (필드는 <table_name>_fields 테이블)
+        min_confidence: 최소 신뢰도
+        batch_size: 인식 모델의 배치 크기
+        chunk_size: 한 번에 인식/추출할 이미지 수 (메모리 사용량 제한)
+        if_exists: replace면 첫 청크가 기존 테이블을 교체하고 이후 청크는 추가,
+                   append면 모든 청크를 기존 테이블 뒤에 추가
+
+    Returns:
+        처리 결과 요약
+    """
+    if output_path is None and db_loader is None:
+        raise ValueError("output_path 또는 db_loader 중 하나는 지정해야 합니다.")
+    if if_exists not in ("replace", "append"):
+        raise ValueError(f"if_exists는 replace 또는 append여야 합니다: {if_exists}")
+
+    extractor = ocr_engine.extractor
+    field_names = extractor.field_names
+    writer = OCRWorkbookWriter(output_path, field_names) if output_path else None
+    source = os.path.dirname(os.path.abspath(image_paths[0])) if image_paths else ""
+    errors: List[Dict[str, str]] = []
+    row_count = 0
+    start = time.perf_counter()
+
+    for offset in range(0, len(image_paths), chunk_size):
+        chunk = image_paths[offset:offset + chunk_size]
+        outputs = ocr_engine.recognize_batch(chunk, batch_size)
+        processed_at = datetime.now().isoformat(timespec="seconds")
+
+        succeeded, batch_results = [], []
+        for path, raw in zip(chunk, outputs):
+            if isinstance(raw, Exception):
+                errors.append({"source_path": path, "error": str(raw)})
+                if writer:
+                    writer.add_error(path, str(raw))
+                continue
+            succeeded.append(path)
+            batch_results.append(ocr_engine.filter_results(raw, min_confidence))
+
+        # 청크 전체를 한 번에 스캔
+        chunk_ocr_rows: List[Dict[str, Any]] = []
+        chunk_field_rows: List[Dict[str, Any]] = []
+        for path, results, extracted in zip(succeeded, batch_results, extractor.extract_batch(batch_results)):
+            ocr = list(ocr_rows(path, results, extracted, field_names, processed_at))
+            fields = list(field_rows(path, extracted, processed_at))
+            row_count += len(ocr)
+            if writer:
+                writer.add_rows(ocr, fields)
+            if db_loader is not None:
+                chunk_ocr_rows.extend(ocr)
+                chunk_field_rows.extend(fields)
+
+        if db_loader is not None:
+            mode = if_exists if offset == 0 else "append"
+            db_loader.load_records(chunk_ocr_rows, table_name, f"{source}::{table_name}",
+                                   columns=ocr_columns(field_names), if_exists=mode)
+            db_loader.load_records(chunk_field_rows, f"{table_name}_fields", f"{source}::{table_name}_fields",
+                                   columns=FIELD_COLUMNS, if_exists=mode)
+
+    summary: Dict[str, Any] = {
+        "images": len(image_paths),
+        "succeeded": len(image_paths) - len(errors),
+        "failed": len(errors),
+        "rows": row_count,
+        "errors": errors,
+    }
+    if writer:
+        writer.close()
+        summary["excel_path"] = output_path
+    if db_loader is not None:
+        summary["tables"] = [table_name, f"{table_name}_fields"]
+    summary["elapsed_sec"] = round(time.perf_counter() - start, 2)
+    return summary
@@ -0,0 +1,262 @@
+"""
+OCR 배치 작업 관리
+폴더 OCR을 백그라운드 작업으로 실행하고 파일별 진행 상황을 저널(JSON lines)에 기록
+- 동시에 실행되는 작업 수 제한
+- 작업 취소
+- 서버 재시작 후 미완료 작업 재개 (저널에 기록된 파일은 건너뜀)
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from src.utils.logging_setup import job_context
+from src.utils.profiling import profile
+
+logger = logging.getLogger(__name__)
+
+
+class OCRJob:
+    """OCR 배치 작업 1개의 상태"""
+
+    def __init__(self, job_id: str, params: Dict[str, Any], created_at: Optional[float] = None):
+        self.job_id = job_id
+        self.params = params
+        self.status = "queued"  # queued / running / completed / cancelled / failed
+        self.created_at = created_at or time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.total = 0
+        self.events: List[Dict[str, Any]] = []  # 파일별 처리 결과
+        self.stats: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def done_files(self) -> set:
+        """이미 처리된 파일명 (원래 이름과 변경된 이름 모두)"""
+        names = set()
+        for event in self.events:
+            names.add(event["file"])
+            if event.get("new_name"):
+                names.add(event["new_name"])
+        return names
+
+    def to_dict(self, include_events: bool = False) -> Dict[str, Any]:
+        processed = len(self.events)
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0
+        eta = None
+        if self.status == "running" and processed and self.total > processed:
+            eta = round(elapsed / processed * (self.total - processed), 1)
+        data = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "folder_path": self.params["folder_path"],
+            "total": self.total,
+            "processed": processed,
+            "succeeded": sum(1 for e in self.events if e["status"] == "success"),
+            "failed": sum(1 for e in self.events if e["status"] == "error"),
+            "elapsed_sec": round(elapsed, 1),
+            "eta_sec": eta,
+            "created_at": self.created_at,
+            "stats": self.stats,
+            "error": self.error,
+        }
+        if include_events:
+            data["events"] = self.events
+        return data
+
+
+class OCRJobManager:
+    """OCR 배치 작업 큐"""
+
+    def __init__(self, ocr_engine, journal_dir: str = "ocr_jobs", max_concurrent: int = 1, max_history: int = 100):
+        """
+        Args:
+            ocr_engine: OnDeviceOCR 인스턴스
+            journal_dir: 작업 저널 저장 폴더
+            max_concurrent: 동시에 실행할 최대 작업 수 (작업 1개가 이미 여러 프로세스를 사용)
+            max_history: 메모리에 유지할 완료 작업 수
+        """
+        self.ocr_engine = ocr_engine
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.max_history = max_history
+        self._jobs: Dict[str, OCRJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="ocr-job")
+        self._shutting_down = False
+
+    # --- 저널 ---
+
+    def _journal_path(self, job_id: str) -> Path:
+        return self.journal_dir / f"{job_id}.jsonl"
+
+    def _append_journal(self, job_id: str, record: Dict[str, Any]):
+        with open(self._journal_path(job_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())  # 비정상 종료 후 재개할 때 기록이 남아 있도록
+
+    # --- 실행 ---
+
+    def _run(self, job: OCRJob):
+        # 작업 중 남긴 로그는 작업별 로그(logs/jobs/<job_id>.jsonl)에도 기록됨
+        # profile 옵션이 있으면 작업 ID로 프로파일 저장 (인식 프로세스 내부는 측정되지 않음)
+        with job_context(job.job_id), profile(job.params.get("profile"), f"ocr {job.params['folder_path']}",
+                                              profile_id=job.job_id):
+            self._run_job(job)
+
+    def _run_job(self, job: OCRJob):
+        if job.cancel_event.is_set():
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            if not self._shutting_down:
+                self._append_journal(job.job_id, {"type": "end", "status": job.status, "ts": job.finished_at})
+            return
+
+        job.status = "running"
+        job.started_at = job.started_at or time.time()
+        params = job.params
+        folder = params["folder_path"]
+
+        skip = job.done_files
+        try:
+            from .ocr_processor import VALID_IMAGE_EXTENSIONS
+            remaining = [
+                f for f in os.listdir(folder)
+                if f.lower().endswith(VALID_IMAGE_EXTENSIONS) and f not in skip
+            ]
+            job.total = len(job.events) + len(remaining)
+
+            def on_progress(event: Dict[str, Any]):
+                event["ts"] = time.time()
+                self._append_journal(job.job_id, {"type": "file", **event})
+                job.events.append(event)
+                if event["status"] == "error":
+                    logger.warning("%s: %s", event["file"], event["error"])
+                else:
+                    logger.info("%s: %s -> %s", event["status"], event["file"], event["new_name"])
+
+            job.stats = self.ocr_engine.batch_organize_images(
+                folder,
+                params.get("max_length", 30),
+                params.get("log_filename", "ocr_batch_process.log"),
+                workers=params.get("workers"),
+                batch_size=params.get("batch_size", 8),
+                progress_callback=on_progress,
+                cancel_event=job.cancel_event,
+                skip_files=skip
+            )
+            job.status = "cancelled" if job.cancel_event.is_set() else "completed"
+        except Exception as e:
+            logger.exception("OCR 작업 실패: %s", job.job_id)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            if self._shutting_down and job.status == "cancelled":
+                # 서버 종료로 중단된 작업은 종료 기록을 남기지 않아 다음 시작 시 재개됨
+                return
+            self._append_journal(job.job_id, {
+                "type": "end", "status": job.status, "stats": job.stats, "error": job.error, "ts": job.finished_at
+            })
+            self._trim_history()
+
+    def _trim_history(self):
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.finished_at]
+            for job in sorted(finished, key=lambda j: j.finished_at)[:-self.max_history or None]:
+                self._jobs.pop(job.job_id, None)
+
+    def submit(self, folder_path: str, **params) -> Dict[str, Any]:
+        """
+        폴더 OCR 작업 등록
+
+        Args:
+            folder_path: 대상 폴더
+            params: max_length, log_filename, workers, batch_size, profile (cpu / memory / all)
+
+        Returns:
+            작업 상태
+        """
+        if not os.path.isdir(folder_path):
+            raise FileNotFoundError(f"'{folder_path}'는 유효한 폴더 경로가 아닙니다.")
+        job = OCRJob(uuid.uuid4().hex[:12], {"folder_path": folder_path, **params})
+        self._append_journal(job.job_id, {"type": "job", "params": job.params, "created_at": job.created_at})
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job)
+        return job.to_dict()
+
+    def run_exclusive(self, fn, *args, **kwargs) -> Future:
+        """
+        OCR 엔진을 쓰는 다른 작업(결과 모아 저장, 폴더 감시 등)을 폴더 작업과 같은 실행 큐에서 실행
+        (동시 실행 수 제한 max_concurrent를 함께 지킴)
+        """
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def get(self, job_id: str) -> Optional[OCRJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j.to_dict() for j in sorted(jobs, key=lambda j: j.created_at, reverse=True)]
+
+    def cancel(self, job_id: str) -> bool:
+        """작업 취소 요청 (진행 중인 파일은 마저 처리한 뒤 중단)"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished_at:
+            return False
+        job.cancel_event.set()
+        return True
+
+    def resume_incomplete(self) -> List[str]:
+        """
+        저널에 종료 기록이 없는 작업(비정상 종료)을 다시 실행
+        저널에 기록된 파일은 건너뜀
+
+        Returns:
+            재개한 작업 ID 리스트
+        """
+        resumed = []
+        for path in sorted(self.journal_dir.glob("*.jsonl")):
+            job_id = path.stem
+            if job_id in self._jobs:
+                continue
+            job = None
+            ended = False
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # 쓰다 만 마지막 줄
+                    if record["type"] == "job":
+                        job = OCRJob(job_id, record["params"], record.get("created_at"))
+                    elif record["type"] == "file" and job is not None:
+                        job.events.append({k: v for k, v in record.items() if k != "type"})
+                    elif record["type"] == "end":
+                        ended = True
+            if job is None or ended or not os.path.isdir(job.params["folder_path"]):
+                continue
+            with self._lock:
+                self._jobs[job_id] = job
+            self._executor.submit(self._run, job)
+            resumed.append(job_id)
+        if resumed:
+            logger.info("미완료 OCR 작업 %d개를 재개합니다: %s", len(resumed), ", ".join(resumed))
+        return resumed
+
+    def shutdown(self):
+        """실행 중인 작업을 중단하고 종료 (종료 기록을 남기지 않으므로 다음 시작 시 재개됨)"""
+        self._shutting_down = True
+        for job in list(self._jobs.values()):
+            job.cancel_event.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,218 @@
+"""
+OCR 전처리 모듈
+EXIF 회전 보정, 긴 변 기준 축소, 흑백 변환, 기울기 보정, 문서 템플릿 영역 자르기
+임시 파일 없이 NumPy 배열을 바로 easyocr에 전달
+"""
+import io
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import numpy as np
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# 알려진 문서 양식별 관심 영역 (이미지 크기 대비 비율: x0, y0, x1, y1)
+DOCUMENT_TEMPLATES: Dict[str, Tuple[float, float, float, float]] = {
+    "receipt_header": (0.0, 0.0, 1.0, 0.35),      # 영수증 상단 (상호, 사업자번호, 전화번호)
+    "invoice_supplier": (0.0, 0.1, 0.5, 0.45),     # 세금계산서 공급자 영역
+}
+
+
+@dataclass
+class PreprocessConfig:
+    """OCR 전처리 설정"""
+    exif_rotate: bool = True
+    max_long_edge: Optional[int] = 1600   # None이면 축소하지 않음
+    grayscale: bool = True
+    deskew: bool = False
+    template: Optional[str] = None        # DOCUMENT_TEMPLATES 키
+
+    def as_key(self) -> Dict[str, Any]:
+        """캐시 키에 포함할 설정 값"""
+        return asdict(self)
+
+
+@dataclass
+class ImageTransform:
+    """전처리 후 좌표 -> 원본 좌표 변환 정보"""
+    scale: float = 1.0
+    offset_x: float = 0.0
+    offset_y: float = 0.0
+
+    def restore(self, raw_results: list) -> list:
+        """bbox 좌표를 원본 이미지 기준으로 되돌림 (deskew 회전은 보정하지 않음)"""
+        if self.scale == 1.0 and not self.offset_x and not self.offset_y:
+            return raw_results
+        return [
+            ([[x / self.scale + self.offset_x, y / self.scale + self.offset_y] for x, y in bbox], text, conf)
+            for bbox, text, conf in raw_results
+        ]
+
+
+def _decode(data: bytes, exif_rotate: bool) -> "np.ndarray":
+    """바이트 -> RGB 배열 (가능하면 PIL로 EXIF 방향 적용)"""
+    if PIL_AVAILABLE:
+        image = Image.open(io.BytesIO(data))
+        if exif_rotate:
+            image = ImageOps.exif_transpose(image)
+        return np.asarray(image.convert("RGB"))
+    flags = cv2.IMREAD_COLOR if exif_rotate else cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+    if image is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def _deskew(gray: "np.ndarray") -> "np.ndarray":
+    """글자 픽셀 분포로 기울기를 추정해 회전 보정 (±15도 이내만)"""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    coords = np.column_stack(np.where(binary > 0))
+    if len(coords) < 50:
+        return gray
+    angle = cv2.minAreaRect(coords[:, ::-1].astype(np.float32))[-1]
+    if angle > 45:
+        angle -= 90
+    if abs(angle) < 0.3 or abs(angle) > 15:
+        return gray
+    h, w = gray.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def preprocess_image(data: bytes, config: PreprocessConfig) -> Tuple["np.ndarray", ImageTransform]:
+    """
+    이미지 바이트를 전처리된 NumPy 배열로 변환
+    :param data: 이미지 파일 바이트
+    :param config: 전처리 설정
+    :return: (전처리된 배열, 좌표 복원 정보)
+    """
+    if not CV2_AVAILABLE:
+        raise ImportError("opencv-python이 필요합니다. (easyocr 설치 시 함께 설치됨)")
+
+    image = _decode(data, config.exif_rotate)
+    transform = ImageTransform()
+
+    # 1. 템플릿 영역 자르기
+    if config.template:
+        if config.template not in DOCUMENT_TEMPLATES:
+            raise ValueError(f"알 수 없는 문서 템플릿: {config.template}")
+        h, w = image.shape[:2]
+        x0, y0, x1, y1 = DOCUMENT_TEMPLATES[config.template]
+        left, top = int(w * x0), int(h * y0)
+        image = image[top:int(h * y1), left:int(w * x1)]
+        transform.offset_x, transform.offset_y = left, top
+
+    # 2. 긴 변 기준 축소 (확대는 하지 않음)
+    if config.max_long_edge:
+        h, w = image.shape[:2]
+        long_edge = max(h, w)
+        if long_edge > config.max_long_edge:
+            scale = config.max_long_edge / long_edge
+            image = cv2.resize(image, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+            transform.scale = scale
+
+    # 3. 흑백 변환 / 기울기 보정
+    if config.grayscale or config.deskew:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        if config.deskew:
+            image = _deskew(image)
+
+    return np.ascontiguousarray(image), transform
+
+
+# --- 벤치마크: 렌더링한 한글/영문 텍스트 이미지로 속도/정확도 비교 ---
+
+_SAMPLE_LINES = [
+    "사업자등록번호 123-45-67890",
+    "(주)익진엔지니어링 집행내역서",
+    "TEL 031-123-4567",
+    "합계 금액 1,250,000원",
+    "Invoice No. 2024-0815",
+    "Total Amount KRW 980,000",
+]
+
+
+def render_synthetic_image(lines: List[str], font_path: str, size: Tuple[int, int] = (4000, 3000), angle: float = 0.0) -> bytes:
+    """휴대폰 사진 크기의 캔버스에 텍스트를 렌더링한 PNG 바이트"""
+    from PIL import ImageDraw, ImageFont
+
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype(font_path, size=size[1] // 25)
+    y = size[1] // 10
+    for line in lines:
+        draw.text((size[0] // 12, y), line, fill="black", font=font)
+        y += size[1] // 10
+    if angle:
+        image = image.rotate(angle, expand=False, fillcolor="white")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def benchmark_preprocess(
+    reader,
+    font_path: str,
+    configs: Optional[Dict[str, Optional[PreprocessConfig]]] = None,
+    n_images: int = 6
+) -> Dict[str, Dict[str, float]]:
+    """
+    전처리 설정별 인식 지연 시간과 문자 단위 정확도 측정
+    :param reader: easyocr.Reader
+    :param font_path: 한글 지원 TTF 폰트 경로 (예: C:\\Windows\\Fonts\\malgun.ttf)
+    :param configs: 이름 -> 설정 (None은 원본 그대로)
+    :param n_images: 생성할 이미지 수
+    """
+    from difflib import SequenceMatcher
+
+    if configs is None:
+        configs = {
+            "original": None,
+            "1600_gray": PreprocessConfig(max_long_edge=1600),
+            "1024_gray": PreprocessConfig(max_long_edge=1024),
+            "1600_gray_deskew": PreprocessConfig(max_long_edge=1600, deskew=True),
+        }
+
+    samples = []
+    for i in range(n_images):
+        lines = _SAMPLE_LINES[i % len(_SAMPLE_LINES):] + _SAMPLE_LINES[:i % len(_SAMPLE_LINES)]
+        angle = (i % 3 - 1) * 3.0  # -3, 0, 3도
+        samples.append(("\n".join(lines[:4]), render_synthetic_image(lines[:4], font_path, angle=angle)))
+
+    report = {}
+    for name, config in configs.items():
+        elapsed, scores = 0.0, []
+        for truth, data in samples:
+            start = time.perf_counter()
+            image = data if config is None else preprocess_image(data, config)[0]
+            results = reader.readtext(image, detail=0, paragraph=False)
+            elapsed += time.perf_counter() - start
+            predicted = "".join("".join(results).split())
+            scores.append(SequenceMatcher(None, "".join(truth.split()), predicted).ratio())
+        report[name] = {
+            "avg_latency_sec": round(elapsed / len(samples), 3),
+            "char_accuracy": round(sum(scores) / len(scores), 4),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import easyocr
+
+    if len(sys.argv) < 2:
+        print("사용법: python -m src.chatbot.ocr_preprocess <한글폰트.ttf>")
+        sys.exit(1)
+    print(json.dumps(benchmark_preprocess(easyocr.Reader(["ko", "en"], gpu=False), sys.argv[1]), indent=2))
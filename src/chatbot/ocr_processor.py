@@ -1,16 +1,19 @@
+import logging
 import os
 import re
-import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
-import easyocr
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Callable, Set
 
-# Windows 환경에서의 인코딩 문제 해결
-if sys.stdout.encoding.lower() == 'utf-8':
-    pass
-else:
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+from .ocr_cache import OCRResultCache, content_hash, normalize_raw_results
+from .ocr_preprocess import PreprocessConfig, ImageTransform, preprocess_image
+from .ocr_extract import FieldExtractor
+from src.utils.metrics import OCR_IMAGES, OCR_IMAGES_PER_SECOND
+
+logger = logging.getLogger(__name__)
 
 try:
     import pandas as pd
@@ -18,23 +21,224 @@ try:
 except ImportError:
     PANDAS_AVAILABLE = False
 
+try:
+    import numpy as np
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+# 처리 가능한 이미지 확장자 정의
+VALID_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+
+
+# --- 배치 파이프라인용 워커 함수 (프로세스 간 pickle 가능하도록 모듈 수준에 정의) ---
+
+_worker_reader = None
+_worker_settings: Dict[str, Any] = {}
+_worker_preprocess: Optional[PreprocessConfig] = None
+
+
+def _init_ocr_worker(
+    languages: List[str],
+    gpu: bool,
+    torch_threads: int,
+    readtext_settings: Dict[str, Any],
+    preprocess: Optional[PreprocessConfig] = None
+):
+    """인식 워커 프로세스 초기화 - 프로세스마다 Reader 1개 보유"""
+    global _worker_reader, _worker_settings, _worker_preprocess
+    import easyocr
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+    _worker_reader = easyocr.Reader(languages, gpu=gpu, verbose=False)
+    _worker_settings = readtext_settings
+    _worker_preprocess = preprocess
+
+
+def _worker_readtext_batch(files: List[bytes], batch_size: int) -> List[Any]:
+    """
+    워커 프로세스에서 파일 바이트를 디코딩/전처리한 뒤 묶어서 인식
+    (디코딩된 배열 대신 압축된 파일 바이트만 프로세스 간에 전달)
+    :return: 입력 순서대로 원본 좌표 기준 [(bbox, text, confidence)] 또는 디코딩 실패 예외
+    """
+    outputs: List[Any] = [None] * len(files)
+    decoded = []  # (index, image, transform)
+    for i, data in enumerate(files):
+        try:
+            image, transform = _decode_for_ocr(data, _worker_preprocess)
+        except Exception as e:
+            outputs[i] = e
+            continue
+        decoded.append((i, image, transform))
+    raw_list = readtext_grouped(_worker_reader, [item[1] for item in decoded], _worker_settings, batch_size)
+    for (i, _, transform), raw in zip(decoded, raw_list):
+        outputs[i] = transform.restore(raw)
+    return outputs
+
+
+def _size_bucket(image, step: int = 64) -> Tuple[int, ...]:
+    """크기가 비슷한 이미지끼리 묶기 위한 버킷 (step 단위 올림, 채널 수 포함)"""
+    h, w = image.shape[:2]
+    return (-(-h // step) * step, -(-w // step) * step) + tuple(image.shape[2:])
+
+
+def readtext_grouped(reader, images: list, settings: Dict[str, Any], batch_size: int = 8) -> List[list]:
+    """
+    여러 이미지를 크기별로 묶어 readtext_batched로 한 번에 인식
+    같은 버킷의 이미지는 오른쪽/아래를 흰색으로 채워 크기를 맞추므로 bbox 좌표는 변하지 않음
+    :param reader: easyocr.Reader
+    :param images: NumPy 배열 리스트 (배열이 아닌 항목은 개별 readtext로 처리)
+    :param settings: readtext 인식 설정
+    :param batch_size: 인식 모델의 배치 크기
+    :return: 입력 순서대로 이미지별 원본 결과 리스트
+    """
+    results: List[Optional[list]] = [None] * len(images)
+    buckets: Dict[Tuple[int, ...], List[int]] = {}
+    for i, image in enumerate(images):
+        if CV2_AVAILABLE and isinstance(image, np.ndarray):
+            buckets.setdefault(_size_bucket(image), []).append(i)
+        else:
+            results[i] = normalize_raw_results(reader.readtext(image, **settings))
+
+    for bucket, indices in buckets.items():
+        height, width = bucket[0], bucket[1]
+        padded = []
+        for i in indices:
+            image = images[i]
+            pad = [(0, height - image.shape[0]), (0, width - image.shape[1])] + [(0, 0)] * (image.ndim - 2)
+            padded.append(np.pad(image, pad, mode="constant", constant_values=255))
+        batch_results = reader.readtext_batched(padded, batch_size=batch_size, **settings)
+        for i, raw in zip(indices, batch_results):
+            results[i] = normalize_raw_results(raw)
+    return results
+
+
+def _read_image_bytes(image_path: str) -> bytes:
+    """이미지 파일 바이트 읽기"""
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"이미지 파일을 찾을 수 없습니다: {image_path}")
+    with open(image_path, "rb") as f:
+        return f.read()
+
+
+def _decode_image(data: bytes):
+    """이미지 디코딩 (cv2가 없으면 바이트 그대로 easyocr에 전달)"""
+    if not CV2_AVAILABLE:
+        return data
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    return image
+
+
+def _decode_for_ocr(data: bytes, preprocess: Optional[PreprocessConfig]) -> Tuple[Any, ImageTransform]:
+    """인식할 이미지와 좌표 복원 정보 (전처리 설정이 없으면 디코딩만)"""
+    if preprocess is not None:
+        return preprocess_image(data, preprocess)
+    return _decode_image(data), ImageTransform()
+
+
 class OnDeviceOCR:
     """온디바이스에서 한글/영어 OCR을 수행하고 결과를 필터링 및 저장하는 클래스"""
 
-    def __init__(self, languages: List[str] = ['ko', 'en'], gpu: bool = False):
+    def __init__(
+        self,
+        languages: List[str] = ['ko', 'en'],
+        gpu: bool = False,
+        idle_ttl: float = 0,
+        cache: Optional[OCRResultCache] = None,
+        preprocess: Optional[PreprocessConfig] = None
+    ):
         """
-        OCR 엔진 초기화
+        OCR 엔진 초기화 (모델은 첫 OCR 요청 시 로드됨)
         :param languages: 인식할 언어 리스트
         :param gpu: GPU(CUDA) 사용 여부
+        :param idle_ttl: 마지막 사용 후 모델을 메모리에서 내릴 때까지의 시간 (초, 0이면 유지)
+        :param cache: OCR 결과 캐시 (None이면 캐시 사용 안 함)
+        :param preprocess: 인식 전 전처리 설정 (None이면 원본 이미지 사용)
         """
-        print(f"OCR 엔진 초기화 중... (언어: {languages})")
-        self.reader = easyocr.Reader(languages, gpu=gpu)
-        # 추출할 정규표현식 패턴 정의
-        self.patterns = {
-            "biz_num": r'\d{3}-\d{2}-\d{5}',      # 사업자 번호
-            "phone": r'\d{2,3}-\d{3,4}-\d{4}'     # 전화번호
-        }
-        print("OCR 엔진 준비 완료.")
+        self.languages = languages
+        self.gpu = gpu
+        self.idle_ttl = idle_ttl
+        self.cache = cache
+        self.preprocess = preprocess
+        # readtext에 전달하는 인식 설정 (캐시 키에 포함)
+        self.readtext_settings: Dict[str, Any] = {}
+        self._reader = None
+        self._reader_lock = threading.Lock()
+        self._last_used = 0.0
+        self._idle_thread: Optional[threading.Thread] = None
+        self.last_batch_stats: Dict[str, Any] = {}
+        # 구조화 필드 추출기 (사업자번호, 전화번호, 날짜, 계좌번호, 금액 / register로 확장)
+        self.extractor = FieldExtractor()
+
+    @property
+    def reader(self):
+        """easyocr.Reader (최초 접근 시 스레드 안전하게 로드)"""
+        self._last_used = time.monotonic()
+        reader = self._reader
+        if reader is None:
+            # unload()와 경쟁하지 않도록 잠금 안에서 지역 변수로 읽어 그대로 반환
+            with self._reader_lock:
+                reader = self._reader
+                if reader is None:
+                    logger.info("OCR 엔진 초기화 중... (언어: %s)", self.languages)
+                    import easyocr  # torch 포함 무거운 import를 실제 사용 시점으로 지연
+                    reader = self._reader = easyocr.Reader(self.languages, gpu=self.gpu)
+                    logger.info("OCR 엔진 준비 완료.")
+                    self._start_idle_monitor()
+        return reader
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._reader is not None
+
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        모델 미리 로드
+        :param background: True면 백그라운드 스레드에서 로드하고 스레드를 반환
+        """
+        if not background:
+            self.reader
+            return None
+        thread = threading.Thread(target=lambda: self.reader, name="ocr-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def unload(self):
+        """모델을 메모리에서 해제 (다음 요청 시 다시 로드)"""
+        with self._reader_lock:
+            if self._reader is None:
+                return
+            self._reader = None
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        logger.info("OCR 엔진 유휴 시간 초과로 모델을 해제했습니다.")
+
+    def _start_idle_monitor(self):
+        """idle_ttl 동안 사용되지 않으면 모델을 해제하는 감시 스레드 시작"""
+        if not self.idle_ttl or (self._idle_thread and self._idle_thread.is_alive()):
+            return
+
+        def monitor():
+            while self._reader is not None:
+                remaining = self.idle_ttl - (time.monotonic() - self._last_used)
+                if remaining <= 0:
+                    self.unload()
+                    break
+                time.sleep(min(remaining, 60))
+
+        self._idle_thread = threading.Thread(target=monitor, name="ocr-idle-monitor", daemon=True)
+        self._idle_thread.start()
 
     def extract_filtered_text(self, image_path: str, min_confidence: float = 0.5) -> List[Dict[str, Any]]:
         """
@@ -43,12 +247,118 @@ class OnDeviceOCR:
         :param min_confidence: 최소 신뢰도 임계값 (0.0 ~ 1.0)
         :return: 필터링된 결과 리스트 (텍스트, 신뢰도 포함)
         """
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"이미지 파일을 찾을 수 없습니다: {image_path}")
-
         # OCR 수행: 결과는 [[좌표], 텍스트, 신뢰도] 형태의 리스트로 반환됨
-        raw_results = self.reader.readtext(image_path)
-        
+        raw_results = self.recognize(image_path)
+        return self.filter_results(raw_results, min_confidence)
+
+    def _cache_key(self, data: bytes) -> Optional[str]:
+        if self.cache is None:
+            return None
+        settings = dict(self.readtext_settings)
+        if self.preprocess is not None:
+            settings["preprocess"] = self.preprocess.as_key()
+        return self.cache.make_key(content_hash(data), self.languages, settings)
+
+    def _read_cached(self, image_path: str) -> Tuple[Optional[str], Optional[list], Optional[bytes], None]:
+        """
+        이미지 읽기 + 캐시 조회 (디코딩은 인식 워커 프로세스에서 수행)
+        :return: (캐시 키, 캐시된 원본 결과 또는 None, 캐시 미적중 시 파일 바이트, None)
+        """
+        data = _read_image_bytes(image_path)
+        cache_key = self._cache_key(data)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cache_key, cached, None, None
+        return cache_key, None, data, None
+
+    def _prepare_image(self, image_path: str) -> Tuple[Optional[str], Optional[list], Any, ImageTransform]:
+        """
+        이미지 읽기 + 캐시 조회 + 디코딩/전처리
+        :return: (캐시 키, 캐시된 원본 결과 또는 None, 인식할 이미지 또는 None, 좌표 복원 정보)
+        """
+        cache_key, cached, data, _ = self._read_cached(image_path)
+        if cached is not None:
+            return cache_key, cached, None, ImageTransform()
+        image, transform = _decode_for_ocr(data, self.preprocess)
+        return cache_key, None, image, transform
+
+    def recognize(self, image_path: str) -> list:
+        """
+        이미지 인식 원본 결과 [(bbox, text, confidence)] 반환 (캐시 우선)
+        이름 변경, 엑셀 저장, 패턴 추출 등 모든 후속 작업이 같은 결과를 재사용
+        bbox는 전처리 여부와 관계없이 원본 이미지 좌표 기준
+        :param image_path: 이미지 파일 경로
+        """
+        cache_key, cached, image, transform = self._prepare_image(image_path)
+        if cached is not None:
+            return cached
+        raw_results = normalize_raw_results(self.reader.readtext(image, **self.readtext_settings))
+        raw_results = transform.restore(raw_results)
+        if cache_key is not None:
+            self.cache.put(cache_key, raw_results)
+        return raw_results
+
+    def recognize_batch(self, image_paths: List[str], batch_size: int = 8) -> List[Any]:
+        """
+        여러 이미지를 크기별로 묶어 배치 추론으로 인식 (캐시 적중 이미지는 제외)
+        batch_size개씩 나눠 읽기/디코딩 -> 인식을 반복하므로 디코딩된 이미지는 최대 batch_size개만 메모리에 유지
+        :param image_paths: 이미지 경로 리스트
+        :param batch_size: 인식 모델의 배치 크기 (= 한 번에 디코딩하는 이미지 수)
+        :return: 입력 순서대로 원본 결과 리스트 (실패한 이미지는 예외 객체)
+        """
+        start = time.perf_counter()
+        batch_size = max(1, batch_size)
+        outputs: List[Any] = [None] * len(image_paths)
+        recognized = 0
+        for chunk_start in range(0, len(image_paths), batch_size):
+            to_recognize = []  # (index, cache_key, image, transform)
+            for i in range(chunk_start, min(chunk_start + batch_size, len(image_paths))):
+                try:
+                    cache_key, cached, image, transform = self._prepare_image(image_paths[i])
+                except Exception as e:
+                    outputs[i] = e
+                    continue
+                if cached is not None:
+                    outputs[i] = cached
+                else:
+                    to_recognize.append((i, cache_key, image, transform))
+            if not to_recognize:
+                continue
+
+            raw_list = readtext_grouped(
+                self.reader, [item[2] for item in to_recognize], self.readtext_settings, batch_size
+            )
+            for (i, cache_key, _, transform), raw in zip(to_recognize, raw_list):
+                raw = transform.restore(raw)
+                if cache_key is not None:
+                    self.cache.put(cache_key, raw)
+                outputs[i] = raw
+            recognized += len(to_recognize)
+
+        elapsed = time.perf_counter() - start
+        failed = sum(1 for o in outputs if isinstance(o, Exception))
+        OCR_IMAGES.labels(status="success").inc(len(image_paths) - failed)
+        if failed:
+            OCR_IMAGES.labels(status="error").inc(failed)
+        if elapsed > 0 and image_paths:
+            OCR_IMAGES_PER_SECOND.set(len(image_paths) / elapsed)
+        self.last_batch_stats = {
+            "images": len(image_paths),
+            "recognized": recognized,
+            "elapsed_sec": round(elapsed, 3),
+            "images_per_sec": round(len(image_paths) / elapsed, 2) if elapsed > 0 else None
+        }
+        return outputs
+
+    @staticmethod
+    def filter_results(raw_results: list, min_confidence: float = 0.5) -> List[Dict[str, Any]]:
+        """
+        readtext 원본 결과를 신뢰도로 필터링
+        :param raw_results: [(bbox, text, confidence)] 리스트
+        :param min_confidence: 최소 신뢰도 임계값
+        :return: 필터링된 결과 리스트
+        """
         filtered_results = []
         for bbox, text, confidence in raw_results:
             if confidence >= min_confidence:
@@ -57,7 +367,6 @@ class OnDeviceOCR:
                     "confidence": round(float(confidence), 4),
                     "bbox": bbox
                 })
-        
         return filtered_results
 
     def save_to_excel(self, results: List[Dict[str, Any]], output_path: str):
@@ -70,25 +379,38 @@ class OnDeviceOCR:
             raise ImportError("pandas와 openpyxl 라이브러리가 필요합니다. 'pip install pandas openpyxl'을 실행하세요.")
 
         if not results:
-            print("저장할 데이터가 없습니다.")
+            logger.warning("저장할 데이터가 없습니다.")
             return
 
-        # 패턴 추출을 위해 전체 텍스트 결합
-        full_text = " ".join([r['text'] for r in results])
-        
-        df = pd.DataFrame(results)
+        extracted = self.extractor.extract(results)
 
-        # 정의된 패턴별로 검색하여 컬럼 추가
-        for col_name, pattern in self.patterns.items():
-            match = re.search(pattern, full_text)
-            df[col_name] = match.group(0) if match else ""
+        # 각 행에는 해당 박스에서 찾은 값만 기록
+        df = pd.DataFrame(results)
+        for col_name in self.extractor.field_names:
+            df[col_name] = ""
+        for match in extracted["matches"]:
+            row, col_name = match["box_index"], match["field"]
+            current = df.at[row, col_name]
+            df.at[row, col_name] = f"{current}, {match['raw']}" if current else match["raw"]
 
         # 엑셀 저장 시 좌표(bbox) 데이터는 문자열로 변환하여 저장
         if 'bbox' in df.columns:
             df['bbox'] = df['bbox'].apply(lambda x: str(x))
-            
-        df.to_excel(output_path, index=False)
-        print(f"결과가 성공적으로 저장되었습니다 (패턴 추출 포함): {output_path}")
+
+        # 필드 시트: 라벨과 짝지어진 값 + 전체 매칭
+        field_rows = [
+            {"field": p["field"], "value": p["value"], "raw": p["raw"], "label": p["label"], "bbox": str(p["value_bbox"])}
+            for p in extracted["pairs"]
+        ] + [
+            {"field": m["field"], "value": m["value"], "raw": m["raw"], "label": "", "bbox": str(m["bbox"])}
+            for m in extracted["matches"]
+        ]
+        fields_df = pd.DataFrame(field_rows, columns=["field", "value", "raw", "label", "bbox"])
+
+        with pd.ExcelWriter(output_path) as writer:
+            df.to_excel(writer, sheet_name="ocr", index=False)
+            fields_df.to_excel(writer, sheet_name="fields", index=False)
+        logger.info("결과가 성공적으로 저장되었습니다 (필드 %d개 추출): %s", len(extracted["matches"]), output_path)
 
     def organize_file_by_ocr(self, image_path: str, max_length: int = 30) -> str:
         """
@@ -99,9 +421,18 @@ class OnDeviceOCR:
         """
         # 1. 텍스트 추출 (신뢰도 0.6 이상)
         results = self.extract_filtered_text(image_path, min_confidence=0.6)
-        
+        return self.rename_by_results(image_path, results, max_length)
+
+    def rename_by_results(self, image_path: str, results: List[Dict[str, Any]], max_length: int = 30) -> str:
+        """
+        이미 추출된 OCR 결과로 파일명 변경
+        :param image_path: 원본 이미지 경로
+        :param results: 필터링된 OCR 결과 리스트
+        :param max_length: 파일명의 최대 길이
+        :return: 변경된 파일 경로
+        """
         if not results:
-            print(f"텍스트를 추출할 수 없어 파일명을 변경하지 않습니다: {image_path}")
+            logger.info("텍스트를 추출할 수 없어 파일명을 변경하지 않습니다: %s", image_path)
             return image_path
 
         # 2. 파일명 후보 생성 (상위 3개 텍스트 결합)
@@ -129,59 +460,212 @@ class OnDeviceOCR:
 
         # 6. 파일명 변경 실행
         os.rename(image_path, new_path)
-        print(f"파일명 정리 완료: {os.path.basename(image_path)} -> {os.path.basename(new_path)}")
+        logger.debug("파일명 정리 완료: %s -> %s", os.path.basename(image_path), os.path.basename(new_path))
         return new_path
 
-    def batch_organize_images(self, folder_path: str, max_length: int = 30, log_filename: str = "ocr_batch_process.log"):
+    def batch_organize_images(
+        self,
+        folder_path: str,
+        max_length: int = 30,
+        log_filename: str = "ocr_batch_process.log",
+        workers: Optional[int] = None,
+        decode_threads: int = 4,
+        batch_size: int = 8,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        skip_files: Optional[Set[str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         특정 폴더 내의 모든 이미지 파일을 OCR 기반으로 일괄 이름 변경
+
+        디코딩/전처리(스레드 풀) -> 인식(프로세스 풀, 프로세스마다 Reader 1개) -> 이름 변경/로그(호출 스레드)
+        3단계 파이프라인으로 처리하며, 결과는 파일명 순서대로 기록됨
+        인식 프로세스를 쓰는 경우 스레드 풀은 파일 읽기/캐시 조회만 하고 디코딩/전처리는 워커에서 수행
+        (디코딩된 배열을 pickle로 넘기지 않음)
+        인식은 batch_size개씩 묶어 readtext_batched 한 번으로 수행
+
         :param folder_path: 대상 폴더 경로
         :param max_length: 파일명의 최대 길이
         :param log_filename: 생성할 로그 파일 이름
+        :param workers: 인식 프로세스 수 (None이면 CPU 코어 수의 절반, 1이면 단일 프로세스)
+        :param decode_threads: 디코딩 스레드 수
+        :param batch_size: 한 번의 인식 호출에 묶을 이미지 수
+        :param progress_callback: 파일 1개 처리가 끝날 때마다 {file, status, new_name, error}로 호출
+        :param cancel_event: set되면 남은 파일을 처리하지 않고 중단
+        :param skip_files: 처리하지 않을 파일명 (재개 시 이미 처리된 파일)
+        :return: 처리 통계 (파일 수, 소요 시간, 초당 이미지 수, 취소 여부)
         """
         if not os.path.isdir(folder_path):
-            print(f"에러: '{folder_path}'는 유효한 폴더 경로가 아닙니다.")
-            return
+            logger.error("'%s'는 유효한 폴더 경로가 아닙니다.", folder_path)
+            return None
 
-        # 처리 가능한 이미지 확장자 정의
-        valid_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
-        files = [f for f in os.listdir(folder_path) if f.lower().endswith(valid_extensions)]
+        files = sorted(
+            f for f in os.listdir(folder_path)
+            if f.lower().endswith(VALID_IMAGE_EXTENSIONS) and f not in (skip_files or ())
+        )
 
         if not files:
-            print(f"폴더 내에 처리할 이미지 파일이 없습니다.")
-            return
+            logger.warning("폴더 내에 처리할 이미지 파일이 없습니다: %s", folder_path)
+            return None
+
+        cpu_count = os.cpu_count() or 2
+        if workers is None:
+            workers = max(1, cpu_count // 2)
+        workers = max(1, min(workers, -(-len(files) // batch_size)))
+        torch_threads = max(1, cpu_count // workers)
 
-        print(f"총 {len(files)}개의 파일을 처리를 시작합니다...")
+        logger.info("총 %d개의 파일을 처리를 시작합니다... (인식 프로세스 %d개, 배치 %d)", len(files), workers, batch_size)
         log_entries = [f"=== OCR Batch Process Started at {datetime.now()} ==="]
-        
-        for i, filename in enumerate(files, 1):
-            file_path = os.path.join(folder_path, filename)
-            print(f"[{i}/{len(files)}] 처리 중: {filename}")
+        started = time.perf_counter()
+
+        if workers <= 1:
+            # 단일 프로세스: 이미 로드된 Reader 사용
+            prepare = self._prepare_image
+            recognize_many = lambda images, size: readtext_grouped(self.reader, images, self.readtext_settings, size)
+            recognizer = ThreadPoolExecutor(max_workers=1)
+        else:
+            prepare = self._read_cached
+            recognize_many = _worker_readtext_batch
+            recognizer = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_ocr_worker,
+                initargs=(self.languages, self.gpu, torch_threads, self.readtext_settings, self.preprocess)
+            )
+
+        # 메모리 사용량을 제한하기 위해 동시에 진행 중인 파일 수를 제한
+        window = max(workers * 2 + decode_threads, batch_size * (workers + 1))
+        pending = deque()
+        file_iter = iter(files)
+
+        # 디코딩이 끝난 이미지를 batch_size개까지 모았다가 한 번에 인식 단계로 전달
+        batch_lock = threading.Lock()
+        batch_buffer = []  # (cache_key, image 또는 파일 바이트, transform 또는 None, result_future)
+        decoding = [0]
+
+        def submit_batch(items):
+            def on_recognized(r: Future):
+                for index, (cache_key, _, transform, result_future) in enumerate(items):
+                    if r.cancelled():
+                        result_future.cancel()
+                    elif r.exception() is not None:
+                        result_future.set_exception(r.exception())
+                    elif isinstance(r.result()[index], Exception):
+                        result_future.set_exception(r.result()[index])
+                    else:
+                        # 워커에서 디코딩한 경우 좌표는 이미 복원되어 있음 (transform None)
+                        raw = r.result()[index]
+                        result_future.set_result((cache_key, raw if transform is None else transform.restore(raw)))
             try:
-                new_path = self.organize_file_by_ocr(file_path, max_length)
-                new_filename = os.path.basename(new_path)
-                
-                if filename != new_filename:
-                    log_entries.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] SUCCESS: {filename} -> {new_filename}")
-                else:
-                    log_entries.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] SKIPPED: {filename} (No text detected or name unchanged)")
-                    
+                recognizer.submit(recognize_many, [item[1] for item in items], batch_size).add_done_callback(on_recognized)
             except Exception as e:
-                error_msg = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ERROR: {filename} - {str(e)}"
-                print(error_msg)
-                log_entries.append(error_msg)
+                for item in items:
+                    item[3].set_exception(e)
+
+        with ThreadPoolExecutor(max_workers=decode_threads) as decoder, recognizer:
+            def submit_next() -> bool:
+                filename = next(file_iter, None)
+                if filename is None:
+                    return False
+                file_path = os.path.join(folder_path, filename)
+                result_future: Future = Future()
+
+                def on_decoded(decoded: Future):
+                    ready = None
+                    with batch_lock:
+                        decoding[0] -= 1
+                        if decoded.cancelled():
+                            result_future.cancel()
+                        elif decoded.exception() is not None:
+                            result_future.set_exception(decoded.exception())
+                        else:
+                            cache_key, cached, image, transform = decoded.result()
+                            if cached is not None:
+                                # 캐시 적중: 인식 단계 생략
+                                result_future.set_result((None, cached))
+                            else:
+                                batch_buffer.append((cache_key, image, transform, result_future))
+                        # 배치가 찼거나 더 기다릴 디코딩이 없으면 전달
+                        if batch_buffer and (len(batch_buffer) >= batch_size or decoding[0] == 0):
+                            ready = batch_buffer[:]
+                            batch_buffer.clear()
+                    if ready:
+                        submit_batch(ready)
+
+                with batch_lock:
+                    decoding[0] += 1
+                decoder.submit(prepare, file_path).add_done_callback(on_decoded)
+                pending.append((filename, file_path, result_future))
+                return True
+
+            for _ in range(window):
+                if not submit_next():
+                    break
+
+            i = 0
+            cancelled = False
+            while pending:
+                if cancel_event is not None and cancel_event.is_set():
+                    # 아직 시작하지 않은 디코딩/인식 작업은 버리고 중단
+                    cancelled = True
+                    decoder.shutdown(wait=False, cancel_futures=True)
+                    recognizer.shutdown(wait=False, cancel_futures=True)
+                    log_entries.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] CANCELLED: {len(pending)} files not processed")
+                    break
+
+                filename, file_path, result_future = pending.popleft()
+                submit_next()
+                i += 1
+                logger.debug("[%d/%d] 처리 중: %s", i, len(files), filename)
+                progress = {"file": filename, "status": None, "new_name": None, "error": None}
+                try:
+                    cache_key, raw_results = result_future.result()
+                    if cache_key is not None:
+                        self.cache.put(cache_key, raw_results)
+                    results = self.filter_results(raw_results, min_confidence=0.6)
+                    new_path = self.rename_by_results(file_path, results, max_length)
+                    new_filename = os.path.basename(new_path)
+
+                    if filename != new_filename:
+                        log_entries.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] SUCCESS: {filename} -> {new_filename}")
+                        progress.update(status="success", new_name=new_filename)
+                    else:
+                        log_entries.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] SKIPPED: {filename} (No text detected or name unchanged)")
+                        progress.update(status="skipped", new_name=new_filename)
+
+                except Exception as e:
+                    error_msg = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ERROR: {filename} - {str(e)}"
+                    logger.error("OCR 처리 실패: %s - %s", filename, e)
+                    log_entries.append(error_msg)
+                    progress.update(status="error", error=str(e))
+
+                OCR_IMAGES.labels(status=progress["status"]).inc()
+                if progress_callback is not None:
+                    progress_callback(progress)
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            "images": i,
+            "cancelled": cancelled,
+            "elapsed_sec": round(elapsed, 3),
+            "images_per_sec": round(i / elapsed, 2) if elapsed > 0 else None
+        }
+        self.last_batch_stats = stats
+        if stats["images_per_sec"]:
+            OCR_IMAGES_PER_SECOND.set(stats["images_per_sec"])
+        log_entries.append(f"=== Process Finished at {datetime.now()} ({stats['images_per_sec']} images/sec) ===\n")
 
-        log_entries.append(f"=== Process Finished at {datetime.now()} ===\n")
-        
         # 로그 파일 저장
         log_path = os.path.join(folder_path, log_filename)
         with open(log_path, "a", encoding="utf-8") as log_file:
             log_file.write("\n".join(log_entries) + "\n")
 
-        print(f"모든 배치 작업이 완료되었습니다. 로그 확인: {log_path}")
+        logger.info("모든 배치 작업이 완료되었습니다. 로그 확인: %s (%s images/sec)", log_path, stats["images_per_sec"])
+        return stats
 
 if __name__ == "__main__":
     # 사용 예시
+    from src.utils.logging_setup import setup_logging
+    setup_logging()
     ocr = OnDeviceOCR(gpu=False)
     
     # 특정 폴더 내 이미지 일괄 정리 (폴더 경로를 실제 경로로 수정하세요)
@@ -1,9 +1,9 @@
 """
 챗봇 API Router
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from fastapi.responses import FileResponse
-from typing import Optional
+from typing import List, Optional
 
 from . import chatbot_routes
 from .chatbot_routes import (
@@ -12,7 +12,9 @@ from .chatbot_routes import (
     LMStudioConfigRequest,
     SQLQueryRequest,
     OCRProcessRequest,
-    OCRBatchRequest
+    OCRBatchRequest,
+    OCRRecognizeBatchRequest,
+    OCRAggregateRequest
 )
 
 router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
@@ -52,6 +54,43 @@ async def chatbot_get_table_data(table_name: str, limit: int = 100):
     return await chatbot_routes.get_table_data(table_name, limit)
 
 
+@router.get("/data/{table_name}/rows", summary="Browse Table Rows (Keyset Pagination)")
+async def chatbot_browse_table(
+    table_name: str,
+    columns: Optional[str] = None,
+    filter: Optional[List[str]] = Query(None),
+    after: Optional[int] = None,
+    limit: int = 100
+):
+    return await chatbot_routes.browse_table(table_name, columns, filter, after, limit)
+
+
+@router.get("/arrow", summary="List Exported Arrow Caches")
+async def chatbot_list_arrow_caches():
+    return await chatbot_routes.list_arrow_caches()
+
+
+@router.get("/arrow/{name}/rows", summary="Browse Arrow Cache Rows (Memory-Mapped)")
+async def chatbot_browse_arrow_cache(
+    name: str,
+    columns: Optional[str] = None,
+    filter: Optional[List[str]] = Query(None),
+    offset: int = 0,
+    limit: int = 100
+):
+    return await chatbot_routes.browse_arrow_cache(name, columns, filter, offset, limit)
+
+
+@router.get("/data/{table_name}/stream", summary="Stream Table Rows (NDJSON / Arrow IPC)")
+async def chatbot_stream_table(
+    table_name: str,
+    columns: Optional[str] = None,
+    filter: Optional[List[str]] = Query(None),
+    format: str = "ndjson"
+):
+    return await chatbot_routes.stream_table(table_name, columns, filter, format)
+
+
 @router.get("/data/{table_name}/summary", summary="Get Table Summary")
 async def chatbot_get_table_summary(table_name: str):
     return await chatbot_routes.get_table_summary(table_name)
@@ -77,6 +116,16 @@ async def chatbot_ask_sql(request: SQLQueryRequest):
     return await chatbot_routes.ask_with_sql(request)
 
 
+@router.get("/ask-sql/page/{cursor_id}", summary="Get Next Page of SQL Result")
+async def chatbot_sql_page(cursor_id: str):
+    return await chatbot_routes.get_sql_page(cursor_id)
+
+
+@router.get("/ask-sql/stats", summary="SQL Execution Timings")
+async def chatbot_sql_stats():
+    return await chatbot_routes.get_sql_stats()
+
+
 @router.post("/ocr/process", summary="Process Single OCR")
 async def chatbot_ocr_process(request: OCRProcessRequest):
     return await chatbot_routes.process_single_ocr(request)
@@ -87,11 +136,56 @@ async def chatbot_ocr_to_excel(request: OCRProcessRequest):
     return await chatbot_routes.process_ocr_to_excel(request)
 
 
+@router.post("/ocr/to-excel/batch", summary="Aggregate OCR of Many Images into One Workbook or Table")
+async def chatbot_ocr_to_excel_batch(request: OCRAggregateRequest):
+    return await chatbot_routes.aggregate_ocr_to_output(request)
+
+
 @router.post("/ocr/batch", summary="Process Batch OCR")
 async def chatbot_ocr_batch(request: OCRBatchRequest):
     return await chatbot_routes.process_batch_ocr(request)
 
 
+@router.post("/ocr/jobs", summary="Submit Batch OCR Job")
+async def chatbot_ocr_submit_job(request: OCRBatchRequest):
+    return await chatbot_routes.submit_ocr_job(request)
+
+
+@router.get("/ocr/jobs", summary="List OCR Jobs")
+async def chatbot_ocr_list_jobs():
+    return await chatbot_routes.list_ocr_jobs()
+
+
+@router.get("/ocr/jobs/{job_id}", summary="Get OCR Job Progress")
+async def chatbot_ocr_get_job(job_id: str, include_events: bool = False):
+    return await chatbot_routes.get_ocr_job(job_id, include_events)
+
+
+@router.get("/ocr/jobs/{job_id}/events", summary="Stream OCR Job Progress (SSE)")
+async def chatbot_ocr_job_events(job_id: str):
+    return await chatbot_routes.stream_ocr_job_events(job_id)
+
+
+@router.post("/ocr/jobs/{job_id}/cancel", summary="Cancel OCR Job")
+async def chatbot_ocr_cancel_job(job_id: str):
+    return await chatbot_routes.cancel_ocr_job(job_id)
+
+
+@router.post("/ocr/recognize-batch", summary="Recognize Multiple Images in Batches")
+async def chatbot_ocr_recognize_batch(request: OCRRecognizeBatchRequest):
+    return await chatbot_routes.recognize_batch_ocr(request)
+
+
+@router.get("/ocr/cache", summary="OCR Cache Statistics")
+async def chatbot_ocr_cache():
+    return await chatbot_routes.get_ocr_cache_stats()
+
+
+@router.get("/watcher", summary="Folder Watcher Status")
+async def chatbot_watcher_status():
+    return await chatbot_routes.get_watcher_status()
+
+
 @router.get("/ocr/image", summary="Get Local Image for Preview")
 async def chatbot_ocr_image(path: str):
     return await chatbot_routes.get_local_image(path)
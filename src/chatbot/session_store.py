@@ -0,0 +1,255 @@
+"""
+대화 세션 저장소
+LRU + 유휴 TTL 제거, 세션별 토큰 예산, SQLite 영속화(write-behind) 지원
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    메시지 토큰 수 대략 추정 (토크나이저 없이)
+    한글은 글자당 약 1토큰, 영문/숫자는 4글자당 약 1토큰으로 계산
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for c in text if ord(c) > 127)
+    ascii_count = len(text) - non_ascii
+    return non_ascii + (ascii_count + 3) // 4 + 4  # 메시지당 role 오버헤드
+
+
+class ConversationSessionStore:
+    """세션 ID별 대화 기록을 메모리 상한 내에서 관리하는 저장소"""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl: float = 3600,
+        token_budget: int = 3000,
+        db_path: Optional[str] = None,
+        flush_interval: float = 2.0,
+        flush_batch_size: int = 50
+    ):
+        """
+        Args:
+            max_sessions: 메모리에 유지할 최대 세션 수 (초과 시 가장 오래 안 쓴 세션 제거)
+            idle_ttl: 마지막 사용 후 세션을 유지할 시간 (초, 0이면 무제한)
+            token_budget: 세션별 대화 기록 토큰 상한 (초과 시 오래된 메시지부터 제거)
+            db_path: SQLite 영속화 경로 (None이면 메모리 전용)
+            flush_interval: write-behind 플러시 주기 (초)
+            flush_batch_size: 이 개수 이상 변경이 쌓이면 즉시 플러시
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.token_budget = token_budget
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+
+        # session_id -> (last_access, updated_at, history)
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._dirty: Dict[str, Optional[List[Dict[str, str]]]] = {}
+        self._lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # 스레드별 SQLite 연결 (요청마다 새로 열지 않음), close()에서 모두 닫기 위해 목록도 보관
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+
+        if self.db_path:
+            self._init_db()
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    # --- 영속화 ---
+
+    def _connect(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 (처음 호출할 때만 생성)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_db(self):
+        """세션 테이블 생성 (WAL 모드는 DB 파일에 유지되므로 여기서 한 번만 설정)"""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # 여러 워커의 동시 읽기/쓰기 허용
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    history TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated ON chat_sessions (updated_at)")
+            conn.commit()
+
+    def _load(self, session_id: str, newer_than: float = 0) -> Optional[tuple]:
+        """DB에서 세션 로드 -> (updated_at, history), newer_than 이후에 기록된 경우만 (쿼리 1번)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT updated_at, history FROM chat_sessions WHERE session_id = ? AND updated_at > ?",
+                (session_id, newer_than)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _flush_loop(self):
+        while not self._stop_event.is_set():
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning("세션 저장 실패: %s", e)
+
+    def flush(self):
+        """쌓인 변경 사항을 한 트랜잭션으로 DB에 기록"""
+        if not self.db_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            pending = self._dirty
+            self._dirty = {}
+            updated = {sid: self._sessions[sid][1] for sid in pending if sid in self._sessions}
+
+        now = time.time()
+        upserts = [
+            (sid, json.dumps(history, ensure_ascii=False), updated.get(sid, now))
+            for sid, history in pending.items() if history is not None
+        ]
+        deletes = [(sid,) for sid, history in pending.items() if history is None]
+
+        with self._connect() as conn:
+            if upserts:
+                conn.executemany("""
+                    INSERT INTO chat_sessions (session_id, history, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(session_id) DO UPDATE SET
+                        history = excluded.history, updated_at = excluded.updated_at
+                """, upserts)
+            if deletes:
+                conn.executemany("DELETE FROM chat_sessions WHERE session_id = ?", deletes)
+            if self.idle_ttl:
+                conn.execute("DELETE FROM chat_sessions WHERE updated_at < ?", (now - self.idle_ttl,))
+            conn.commit()
+
+    def close(self):
+        """플러시 스레드 종료 및 남은 변경 사항 기록"""
+        self._stop_event.set()
+        self._flush_event.set()
+        if self._flusher:
+            self._flusher.join(timeout=5)
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    # --- 메모리 관리 ---
+
+    def _mark_dirty(self, session_id: str, history: Optional[List[Dict[str, str]]]):
+        if not self.db_path:
+            return
+        self._dirty[session_id] = history
+        if len(self._dirty) >= self.flush_batch_size:
+            self._flush_event.set()
+
+    def _evict(self, now: float):
+        """TTL 만료 세션과 LRU 초과 세션 제거 (lock 보유 상태에서 호출)"""
+        if self.idle_ttl:
+            while self._sessions:
+                sid, (last_access, _, _) = next(iter(self._sessions.items()))
+                if now - last_access <= self.idle_ttl:
+                    break
+                self._sessions.popitem(last=False)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def _trim(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """토큰 예산을 넘지 않도록 오래된 메시지부터 제거"""
+        total = 0
+        keep_from = len(history)
+        for i in range(len(history) - 1, -1, -1):
+            total += estimate_tokens(history[i].get("content", ""))
+            if total > self.token_budget:
+                break
+            keep_from = i
+        # user/assistant 쌍이 깨지지 않도록 assistant로 시작하면 한 개 더 제거
+        if keep_from < len(history) and history[keep_from].get("role") == "assistant":
+            keep_from += 1
+        return history[keep_from:]
+
+    # --- 공개 API ---
+
+    def get(self, session_id: str) -> List[Dict[str, str]]:
+        """세션 대화 기록 조회 (없으면 빈 리스트)"""
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and self.idle_ttl and now - entry[0] > self.idle_ttl:
+                del self._sessions[session_id]
+                entry = None
+            pending = session_id in self._dirty
+
+        if self.db_path and not pending:
+            # 다른 워커가 더 최근에 기록했으면 DB 값을 사용
+            loaded = self._load(session_id, 0 if entry is None else entry[1])
+            if loaded is not None and (not self.idle_ttl or now - loaded[0] <= self.idle_ttl):
+                entry = (now, loaded[0], loaded[1])
+
+        if entry is None:
+            return []
+
+        with self._lock:
+            self._sessions[session_id] = (now, entry[1], entry[2])
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+        return list(entry[2])
+
+    def append(self, session_id: str, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """메시지 추가 후 토큰 예산에 맞게 정리된 기록 반환"""
+        history = self._trim(self.get(session_id) + list(messages))
+        self.set(session_id, history)
+        return history
+
+    def set(self, session_id: str, history: List[Dict[str, str]]):
+        """세션 대화 기록 저장"""
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = (now, now, list(history))
+            self._sessions.move_to_end(session_id)
+            self._mark_dirty(session_id, list(history))
+            self._evict(now)
+
+    def clear(self, session_id: str):
+        """세션 삭제"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._mark_dirty(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, int]:
+        """저장소 상태"""
+        with self._lock:
+            return {
+                "sessions_in_memory": len(self._sessions),
+                "pending_writes": len(self._dirty),
+                "max_sessions": self.max_sessions,
+                "token_budget": self.token_budget,
+            }
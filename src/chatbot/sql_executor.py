@@ -0,0 +1,280 @@
+"""
+LLM이 생성한 SQL을 안전하게 실행하는 모듈
+읽기 전용 연결, 실행 시간 제한, 행 수 제한, 실행 계획 비용 검사, 페이지 커서 지원
+페이지 커서는 쿼리를 다시 실행하지 않고 열린 SQLite 커서에서 이어서 읽음
+(OFFSET 재실행 없이 페이지마다 일정한 비용, 첫 실행 시점의 결과로 고정)
+"""
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from src.utils.metrics import SQLITE_SECONDS
+
+# EXPLAIN QUERY PLAN의 전체 스캔 단계 ("SCAN t", "SCAN TABLE t AS x" 등)
+_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?"?(\w+)"?', re.IGNORECASE)
+# "FROM 테이블 [AS] 별칭" 형태의 별칭 정의
+_ALIAS_RE = re.compile(r'\b(\w+)\s+(?:AS\s+)?(\w+)', re.IGNORECASE)
+_SQL_KEYWORDS = {
+    "WHERE", "JOIN", "INNER", "LEFT", "RIGHT", "CROSS", "OUTER", "NATURAL", "ON", "USING",
+    "GROUP", "ORDER", "LIMIT", "UNION", "EXCEPT", "INTERSECT", "HAVING", "WINDOW", "AS", "SELECT"
+}
+
+
+class SafeSQLExecutor:
+    """생성된 SELECT 쿼리를 제한된 자원 안에서 실행하는 클래스"""
+
+    def __init__(
+        self,
+        db_path: str,
+        timeout: float = 5.0,
+        page_size: int = 500,
+        max_plan_cost: int = 5_000_000,
+        max_cursors: int = 256,
+        history_size: int = 200,
+        cursor_ttl: float = 120.0
+    ):
+        """
+        Args:
+            db_path: SQLite 데이터베이스 파일 경로
+            timeout: 쿼리 1회 최대 실행 시간 (초)
+            page_size: 한 번에 반환할 최대 행 수
+            max_plan_cost: 허용할 최대 예상 비용 (전체 스캔 테이블 행 수의 곱)
+            max_cursors: 서버에 보관할 최대 페이지 커서 수 (커서마다 읽기 연결 1개를 열어 둠)
+            history_size: 보관할 최근 쿼리 실행 기록 수
+            cursor_ttl: 이 시간 동안 다음 페이지 요청이 없으면 커서를 닫음 (초)
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self.page_size = page_size
+        self.max_plan_cost = max_plan_cost
+        self.max_cursors = max_cursors
+        self.cursor_ttl = cursor_ttl
+
+        self._cursors: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._history: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """읽기 전용 연결 생성"""
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @staticmethod
+    def _normalize(sql: str) -> str:
+        """
+        SELECT 쿼리 검증 및 끝의 세미콜론 제거
+        문자열/식별자/주석 안의 세미콜론은 허용하고, 실제로 문장을 끝내는 세미콜론 뒤에 내용이 있으면 거부
+        """
+        sql = sql.strip()
+        upper = sql.upper()
+        if not (upper.startswith("SELECT") or upper.startswith("WITH")):
+            raise ValueError("SELECT 쿼리만 실행할 수 있습니다.")
+        position = sql.find(";")
+        while position != -1:
+            if sqlite3.complete_statement(sql[:position + 1]):
+                if sql[position + 1:].strip():
+                    raise ValueError("하나의 쿼리만 실행할 수 있습니다.")
+                return sql[:position].strip()
+            position = sql.find(";", position + 1)
+        return sql
+
+    def _table_sizes(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """loaded_files 메타데이터에서 테이블별 행 수 조회"""
+        try:
+            rows = conn.execute("SELECT table_name, row_count FROM loaded_files").fetchall()
+        except sqlite3.Error:
+            return {}
+        return {name.lower(): count or 0 for name, count in rows if name}
+
+    def estimate_cost(self, conn: sqlite3.Connection, sql: str) -> Dict[str, Any]:
+        """
+        EXPLAIN QUERY PLAN으로 예상 비용 계산
+        같은 루프 단계(parent)의 전체 스캔 테이블 행 수를 곱하고, 단계별 값을 합산
+
+        Returns:
+            {"cost": 예상 비용, "plan": 실행 계획 문자열 리스트}
+        """
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        sizes = self._table_sizes(conn)
+        # 최신 SQLite는 별칭으로 표시하므로 별칭 -> 테이블 행 수도 등록
+        for table, alias in _ALIAS_RE.findall(sql):
+            if table.lower() in sizes and alias.upper() not in _SQL_KEYWORDS:
+                sizes.setdefault(alias.lower(), sizes[table.lower()])
+
+        costs_by_parent: Dict[int, int] = {}
+        for _, parent, _, detail in plan:
+            match = _SCAN_RE.match(detail)
+            if not match or "INDEX" in detail.upper():
+                continue
+            # 메타데이터에 없는 테이블(임시 테이블 등)은 보수적으로 1000행으로 가정
+            rows = max(sizes.get(match.group(1).lower(), 1000), 1)
+            costs_by_parent[parent] = costs_by_parent.get(parent, 1) * rows
+
+        return {
+            "cost": sum(costs_by_parent.values()),
+            "plan": [row[3] for row in plan]
+        }
+
+    @staticmethod
+    def _close_cursor(state: Dict[str, Any]):
+        try:
+            state["conn"].close()
+        except sqlite3.Error:
+            pass
+
+    def _read_page(self, state: Dict[str, Any], start: float) -> Dict[str, Any]:
+        """열린 커서에서 다음 페이지 읽기 (오류가 나거나 마지막 페이지면 연결을 닫음)"""
+        state["deadline"] = start + self.timeout
+        pending = state["pending"]
+        try:
+            rows = pending + state["cursor"].fetchmany(self.page_size + 1 - len(pending))
+        except sqlite3.OperationalError as e:
+            self._close_cursor(state)
+            if "interrupted" in str(e):
+                raise TimeoutError(f"쿼리 실행 시간이 {self.timeout}초를 초과했습니다.")
+            raise
+        except Exception:
+            self._close_cursor(state)
+            raise
+
+        # 다음 페이지가 있는지 확인하려고 1행 더 읽은 것은 다음 페이지 앞에 붙임
+        has_more = len(rows) > self.page_size
+        state["pending"] = rows[self.page_size:]
+        rows = rows[:self.page_size]
+        if not has_more:
+            self._close_cursor(state)
+        columns = state["columns"]
+        return {
+            "columns": columns,
+            "data": [dict(zip(columns, row)) for row in rows],
+            "row_count": len(rows),
+            "has_more": has_more,
+            "plan_cost": state["plan_cost"],
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    def _open_cursor(self, sql: str, start: float) -> Dict[str, Any]:
+        """계획 비용 검사 후 쿼리를 실행하고 첫 페이지 읽기 (상태의 연결은 다음 페이지용으로 열어 둠)"""
+        conn = self._connect()
+        state = {"sql": sql, "conn": conn, "pending": [], "deadline": start + self.timeout, "plan_cost": None}
+        try:
+            estimate = self.estimate_cost(conn, sql)
+            state["plan_cost"] = estimate["cost"]
+            if state["plan_cost"] > self.max_plan_cost:
+                raise ValueError(
+                    f"쿼리 예상 비용이 너무 큽니다 ({state['plan_cost']:,} > {self.max_plan_cost:,}). "
+                    f"조건(WHERE)이나 LIMIT을 추가하세요."
+                )
+
+            # 약 1만 VM 명령마다 현재 페이지의 마감 시간 확인
+            conn.set_progress_handler(lambda: 1 if time.perf_counter() > state["deadline"] else 0, 10000)
+            state["cursor"] = conn.execute(sql)
+            state["columns"] = [desc[0] for desc in state["cursor"].description]
+        except sqlite3.OperationalError as e:
+            conn.close()
+            if "interrupted" in str(e):
+                raise TimeoutError(f"쿼리 실행 시간이 {self.timeout}초를 초과했습니다.")
+            raise
+        except Exception:
+            conn.close()
+            raise
+        return state
+
+    def _record(self, sql: str, status: str, elapsed_ms: float, row_count: int = 0):
+        self._history.append({
+            "sql": sql,
+            "status": status,
+            "elapsed_ms": elapsed_ms,
+            "row_count": row_count,
+            "executed_at": time.time()
+        })
+
+    def _save_cursor(self, state: Dict[str, Any]) -> str:
+        """다음 페이지용 커서 보관 (만료되었거나 개수 제한을 넘은 오래된 커서는 닫음)"""
+        cursor_id = uuid.uuid4().hex
+        now = time.monotonic()
+        state["saved_at"] = now
+        with self._lock:
+            self._cursors[cursor_id] = state
+            while self._cursors:
+                oldest = next(iter(self._cursors.values()))
+                if len(self._cursors) <= self.max_cursors and now - oldest["saved_at"] <= self.cursor_ttl:
+                    break
+                self._close_cursor(self._cursors.popitem(last=False)[1])
+        return cursor_id
+
+    def _execute(self, sql: str, state: Optional[Dict[str, Any]], keep_cursor: bool = True) -> Dict[str, Any]:
+        start = time.perf_counter()
+        operation = "ask_sql" if state is None else "fetch_page"
+        try:
+            if state is None:
+                state = self._open_cursor(sql, start)
+            result = self._read_page(state, start)
+        except Exception as e:
+            status = "timeout" if isinstance(e, TimeoutError) else "rejected" if isinstance(e, ValueError) else "error"
+            self._record(sql, status, round((time.perf_counter() - start) * 1000, 2))
+            SQLITE_SECONDS.labels(operation=operation).observe(time.perf_counter() - start)
+            raise
+        self._record(sql, "success", result["elapsed_ms"], result["row_count"])
+        SQLITE_SECONDS.labels(operation=operation).observe(time.perf_counter() - start)
+
+        result["next_cursor"] = None
+        if result["has_more"]:
+            if keep_cursor:
+                result["next_cursor"] = self._save_cursor(state)
+            else:
+                self._close_cursor(state)
+        return result
+
+    def execute(self, sql: str, keep_cursor: bool = True) -> Dict[str, Any]:
+        """
+        SELECT 쿼리 실행 (첫 페이지)
+
+        Args:
+            sql: SQL 쿼리문
+            keep_cursor: 다음 페이지가 있으면 커서를 열어 두고 next_cursor 반환 (False면 첫 페이지만)
+
+        Returns:
+            {"columns", "data", "row_count", "has_more", "next_cursor", "plan_cost", "elapsed_ms"}
+        """
+        return self._execute(self._normalize(sql), None, keep_cursor)
+
+    def fetch_page(self, cursor_id: str) -> Dict[str, Any]:
+        """이전 결과의 다음 페이지 조회 (열어 둔 커서에서 이어서 읽음)"""
+        with self._lock:
+            state = self._cursors.pop(cursor_id, None)
+        if state is None:
+            raise KeyError(f"커서를 찾을 수 없거나 만료되었습니다: {cursor_id}")
+        if time.monotonic() - state["saved_at"] > self.cursor_ttl:
+            self._close_cursor(state)
+            raise KeyError(f"커서를 찾을 수 없거나 만료되었습니다: {cursor_id}")
+        return self._execute(state["sql"], state)
+
+    def close(self):
+        """보관 중인 커서의 연결을 모두 닫음"""
+        with self._lock:
+            states = list(self._cursors.values())
+            self._cursors.clear()
+        for state in states:
+            self._close_cursor(state)
+
+    def get_query_stats(self) -> Dict[str, Any]:
+        """최근 쿼리 실행 기록 및 통계"""
+        history = list(self._history)
+        timings = sorted(h["elapsed_ms"] for h in history if h["status"] == "success")
+        return {
+            "count": len(history),
+            "success": len(timings),
+            "failed": len(history) - len(timings),
+            "avg_ms": round(sum(timings) / len(timings), 2) if timings else None,
+            "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] if timings else None,
+            "max_ms": timings[-1] if timings else None,
+            "recent": history[-20:]
+        }
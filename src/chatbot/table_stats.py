@@ -0,0 +1,127 @@
+"""
+테이블 컬럼 통계 계산 모듈
+로드 시점에 DataFrame 단위로 한 번만 계산하여 loaded_files 옆의 table_stats 테이블에 저장
+"""
+import math
+from typing import List, Dict, Any
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+
+def _to_json_value(value: Any) -> Any:
+    """numpy/pandas 스칼라를 JSON 직렬화 가능한 값으로 변환 (NaN -> None)"""
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, (int, float, str, bool)):
+        return value
+    return str(value)
+
+
+def _sqlite_type(series: "pd.Series") -> str:
+    """to_sql이 생성하는 컬럼 타입과 동일한 이름"""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(series):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def compute_column_stats(df: "pd.DataFrame", top_k: int = 5, bins: int = 10) -> List[Dict[str, Any]]:
+    """
+    컬럼별 통계 계산
+
+    Args:
+        df: 대상 DataFrame
+        top_k: 최빈값 개수
+        bins: 숫자 컬럼 히스토그램 구간 수
+
+    Returns:
+        컬럼별 {name, type, null_count, distinct_count, min, max, top_values, histogram}
+    """
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas가 설치되어 있지 않습니다.")
+
+    # 컬럼 단위 집계는 DataFrame 전체에 대해 한 번에 계산
+    null_counts = df.isna().sum()
+    distinct_counts = df.nunique(dropna=True)
+
+    stats = []
+    for col in df.columns:
+        series = df[col]
+        non_null = series.dropna()
+        col_stats: Dict[str, Any] = {
+            "name": col,
+            "type": _sqlite_type(series),
+            "null_count": int(null_counts[col]),
+            "distinct_count": int(distinct_counts[col]),
+            "min": None,
+            "max": None,
+            "top_values": [],
+            "histogram": None,
+        }
+
+        if not non_null.empty:
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                values = non_null.to_numpy(dtype="float64")
+                values = values[np.isfinite(values)]
+                if values.size:
+                    col_stats["min"] = _to_json_value(values.min())
+                    col_stats["max"] = _to_json_value(values.max())
+                    counts, edges = np.histogram(values, bins=bins)
+                    col_stats["histogram"] = {
+                        "edges": [_to_json_value(e) for e in edges],
+                        "counts": counts.tolist()
+                    }
+            else:
+                try:
+                    col_stats["min"] = _to_json_value(non_null.min())
+                    col_stats["max"] = _to_json_value(non_null.max())
+                except TypeError:
+                    # 문자열/숫자 혼합 컬럼은 문자열로 비교
+                    as_str = non_null.astype(str)
+                    col_stats["min"], col_stats["max"] = as_str.min(), as_str.max()
+
+            top = non_null.value_counts().head(top_k)
+            col_stats["top_values"] = [
+                {"value": _to_json_value(v), "count": int(c)} for v, c in top.items()
+            ]
+
+        stats.append(col_stats)
+    return stats
+
+
+def sample_rows(df: "pd.DataFrame", n: int = 5) -> List[Dict[str, Any]]:
+    """처음 n행을 JSON 직렬화 가능한 dict 리스트로 반환"""
+    head = df.head(n)
+    return [
+        {col: _to_json_value(v) for col, v in zip(head.columns, row)}
+        for row in head.itertuples(index=False, name=None)
+    ]
+
+
+def format_stats_for_prompt(table_name: str, stats: List[Dict[str, Any]], max_top: int = 3) -> str:
+    """SQL 생성 프롬프트용 테이블 설명 문자열"""
+    lines = [f"Table: {table_name}"]
+    for col in stats:
+        parts = [f"  - {col['name']} ({col['type']})"]
+        if col.get("min") is not None:
+            parts.append(f"range {col['min']} ~ {col['max']}")
+        parts.append(f"distinct {col['distinct_count']}")
+        if col.get("null_count"):
+            parts.append(f"nulls {col['null_count']}")
+        if col["type"] == "TEXT" and col.get("top_values"):
+            tops = ", ".join(repr(t["value"]) for t in col["top_values"][:max_top])
+            parts.append(f"e.g. {tops}")
+        lines.append(", ".join(parts))
+    return "\n".join(lines)
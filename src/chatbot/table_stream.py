@@ -0,0 +1,63 @@
+"""
+테이블 행 배치를 NDJSON / Arrow IPC 바이트 스트림으로 변환하는 모듈
+"""
+import io
+import json
+from typing import List, Iterator, Tuple
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def ndjson_stream(schema: List[Tuple[str, str]], batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """행 배치를 한 줄에 한 행씩 JSON으로 변환 (배치 단위로 전송)"""
+    columns = [name for name, _ in schema]
+    for rows in batches:
+        lines = [json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) for row in rows]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _arrow_type(declared_type: str):
+    """SQLite 선언 타입 -> Arrow 타입"""
+    declared = (declared_type or "").upper()
+    if "INT" in declared:
+        return pa.int64()
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return pa.string()
+
+
+def arrow_stream(schema: List[Tuple[str, str]], batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """행 배치를 Arrow IPC 스트림 포맷의 RecordBatch로 변환"""
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow가 설치되어 있지 않습니다. pip install pyarrow 실행하세요.")
+
+    arrow_schema = pa.schema([(name, _arrow_type(declared)) for name, declared in schema])
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, arrow_schema)
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    yield drain()  # 스키마 메시지
+    for rows in batches:
+        arrays = []
+        for i, field in enumerate(arrow_schema):
+            values = [row[i] for row in rows]
+            if pa.types.is_string(field.type):
+                values = [None if v is None else str(v) for v in values]
+            arrays.append(pa.array(values, type=field.type))
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=arrow_schema))
+        yield drain()
+    writer.close()
+    yield drain()
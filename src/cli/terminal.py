@@ -1,9 +1,65 @@
 """
 터미널 기반 인터페이스
+새로고침은 백그라운드 작업으로 실행하고 바로 메뉴로 돌아옴
+- 진행 상황: 파일별 상태 / 경과 시간 / 남은 시간(예상) 표를 주기적으로 다시 그림 (Enter로 메뉴 복귀)
+- 실행 중인 작업 취소, 아직 시작하지 않은 파일을 먼저 처리하도록 순서 변경
+- 로그는 콘솔 대신 로그 파일 / 작업별 로그에 기록 (진행 상황 화면에 최근 로그 표시)
 """
+import os
+import sys
+import time
+import unicodedata
+from collections import deque
+
 from src.database import db_manager
-from src.excel import excelrefresh_time_delay as excel_refresher
 from src.database import place
+from src.excel.refresh_jobs import RefreshJobManager
+from src.utils.logging_setup import setup_logging, read_job_log
+
+REFRESH_INTERVAL_SEC = 1.0  # 진행 상황 표 갱신 주기
+LOG_TAIL_LINES = 5
+
+STATE_LABELS = {
+    "queued": "대기",
+    "waiting": "선행 대기",
+    "running": "실행 중",
+    "done": "완료",
+    "failed": "실패",
+    "cancelled": "취소",
+}
+JOB_STATUS_LABELS = {
+    "queued": "대기 중",
+    "running": "실행 중",
+    "completed": "완료",
+    "cancelled": "취소됨",
+    "failed": "실패",
+}
+
+refresh_jobs = RefreshJobManager()
+
+
+def _format_sec(seconds) -> str:
+    if seconds is None:
+        return "-"
+    seconds = int(round(seconds))
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _pad(text: str, width: int) -> str:
+    """한글처럼 두 칸을 차지하는 문자를 고려해 왼쪽 정렬"""
+    used = sum(2 if unicodedata.east_asian_width(c) in ("W", "F") else 1 for c in text)
+    return text + " " * max(width - used, 0)
+
+
+def _job_summary(job) -> str:
+    info = job.to_dict()
+    finished = info["counts"].get("done", 0) + info["counts"].get("failed", 0)
+    line = f"[{JOB_STATUS_LABELS[info['status']]}] 작업 {info['job_id']}: {finished}/{info['total']} 처리"
+    if info["eta_sec"] is not None:
+        line += f", 남은 시간 약 {_format_sec(info['eta_sec'])}"
+    if info["cancel_requested"] and job.active:
+        line += " (취소 중)"
+    return line
 
 
 def show_menu():
@@ -11,11 +67,16 @@ def show_menu():
     print("\n" + "="*50)
     print("       Excel Refresh Manager - Terminal Mode")
     print("="*50)
+    for job in refresh_jobs.active_jobs():
+        print("  " + _job_summary(job))
     print("1. 파일 목록 보기")
     print("2. 파일 추가")
     print("3. 파일 삭제")
-    print("4. Excel 새로고침 실행")
+    print("4. Excel 새로고침 시작 (백그라운드)")
     print("5. 초기 데이터로 DB 초기화")
+    print("6. 새로고침 진행 상황 보기")
+    print("7. 새로고침 작업 취소")
+    print("8. 파일 먼저 처리하기 (실행 중인 작업)")
     print("0. 종료")
     print("="*50)
 
@@ -54,21 +115,138 @@ def delete_file():
 
 
 def run_refresh():
-    """Excel 새로고침 실행"""
+    """Excel 새로고침을 백그라운드 작업으로 시작 (바로 메뉴로 돌아옴)"""
     try:
         refresh_delay = input("새로고침 대기 시간 (초, 기본값 5): ").strip()
         inter_file_delay = input("파일 간 대기 시간 (초, 기본값 2): ").strip()
+        workers = input("동시에 사용할 Excel 수 (기본값 1): ").strip()
         refresh_delay = int(refresh_delay) if refresh_delay else 5
         inter_file_delay = int(inter_file_delay) if inter_file_delay else 2
+        workers = int(workers) if workers else 1
+    except ValueError:
+        print("숫자를 입력하세요.")
+        return
+
+    if refresh_jobs.active_jobs():
+        print("다른 새로고침 작업이 끝난 뒤 시작됩니다.")
+    job = refresh_jobs.submit(refresh_delay=refresh_delay, inter_file_delay=inter_file_delay, workers=workers)
+    print(f"새로고침 작업을 시작했습니다: {job.job_id} (메뉴 6에서 진행 상황 확인)")
+
+
+def _select_job(running_only: bool = False):
+    """대상 작업 선택: 진행 중인 작업이 1개면 그 작업, 여러 개면 ID 입력 (없으면 가장 최근 작업)"""
+    jobs = [j for j in refresh_jobs.active_jobs() if j.status == "running" or not running_only]
+    if not jobs and not running_only:
+        jobs = refresh_jobs.list_jobs()[:1]
+    if not jobs:
+        print("실행 중인 새로고침 작업이 없습니다.")
+        return None
+    if len(jobs) == 1:
+        return jobs[0]
+    for job in jobs:
+        print("  " + _job_summary(job))
+    job = refresh_jobs.get(input("작업 ID: ").strip())
+    if job is None:
+        print("작업을 찾을 수 없습니다.")
+    return job
+
+
+def _render_progress(job, log_tail) -> str:
+    info = job.to_dict(include_files=True)
+    lines = [_job_summary(job), f"경과 {_format_sec(info['elapsed_sec'])}", "-" * 78,
+             f"{_pad('상태', 10)} {_pad('작업자', 6)} {_pad('경과', 6)} {_pad('예상', 6)} {_pad('남은', 6)} 파일",
+             "-" * 78]
+    for item in info["files"]:
+        worker = "-" if item["worker"] is None else str(item["worker"])
+        lines.append(f"{_pad(STATE_LABELS[item['state']], 10)} {worker:<6} {_format_sec(item['elapsed_sec']):<6} "
+                     f"{_format_sec(item['estimate_sec']):<6} {_format_sec(item['eta_sec']):<6} "
+                     f"{os.path.basename(item['file_path'])}")
+    if not info["files"]:
+        lines.append("(계획 수립 중...)" if job.active else "(새로고침할 파일이 없습니다)")
+    lines.append("-" * 78)
+    if info["error"]:
+        lines.append(f"오류: {info['error']}")
+    lines += [f"  {entry['ts'][11:19]} {entry['level']:<7} {entry['message']}" for entry in log_tail]
+    return "\n".join(lines)
 
-        print("\nExcel 새로고침을 시작합니다...")
-        excel_refresher.run_all_refreshes(
-            refresh_delay=refresh_delay,
-            inter_file_delay=inter_file_delay
-        )
-        print("새로고침 완료!")
-    except Exception as e:
-        print(f"오류 발생: {e}")
+
+def _wait_for_enter(timeout: float) -> bool:
+    """timeout 동안 Enter 입력을 기다림 (입력이 있으면 True)"""
+    if os.name == "nt":
+        import msvcrt
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            while msvcrt.kbhit():
+                if msvcrt.getwch() in ("\r", "\n"):
+                    return True
+            time.sleep(0.05)
+        return False
+    import select
+
+    ready, _, _ = select.select([sys.stdin], [], [], timeout)
+    if ready:
+        sys.stdin.readline()
+        return True
+    return False
+
+
+def show_progress():
+    """선택한 작업의 진행 상황을 주기적으로 다시 그림 (Enter / Ctrl+C: 메뉴로 돌아가기)"""
+    job = _select_job()
+    if job is None:
+        return
+    if os.name == "nt":
+        os.system("")  # Windows 콘솔에서 ANSI 화면 지우기 사용
+    log_tail, position = deque(maxlen=LOG_TAIL_LINES), 0
+    try:
+        while True:
+            result = read_job_log(job.job_id, after=position)
+            if result:
+                log_tail.extend(result["entries"])
+                position = result["next"]
+            print("\033[H\033[J" + _render_progress(job, log_tail))
+            if not job.active:
+                print("작업이 끝났습니다.")
+                return
+            print("Enter: 메뉴로 돌아가기 (작업은 계속 실행됨)")
+            if _wait_for_enter(REFRESH_INTERVAL_SEC):
+                return
+    except KeyboardInterrupt:
+        print()
+
+
+def cancel_refresh():
+    """실행 중인 새로고침 작업 취소"""
+    job = _select_job()
+    if job is None or not job.active:
+        print("취소할 작업이 없습니다.")
+        return
+    if input(f"작업 {job.job_id}을(를) 취소할까요? (y/n): ").strip().lower() == "y":
+        refresh_jobs.cancel(job.job_id)
+        print("취소를 요청했습니다. Excel에서 새로고침 중인 파일은 끝난 뒤 중지됩니다.")
+
+
+def prioritize_file():
+    """실행 중인 작업에서 아직 시작하지 않은 파일을 다음 순서로 당김"""
+    job = _select_job(running_only=True)
+    if job is None:
+        return
+    queued = [item for item in job.to_dict(include_files=True)["files"] if item["state"] == "queued"]
+    if not queued:
+        print("대기 중인 파일이 없습니다.")
+        return
+    for number, item in enumerate(queued, 1):
+        print(f"  [{number}] {item['file_path']}")
+    choice = input("먼저 처리할 파일 번호: ").strip()
+    if not choice.isdigit() or not 1 <= int(choice) <= len(queued):
+        print("잘못된 번호입니다.")
+        return
+    path = queued[int(choice) - 1]["file_path"]
+    if refresh_jobs.bump(job.job_id, path):
+        print(f"다음 순서로 처리합니다: {os.path.basename(path)} (선행 파일이 있으면 그 파일이 시작된 뒤)")
+    else:
+        print("이미 시작된 파일이거나 순서를 바꿀 수 없는 파일입니다.")
 
 
 def init_db():
@@ -80,13 +258,34 @@ def init_db():
         print(f"오류: {e}")
 
 
+def _confirm_exit() -> bool:
+    """실행 중인 작업이 있으면 취소하고 종료할지 확인"""
+    if not refresh_jobs.active_jobs():
+        refresh_jobs.shutdown()
+        return True
+    try:
+        answer = input("실행 중인 새로고침이 있습니다. 취소하고 종료할까요? (y/n): ").strip().lower()
+    except (KeyboardInterrupt, EOFError):
+        answer = "y"
+    if answer != "y":
+        return False
+    print("작업을 취소하는 중입니다. Excel에서 새로고침 중인 파일이 끝날 때까지 기다립니다...")
+    refresh_jobs.shutdown(cancel=True)
+    return True
+
+
 def run():
     """터미널 모드 실행"""
+    # 백그라운드 작업 로그가 메뉴 사이에 섞이지 않도록 콘솔 출력 없이 파일에만 기록
+    setup_logging(console=False)
     db_manager.create_table_if_not_exists()
 
     while True:
         show_menu()
-        choice = input("선택: ").strip()
+        try:
+            choice = input("선택: ").strip()
+        except (KeyboardInterrupt, EOFError):
+            choice = "0"
 
         if choice == "1":
             list_files()
@@ -98,9 +297,16 @@ def run():
             run_refresh()
         elif choice == "5":
             init_db()
+        elif choice == "6":
+            show_progress()
+        elif choice == "7":
+            cancel_refresh()
+        elif choice == "8":
+            prioritize_file()
         elif choice == "0":
-            print("프로그램을 종료합니다.")
-            break
+            if _confirm_exit():
+                print("프로그램을 종료합니다.")
+                break
         else:
             print("잘못된 선택입니다.")
 
@@ -23,6 +23,9 @@ HILLSTATE_JANGAN = fr"{COMPANY_SHARE}\2025년 집행현장\힐스테이트 장
 # 마스터 DB 파일
 MASTER_DB = fr"{ONEDRIVE_BASE}\집행내역서(DB).xlsm"
 
+# 리프레시 후 Parquet/Arrow 내보내기 폴더
+EXPORT_DIR = fr"{ONEDRIVE_BASE}\export"
+
 
 # 초기화할 파일 목록 (순서대로 처리됨)
 INITIAL_FILES = [
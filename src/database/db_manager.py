@@ -1,46 +1,193 @@
 import sqlite3
+import json
+import logging
 import os
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 프로젝트 루트 경로 (main.py가 있는 위치)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
-DB_FILE = str(PROJECT_ROOT / "excel_paths.db")
+DB_FILE = os.environ.get("EXCEL_PATHS_DB", str(PROJECT_ROOT / "excel_paths.db"))
 TABLE_NAME = "paths"
 
+logger = logging.getLogger(__name__)
+
 def get_db_connection():
     """Establishes a connection to the SQLite database."""
     conn = sqlite3.connect(DB_FILE)
     return conn
 
-def create_table_if_not_exists():
-    """Creates the file paths table if it doesn't exist."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(f'''
+# --- Schema migrations (tracked with PRAGMA user_version) ---
+
+WAIT_STRATEGIES = ("fixed", "poll")
+DEFAULT_GROUP = "default"
+
+def _column_names(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def _migration_1(conn):
+    """Base paths table."""
+    conn.execute(f'''
         CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             file_path TEXT NOT NULL UNIQUE
         )
     ''')
-    conn.commit()
-    conn.close()
+
+def _migration_2(conn):
+    """Per-file settings, refresh history and persisted global settings."""
+    existing = _column_names(conn, TABLE_NAME)
+    columns = {
+        "group_name": f"TEXT NOT NULL DEFAULT '{DEFAULT_GROUP}'",
+        "priority": "INTEGER NOT NULL DEFAULT 0",          # higher runs first
+        "timeout_sec": "INTEGER",                           # NULL: use the global refresh_delay
+        "wait_strategy": "TEXT NOT NULL DEFAULT 'fixed'",   # fixed: sleep / poll: wait until Excel is done
+        "enabled": "INTEGER NOT NULL DEFAULT 1",
+    }
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {TABLE_NAME} ADD COLUMN {name} {definition}")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_group ON {TABLE_NAME} (group_name, priority)")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS refresh_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path_id INTEGER,
+            file_path TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            finished_at REAL,
+            duration_sec REAL,
+            status TEXT NOT NULL,
+            error TEXT
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_refresh_runs_file ON refresh_runs (file_path, started_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_refresh_runs_time ON refresh_runs (started_at)")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
+
+def _migration_3(conn):
+    """Refresh dependencies between files and planned-vs-actual run reports."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS refresh_dependencies (
+            path_id INTEGER NOT NULL,
+            depends_on_id INTEGER NOT NULL,
+            PRIMARY KEY (path_id, depends_on_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS refresh_plans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at REAL NOT NULL,
+            workers INTEGER NOT NULL,
+            predicted_sec REAL,
+            actual_sec REAL,
+            report TEXT NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_refresh_plans_time ON refresh_plans (created_at)")
+
+MIGRATIONS = [_migration_1, _migration_2, _migration_3]
+
+def migrate():
+    """Applies pending schema migrations in order. Returns the resulting schema version."""
+    conn = get_db_connection()
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+            logger.info("Database migrated to schema version %d.", number)
+        return len(MIGRATIONS)
+    finally:
+        conn.close()
+
+def create_table_if_not_exists():
+    """Creates the file paths table (and applies schema migrations) if needed."""
+    migrate()
 
 def add_path(file_path):
     """Adds a new file path to the database."""
     if not os.path.exists(file_path):
-        print(f"Warning: Path does not exist: {file_path}")
+        logger.warning("Path does not exist: %s", file_path)
 
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         cursor.execute(f"INSERT INTO {TABLE_NAME} (file_path) VALUES (?)", (file_path,))
         conn.commit()
-        print(f"Successfully added path: {file_path}")
+        logger.info("Successfully added path: %s", file_path)
     except sqlite3.IntegrityError:
-        print(f"Path already exists in database: {file_path}")
+        logger.info("Path already exists in database: %s", file_path)
     finally:
         conn.close()
 
+def expand_globs(patterns):
+    """Expands glob patterns ('**' matches subfolders) into a sorted list of files."""
+    files = set()
+    for pattern in patterns:
+        files.update(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+    return sorted(files)
+
+def add_paths(file_paths, skip_missing=False, max_workers=16):
+    """
+    Adds many file paths in a single transaction.
+    Existence checks run concurrently (they are slow on network shares).
+    Returns a per-path report: status is one of added / exists / duplicate / missing.
+    """
+    unique = list(dict.fromkeys(file_paths))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        on_disk = dict(zip(unique, executor.map(os.path.exists, unique)))
+
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        registered = set()
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            registered.update(row[0] for row in conn.execute(
+                f"SELECT file_path FROM {TABLE_NAME} WHERE file_path IN ({placeholders})", chunk
+            ))
+        to_insert = [p for p in unique if p not in registered and (on_disk[p] or not skip_missing)]
+        conn.executemany(f"INSERT OR IGNORE INTO {TABLE_NAME} (file_path) VALUES (?)", [(p,) for p in to_insert])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    # Report in input order; repeated paths after the first occurrence are duplicates
+    inserted = set(to_insert)
+    report = []
+    seen = set()
+    for path in file_paths:
+        if path in seen:
+            report.append({"path": path, "status": "duplicate", "on_disk": on_disk[path]})
+            continue
+        seen.add(path)
+        if path in registered:
+            status = "exists"
+        elif path in inserted:
+            status = "added"
+        else:
+            status = "missing"
+        report.append({"path": path, "status": status, "on_disk": on_disk[path]})
+
+    logger.info("Bulk add: %d added, %d already registered, %d not found on disk.",
+                len(inserted), len(registered), sum(1 for p in unique if not on_disk[p]))
+    return report
+
 def get_all_paths():
     """Retrieves all file paths from the database."""
     conn = get_db_connection()
@@ -66,10 +213,10 @@ def update_path_by_id(path_id, new_file_path):
     try:
         cursor.execute(f"UPDATE {TABLE_NAME} SET file_path = ? WHERE id = ?", (new_file_path, path_id))
         conn.commit()
-        print(f"Successfully updated path ID {path_id}.")
+        logger.info("Successfully updated path ID %s.", path_id)
         return True
     except sqlite3.IntegrityError:
-        print(f"Error: The path '{new_file_path}' already exists.")
+        logger.error("The path '%s' already exists.", new_file_path)
         return False
     finally:
         conn.close()
@@ -81,5 +228,224 @@ def delete_path_by_id(path_id):
     cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE id = ?", (path_id,))
     conn.commit()
     conn.close()
-    print(f"Successfully deleted path ID {path_id}.")
+    logger.info("Successfully deleted path ID %s.", path_id)
+
+
+# --- Per-file settings ---
+
+PATH_SETTING_COLUMNS = ("group_name", "priority", "timeout_sec", "wait_strategy", "enabled")
+NULLABLE_SETTING_COLUMNS = ("timeout_sec",)
+
+def get_paths_detailed(enabled_only=False, group_name=None):
+    """Retrieves file paths with their per-file settings, highest priority first."""
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    query = f"SELECT id, file_path, {', '.join(PATH_SETTING_COLUMNS)} FROM {TABLE_NAME}"
+    conditions, params = [], []
+    if enabled_only:
+        conditions.append("enabled = 1")
+    if group_name is not None:
+        conditions.append("group_name = ?")
+        params.append(group_name)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY priority DESC, id"
+    rows = [dict(row) for row in conn.execute(query, params)]
+    conn.close()
+    for row in rows:
+        row["enabled"] = bool(row["enabled"])
+    return rows
+
+def update_path_settings(path_id, **fields):
+    """Updates per-file settings (group_name, priority, timeout_sec, wait_strategy, enabled)."""
+    unknown = set(fields) - set(PATH_SETTING_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown setting(s): {', '.join(sorted(unknown))}")
+    null = sorted(name for name, value in fields.items() if value is None and name not in NULLABLE_SETTING_COLUMNS)
+    if null:
+        raise ValueError(f"Setting(s) cannot be null: {', '.join(null)}")
+    if "wait_strategy" in fields and fields["wait_strategy"] not in WAIT_STRATEGIES:
+        raise ValueError(f"wait_strategy must be one of {WAIT_STRATEGIES}")
+    if not fields:
+        return False
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    values = [int(v) if isinstance(v, bool) else v for v in fields.values()]
+    conn = get_db_connection()
+    cursor = conn.execute(f"UPDATE {TABLE_NAME} SET {assignments} WHERE id = ?", (*values, path_id))
+    conn.commit()
+    conn.close()
+    return cursor.rowcount > 0
+
+def get_groups():
+    """Lists file groups with their file counts."""
+    conn = get_db_connection()
+    rows = conn.execute(f'''
+        SELECT group_name, COUNT(*), SUM(enabled) FROM {TABLE_NAME}
+        GROUP BY group_name ORDER BY group_name
+    ''').fetchall()
+    conn.close()
+    return [{"group_name": g, "files": n, "enabled": e or 0} for g, n, e in rows]
+
+# --- Refresh history ---
+
+def record_refresh_run(file_path, started_at, finished_at, status, error=None):
+    """Stores one refresh attempt of a workbook."""
+    conn = get_db_connection()
+    row = conn.execute(f"SELECT id FROM {TABLE_NAME} WHERE file_path = ?", (file_path,)).fetchone()
+    conn.execute('''
+        INSERT INTO refresh_runs (path_id, file_path, started_at, finished_at, duration_sec, status, error)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (row[0] if row else None, file_path, started_at, finished_at, finished_at - started_at, status, error))
+    conn.commit()
+    conn.close()
+
+def get_refresh_runs(file_path=None, since=None, limit=200):
+    """Retrieves recent refresh runs, newest first."""
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    query = "SELECT * FROM refresh_runs"
+    conditions, params = [], []
+    if file_path is not None:
+        conditions.append("file_path = ?")
+        params.append(file_path)
+    if since is not None:
+        conditions.append("started_at >= ?")
+        params.append(since)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY started_at DESC LIMIT ?"
+    params.append(limit)
+    rows = [dict(row) for row in conn.execute(query, params)]
+    conn.close()
+    return rows
+
+def get_duration_stats(recent=10):
+    """
+    Per-file duration statistics over the last `recent` runs.
+    Returns {file_path: {"runs", "failures", "avg_sec", "max_sec", "last_sec"}} (durations of successful runs only).
+    """
+    conn = get_db_connection()
+    rows = conn.execute('''
+        SELECT file_path, duration_sec, status FROM (
+            SELECT file_path, duration_sec, status,
+                   ROW_NUMBER() OVER (PARTITION BY file_path ORDER BY started_at DESC) AS rn
+            FROM refresh_runs
+        ) WHERE rn <= ?
+    ''', (recent,)).fetchall()
+    conn.close()
+    stats = {}
+    for file_path, duration, status in rows:
+        entry = stats.setdefault(file_path, {"runs": 0, "failures": 0, "durations": []})
+        entry["runs"] += 1
+        if status == "success":
+            entry["durations"].append(duration)
+        else:
+            entry["failures"] += 1
+    for entry in stats.values():
+        durations = entry.pop("durations")
+        entry["avg_sec"] = round(sum(durations) / len(durations), 2) if durations else None
+        entry["max_sec"] = round(max(durations), 2) if durations else None
+        entry["last_sec"] = round(durations[0], 2) if durations else None
+    return stats
+
+# --- Persisted settings ---
+
+def load_settings():
+    """Retrieves persisted global settings as a dict."""
+    conn = get_db_connection()
+    rows = conn.execute("SELECT key, value FROM settings").fetchall()
+    conn.close()
+    return {key: json.loads(value) for key, value in rows}
 
+def save_settings(values):
+    """Persists global settings (dict of JSON-serializable values)."""
+    conn = get_db_connection()
+    conn.executemany(
+        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+        [(key, json.dumps(value)) for key, value in values.items()]
+    )
+    conn.commit()
+    conn.close()
+
+# --- Refresh dependencies / plans ---
+
+def set_dependencies(path_id, depends_on_ids, forbidden_paths=()):
+    """
+    Replaces the list of files that must be refreshed before the given file.
+    Raises LookupError for unknown file IDs, and ValueError if a dependency is one of
+    forbidden_paths (e.g. MASTER_DB, which always runs last) or the new edges would
+    create a cycle. The check runs against the stored graph in the same transaction.
+    """
+    depends_on_ids = sorted({dep for dep in depends_on_ids if dep != path_id})
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        paths = dict(conn.execute(f"SELECT id, file_path FROM {TABLE_NAME}").fetchall())
+        unknown = [i for i in [path_id] + depends_on_ids if i not in paths]
+        if unknown:
+            raise LookupError(f"Unknown file ID(s): {', '.join(map(str, unknown))}")
+        forbidden = [paths[dep] for dep in depends_on_ids if paths[dep] in forbidden_paths]
+        if forbidden:
+            raise ValueError(f"Cannot depend on {', '.join(forbidden)}: it is always refreshed last.")
+
+        graph = {}
+        for source, target in conn.execute(
+            "SELECT path_id, depends_on_id FROM refresh_dependencies WHERE path_id != ?", (path_id,)
+        ):
+            graph.setdefault(source, set()).add(target)
+        # A cycle exists if path_id is reachable from one of its new dependencies
+        stack, seen = list(depends_on_ids), set()
+        while stack:
+            node = stack.pop()
+            if node == path_id:
+                raise ValueError(f"Dependencies of file ID {path_id} would create a cycle.")
+            if node not in seen:
+                seen.add(node)
+                stack.extend(graph.get(node, ()))
+
+        conn.execute("DELETE FROM refresh_dependencies WHERE path_id = ?", (path_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO refresh_dependencies (path_id, depends_on_id) VALUES (?, ?)",
+            [(path_id, dep) for dep in depends_on_ids]
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_dependencies():
+    """Returns {file_path: [file_paths it depends on]}."""
+    conn = get_db_connection()
+    rows = conn.execute(f'''
+        SELECT p.file_path, d.file_path
+        FROM refresh_dependencies r
+        JOIN {TABLE_NAME} p ON p.id = r.path_id
+        JOIN {TABLE_NAME} d ON d.id = r.depends_on_id
+    ''').fetchall()
+    conn.close()
+    dependencies = {}
+    for path, dep in rows:
+        dependencies.setdefault(path, []).append(dep)
+    return dependencies
+
+def save_plan_report(report):
+    """Stores a planned-vs-actual run report."""
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT INTO refresh_plans (created_at, workers, predicted_sec, actual_sec, report) VALUES (?, ?, ?, ?, ?)",
+        (time.time(), report["workers"], report["predicted_makespan_sec"], report.get("actual_makespan_sec"),
+         json.dumps(report, ensure_ascii=False))
+    )
+    conn.commit()
+    conn.close()
+
+def get_plan_reports(limit=20):
+    """Recent planned-vs-actual run reports, newest first."""
+    conn = get_db_connection()
+    rows = conn.execute(
+        "SELECT id, created_at, report FROM refresh_plans ORDER BY created_at DESC LIMIT ?", (limit,)
+    ).fetchall()
+    conn.close()
+    return [{"id": i, "created_at": t, **json.loads(r)} for i, t, r in rows]
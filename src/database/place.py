@@ -1,6 +1,10 @@
+import logging
+
 from src.database import db_manager
 from src.database.config import INITIAL_FILES
 
+logger = logging.getLogger(__name__)
+
 
 def populate_db_from_initial_list():
     """
@@ -8,7 +12,6 @@ def populate_db_from_initial_list():
     File paths are configured in config.py for easy management.
     """
     db_manager.create_table_if_not_exists()
-    print(f"Adding {len(INITIAL_FILES)} files to the database...")
-    for file_path in INITIAL_FILES:
-        db_manager.add_path(file_path)
-    print("Population complete.")
+    logger.info("Adding %d files to the database...", len(INITIAL_FILES))
+    db_manager.add_paths(INITIAL_FILES)
+    logger.info("Population complete.")
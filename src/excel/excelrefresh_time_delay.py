@@ -1,96 +1,239 @@
 import win32com.client
 import pythoncom
+import logging
 import time
 import os
 
-def refresh_excel(file_path, refresh_delay=10):
+from src.utils.metrics import EXCEL_INSTANCES, REFRESH_SECONDS, REFRESH_TOTAL
+from src.utils.tracing import start_trace, span, current_trace_id
+
+logger = logging.getLogger(__name__)
+
+XL_CALCULATION_DONE = 0  # Application.CalculationState: xlDone
+
+def _connections_refreshing(workbook):
+    """True while any OLEDB/ODBC connection of the workbook is still refreshing."""
+    for conn in workbook.Connections:
+        for attr in ("OLEDBConnection", "ODBCConnection"):
+            try:
+                if getattr(conn, attr).Refreshing:
+                    return True
+            except Exception:
+                continue
+    return False
+
+def wait_for_refresh(excel, workbook, refresh_delay=10, wait_strategy="fixed", timeout=None):
+    """
+    Waits for RefreshAll to finish.
+    - fixed: sleeps refresh_delay seconds (previous behaviour)
+    - poll:  waits until async queries and calculation are done, up to timeout (default refresh_delay)
+    Raises TimeoutError if polling does not finish in time.
+    """
+    if wait_strategy != "poll":
+        time.sleep(refresh_delay)
+        return
+    deadline = time.monotonic() + (timeout or refresh_delay)
+    time.sleep(1)  # RefreshAll이 백그라운드 쿼리를 시작할 시간
+    while time.monotonic() < deadline:
+        if excel.CalculationState == XL_CALCULATION_DONE and not _connections_refreshing(workbook):
+            return
+        time.sleep(1)
+    raise TimeoutError(f"새로고침이 {timeout or refresh_delay}초 안에 끝나지 않았습니다.")
+
+def _close_excel(excel, workbook):
+    """Closes an unsaved workbook and quits Excel so no hidden instance keeps the file locked."""
+    if workbook is not None:
+        try:
+            workbook.Close(False)
+        except Exception as e:
+            logger.warning("통합 문서 닫기 실패: %s", e)
+    if excel is not None:
+        try:
+            excel.Quit()
+        except Exception as e:
+            logger.warning("Excel 종료 실패: %s", e)
+        EXCEL_INSTANCES.dec()
+
+def refresh_excel(file_path, refresh_delay=10, wait_strategy="fixed", timeout=None):
+    """Refreshes and saves one workbook. Returns (ok, error message or None)."""
+    excel = workbook = None
     try:
-        print(f"🔄 새로고침 시작: {file_path}")
+        logger.info("새로고침 시작: %s", file_path)
         pythoncom.CoInitialize()  # 백그라운드 스레드에서 COM 초기화
         excel = win32com.client.DispatchEx("Excel.Application")
+        EXCEL_INSTANCES.inc()
         excel.Visible = False
 
         if not os.path.exists(file_path):
-            print(f"❌ 파일 없음: {file_path}")
-            return
-
-        workbook = excel.Workbooks.Open(file_path)
-        workbook.RefreshAll()
-        print(f"✅ 새로고침 요청 완료. {refresh_delay}초 대기...")
-        time.sleep(refresh_delay)
-
-        workbook.Save()
-        workbook.Close(False)
-        excel.Quit()
-        print(f"✅ 저장 및 종료 완료: {file_path}")
+            logger.error("파일 없음: %s", file_path)
+            return False, f"File not found: {file_path}"
+
+        with span("open"):
+            workbook = excel.Workbooks.Open(file_path)
+        with span("refresh_all"):
+            workbook.RefreshAll()
+        if wait_strategy == "poll":
+            logger.info("새로고침 요청 완료. 완료될 때까지 대기 (최대 %s초)...", timeout or refresh_delay)
+        else:
+            logger.info("새로고침 요청 완료. %s초 대기...", refresh_delay)
+        with span("wait", strategy=wait_strategy):
+            wait_for_refresh(excel, workbook, refresh_delay, wait_strategy, timeout)
+
+        with span("save"):
+            workbook.Save()
+            workbook.Close(False)
+            workbook = None
+        logger.info("저장 및 종료 완료: %s", file_path)
+        return True, None
 
     except Exception as e:
-        print(f"❌ 오류 발생 - {file_path}: {e}")
+        logger.exception("오류 발생 - %s: %s", file_path, e)
+        return False, f"{type(e).__name__}: {e}"
     finally:
+        # 시간 초과 / 오류로 끝나도 저장하지 않고 닫은 뒤 Excel 종료
+        _close_excel(excel, workbook)
         pythoncom.CoUninitialize()  # COM 정리
 
 def refresh_and_run_macro(file_path, macro_name, refresh_delay=10):
+    """Refreshes one workbook, runs macro_name and saves it. Returns (ok, error message or None)."""
+    excel = workbook = None
     try:
-        print(f"🔄 [후처리] 새로고침 + 매크로 실행 시작: {file_path}")
+        logger.info("[후처리] 새로고침 + 매크로 실행 시작: %s", file_path)
         pythoncom.CoInitialize()  # 백그라운드 스레드에서 COM 초기화
         excel = win32com.client.DispatchEx("Excel.Application")
+        EXCEL_INSTANCES.inc()
         excel.Visible = False
 
         if not os.path.exists(file_path):
-            print(f"❌ 파일 없음: {file_path}")
-            return
-
-        workbook = excel.Workbooks.Open(file_path)
-        workbook.RefreshAll()
-        print(f"✅ [후처리] 새로고침 요청 완료. {refresh_delay}초 대기...")
-        time.sleep(refresh_delay)
-
-        excel.Application.Run(macro_name)
-        print(f"✅ [후처리] 매크로 실행 완료: {macro_name}")
-
-        workbook.Save()
-        workbook.Close(False)
-        excel.Quit()
-        print(f"✅ [후처리] 저장 및 종료 완료: {file_path}")
+            logger.error("[후처리] 파일 없음: %s", file_path)
+            return False, f"File not found: {file_path}"
+
+        with span("open"):
+            workbook = excel.Workbooks.Open(file_path)
+        with span("refresh_all"):
+            workbook.RefreshAll()
+        logger.info("[후처리] 새로고침 요청 완료. %s초 대기...", refresh_delay)
+        with span("wait", strategy="fixed"):
+            time.sleep(refresh_delay)
+
+        with span("macro", macro=macro_name):
+            excel.Application.Run(macro_name)
+        logger.info("[후처리] 매크로 실행 완료: %s", macro_name)
+
+        with span("save"):
+            workbook.Save()
+            workbook.Close(False)
+            workbook = None
+        logger.info("[후처리] 저장 및 종료 완료: %s", file_path)
+        return True, None
 
     except Exception as e:
-        print(f"❌ [후처리] 오류 발생 - {file_path}: {e}")
+        logger.exception("[후처리] 오류 발생 - %s: %s", file_path, e)
+        return False, f"{type(e).__name__}: {e}"
     finally:
+        # 시간 초과 / 오류로 끝나도 저장하지 않고 닫은 뒤 Excel 종료
+        _close_excel(excel, workbook)
         pythoncom.CoUninitialize()  # COM 정리
 
-def run_all_refreshes(refresh_delay=10, inter_file_delay=5):
+def export_refreshed(file_path, export_dir):
+    """리프레시된 파일을 Parquet/Arrow로 내보내기 (실패해도 리프레시는 계속)"""
+    try:
+        from src.excel.parquet_export import export_workbook
+        results = export_workbook(file_path, export_dir)
+        logger.info("내보내기 완료: %s (%d개 시트)", file_path, len(results))
+    except Exception as e:
+        logger.warning("내보내기 실패 - %s: %s", file_path, e)
+
+def refresh_and_record(entry, refresh_delay, export_dir=None, macro_name=None):
+    """Refreshes one workbook with its per-file settings and stores the run in refresh_runs."""
+    from src.database import db_manager
+    file = entry["file_path"]
+    started = time.time()
+    with span("refresh_workbook", file=os.path.basename(file)) as current:
+        if macro_name:
+            ok, error = refresh_and_run_macro(file, macro_name, refresh_delay)
+        else:
+            ok, error = refresh_excel(file, refresh_delay, entry.get("wait_strategy", "fixed"), entry.get("timeout_sec"))
+        current.set(ok=ok)
+    finished = time.time()
+    outcome = "success" if ok else "failed"
+    db_manager.record_refresh_run(file, started, finished, outcome, error)
+    REFRESH_SECONDS.labels(workbook=os.path.basename(file), outcome=outcome).observe(finished - started)
+    REFRESH_TOTAL.labels(outcome=outcome).inc()
+    if ok and export_dir:
+        with span("export", file=os.path.basename(file)):
+            export_refreshed(file, export_dir)
+    return ok
+
+def run_all_refreshes(refresh_delay=10, inter_file_delay=5, export_dir=None, group_name=None, workers=1, control=None):
     """
-    Fetches the list of excel files from the database via place.py
-    and runs the refresh process for all of them.
+    Fetches the enabled excel files from the database and refreshes them
+    on `workers` parallel Excel instances following a duration-aware plan
+    (see refresh_planner), then runs the MASTER_DB macro step last.
+    Every attempt is stored in the refresh_runs history table, and the
+    predicted vs. actual durations are saved as a plan report.
+    If export_dir is given, each successfully refreshed workbook is
+    exported to partitioned Parquet and an Arrow IPC cache.
+    If group_name is given, only files of that group are refreshed.
+    Each run is traced (src.utils.tracing); the report carries its trace_id.
+    A refresh_planner.RefreshControl, if given, exposes per-file progress and lets the
+    caller cancel the run or move a workbook to the front of the queue while it runs.
     """
+    with start_trace("refresh_run", workers=workers, group=group_name or "all"):
+        return _run_planned_refreshes(refresh_delay, inter_file_delay, export_dir, group_name, workers, control)
+
+def _run_planned_refreshes(refresh_delay, inter_file_delay, export_dir, group_name, workers, control=None):
     from src.database import db_manager
-    excel_files = db_manager.get_all_paths()
+    from src.database.config import MASTER_DB
+    from src.excel import refresh_planner
+
+    with span("plan"):
+        plan = refresh_planner.build_plan(refresh_delay, inter_file_delay, workers, group_name, MASTER_DB)
+    entries = plan["entries"]
 
-    if not excel_files:
-        print("No files found in the database. Add files using the 'add' command.")
+    if not entries:
+        logger.warning("No files found in the database. Add files using the 'add' command.")
         return
 
-    for file in excel_files:
-        refresh_excel(file, refresh_delay)
-        print(f"⏳ 다음 파일까지 {inter_file_delay}초 대기 중...")
-        time.sleep(inter_file_delay)
+    logger.info("%d개 파일, 작업자 %d명 - 예상 소요 시간 %s초", len(entries), plan["workers"], plan["predicted_makespan_sec"])
+    started = time.monotonic()
+    control = control or refresh_planner.RefreshControl()
+    results = refresh_planner.execute_plan(
+        plan,
+        lambda path: refresh_and_record(entries[path], refresh_delay, export_dir),
+        inter_file_delay,
+        control
+    )
 
     # ✅ 후처리
-    print(f"✨ 기본 새로고침 완료. 30초 후 후처리 작업을 시작합니다...")
-    time.sleep(30)
-
-    # 후처리 대상 파일이 DB에 있는지 확인
-    from src.database.config import MASTER_DB
-    if MASTER_DB in excel_files:
+    if plan["final"] and not control.cancelled.is_set():
+        logger.info("기본 새로고침 완료. %d초 후 후처리 작업을 시작합니다...", refresh_planner.MASTER_SETTLE_SEC)
+        with span("settle"):
+            control.cancelled.wait(refresh_planner.MASTER_SETTLE_SEC)  # 취소하면 바로 종료
+    if plan["final"] and control.cancelled.is_set():
+        logger.warning("새로고침이 취소되어 후처리 매크로를 실행하지 않습니다.")
+        control.mark(MASTER_DB, "cancelled")
+    elif plan["final"]:
         macro_name = "CombineWithTableAndSource"
-        refresh_and_run_macro(MASTER_DB, macro_name, refresh_delay)
+        control.mark(MASTER_DB, "running")
+        t0 = time.monotonic()
+        ok = refresh_and_record(entries[MASTER_DB], refresh_delay, export_dir, macro_name=macro_name)
+        results[MASTER_DB] = {"ok": ok, "actual_sec": round(time.monotonic() - t0, 1)}
+        control.mark(MASTER_DB, "done" if ok else "failed")
     else:
-        print(f"⚠️ 후처리 대상 파일({MASTER_DB})이 DB에 없습니다. 후처리 매크로를 실행하지 않습니다.")
-    
-    print("✅ 모든 작업 완료")
+        logger.warning("후처리 대상 파일(%s)이 DB에 없습니다. 후처리 매크로를 실행하지 않습니다.", MASTER_DB)
+
+    report = refresh_planner.compare_plan(plan, results, time.monotonic() - started)
+    report["trace_id"] = current_trace_id()
+    report["cancelled"] = control.cancelled.is_set()
+    db_manager.save_plan_report(report)
+    logger.info("모든 작업 완료 - 예상 %s초 / 실제 %s초", report["predicted_makespan_sec"], report["actual_makespan_sec"])
+    return report
 
 if __name__ == '__main__':
     # Interactive session is now handled by main.py
     # This block can be used for direct testing.
-    print("Running refreshes with default delays (10s refresh, 5s inter-file)...")
+    from src.utils.logging_setup import setup_logging
+    setup_logging()
+    logger.info("Running refreshes with default delays (10s refresh, 5s inter-file)...")
     run_all_refreshes()
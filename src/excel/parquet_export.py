@@ -0,0 +1,373 @@
+"""
+리프레시된 엑셀 파일을 Parquet(파티션) / Arrow IPC 캐시로 내보내는 모듈
+
+출력 구조:
+    <export_dir>/parquet/workbook=<파일명>/sheet=<시트명>/refreshed_date=<YYYY-MM-DD>/part-<HHMMSS>.parquet
+    <export_dir>/parquet/workbook=<파일명>/sheet=<시트명>/_schema.json   (스키마, 값이 맞지 않으면 넓혀서 다시 기록)
+    <export_dir>/arrow/<파일명>__<시트명>.<버전>.arrow                     (최신본, memory-map으로 읽기)
+
+Arrow 캐시는 내보낼 때마다 새 버전 파일로 쓰고 이전 버전은 지움
+(Windows에서는 memory-map으로 열려 있는 파일을 덮어쓰거나 지울 수 없으므로, 읽는 중인 이전 버전은 다음 내보내기 때 다시 지움)
+챗봇은 list_arrow_caches / query_arrow_cache로 최신 버전을 복사 없이 조회
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _safe_name(name: str) -> str:
+    """파일/컬럼 이름에서 특수문자를 '_'로 치환"""
+    return "".join(c if c.isalnum() or c == '_' else '_' for c in str(name))
+
+
+def _infer_type(series: "pd.Series") -> str:
+    """pandas 컬럼 -> 스키마에 기록할 Arrow 타입 이름"""
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series):
+        return "int64"
+    if pd.api.types.is_float_dtype(series):
+        return "double"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "timestamp[ms]"
+    return "string"
+
+
+_ARROW_TYPES = {
+    "bool": lambda: pa.bool_(),
+    "int64": lambda: pa.int64(),
+    "double": lambda: pa.float64(),
+    "timestamp[ms]": lambda: pa.timestamp("ms"),
+    "string": lambda: pa.string(),
+}
+
+
+_NUMERIC_RANK = {"bool": 0, "int64": 1, "double": 2}
+
+
+def _widen(type_name: str, series: "pd.Series") -> str:
+    """
+    저장된 타입으로 표현할 수 없는 값이 있으면 넓힌 타입 반환
+    숫자끼리는 bool -> int64 -> double, 그 외 충돌은 string (값이 모두 비어 있으면 그대로)
+    """
+    values = series.dropna()
+    if values.empty or type_name == "string":
+        return type_name
+    inferred = _infer_type(values)
+    if inferred == "double" and (values % 1 == 0).all():
+        inferred = "int64"  # 빈 칸 때문에 float이 된 정수 컬럼
+    if inferred == type_name:
+        return type_name
+    if type_name in _NUMERIC_RANK and inferred in _NUMERIC_RANK:
+        return max(type_name, inferred, key=_NUMERIC_RANK.get)
+    return "string"
+
+
+def _load_schema(schema_path: Path, df: "pd.DataFrame") -> Dict[str, str]:
+    """
+    저장된 스키마 로드 (없으면 df에서 추론)
+    새 컬럼은 뒤에 추가되고, 기존 컬럼에 저장된 타입으로 표현할 수 없는 값이 생기면
+    타입을 넓혀(int64 -> double, 그 외 -> string) _schema.json을 다시 기록
+    (이전 파티션 파일은 예전 타입 그대로 남으므로 여러 파티션은 read_partitions로 맞춰 읽음)
+    """
+    schema: Dict[str, str] = {}
+    if schema_path.exists():
+        schema = json.loads(schema_path.read_text(encoding="utf-8"))
+    changed = not schema_path.exists()
+    for col in df.columns:
+        if col not in schema:
+            schema[col] = _infer_type(df[col])
+            changed = True
+            continue
+        widened = _widen(schema[col], df[col])
+        if widened != schema[col]:
+            logger.warning("%s: 컬럼 %s 타입 변경 %s -> %s", schema_path.parent, col, schema[col], widened)
+            schema[col] = widened
+            changed = True
+    if changed:
+        schema_path.parent.mkdir(parents=True, exist_ok=True)
+        schema_path.write_text(json.dumps(schema, ensure_ascii=False, indent=2), encoding="utf-8")
+    return schema
+
+
+def _to_arrow_table(df: "pd.DataFrame", schema: Dict[str, str]) -> "pa.Table":
+    """고정 스키마에 맞춰 DataFrame을 Arrow Table로 변환 (없는 컬럼은 null)"""
+    df = df.reindex(columns=list(schema.keys()))
+    for col, type_name in schema.items():
+        if type_name == "string":
+            df[col] = df[col].map(lambda v: None if pd.isna(v) else str(v))
+        elif type_name == "timestamp[ms]":
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif type_name in ("int64", "double"):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    arrow_schema = pa.schema([(col, _ARROW_TYPES[t]()) for col, t in schema.items()])
+    return pa.Table.from_pandas(df, schema=arrow_schema, preserve_index=False)
+
+
+def export_workbook(
+    file_path: str,
+    export_dir: str,
+    sheet_names: Optional[List[str]] = None,
+    write_arrow_cache: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    엑셀 파일의 시트들을 Parquet 파티션과 Arrow IPC 캐시로 저장
+
+    Args:
+        file_path: 엑셀 파일 경로
+        export_dir: 출력 루트 폴더
+        sheet_names: 내보낼 시트 (None이면 전체)
+        write_arrow_cache: Arrow IPC 캐시 파일 생성 여부
+
+    Returns:
+        시트별 내보내기 결과 리스트
+    """
+    if not PANDAS_AVAILABLE or not PYARROW_AVAILABLE:
+        raise ImportError("pandas와 pyarrow가 필요합니다. pip install pandas openpyxl pyarrow 실행하세요.")
+
+    workbook = _safe_name(Path(file_path).stem)
+    now = datetime.now()
+    root = Path(export_dir)
+
+    sheets = pd.read_excel(file_path, sheet_name=sheet_names if sheet_names else None)
+    results = []
+    for sheet, df in sheets.items():
+        sheet_dir = root / "parquet" / f"workbook={workbook}" / f"sheet={_safe_name(sheet)}"
+        df.columns = [_safe_name(col) for col in df.columns]
+
+        schema = _load_schema(sheet_dir / "_schema.json", df)
+        table = _to_arrow_table(df, schema)
+
+        partition = sheet_dir / f"refreshed_date={now:%Y-%m-%d}"
+        partition.mkdir(parents=True, exist_ok=True)
+        parquet_path = partition / f"part-{now:%H%M%S}.parquet"
+        pq.write_table(table, parquet_path, compression="zstd")
+
+        result = {
+            "sheet_name": sheet,
+            "row_count": table.num_rows,
+            "parquet_path": str(parquet_path),
+            "arrow_path": None
+        }
+        if write_arrow_cache:
+            arrow_dir = root / "arrow"
+            arrow_dir.mkdir(parents=True, exist_ok=True)
+            name = f"{workbook}__{_safe_name(sheet)}"
+            # 읽는 중인 이전 버전을 덮어쓰지 않도록 새 버전 파일로 기록
+            arrow_path = arrow_dir / f"{name}.{now:%Y%m%d%H%M%S%f}.arrow"
+            tmp_path = arrow_path.with_suffix(".arrow.tmp")
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, arrow_path)
+            _remove_old_versions(arrow_dir, name, arrow_path)
+            result["arrow_path"] = str(arrow_path)
+        results.append(result)
+
+    return results
+
+
+def _remove_old_versions(arrow_dir: Path, name: str, keep: Path):
+    """같은 시트의 이전 Arrow 캐시 삭제 (아직 열려 있어 지울 수 없는 파일은 다음 내보내기 때 다시 시도)"""
+    for path in list(arrow_dir.glob(f"{name}.*.arrow")) + [arrow_dir / f"{name}.arrow"]:
+        if path == keep or not path.exists():
+            continue
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.debug("이전 Arrow 캐시를 지우지 못했습니다 (사용 중): %s (%s)", path, e)
+
+
+def read_partitions(sheet_dir: str) -> "pa.Table":
+    """시트의 모든 Parquet 파티션을 _schema.json의 (넓혀진) 스키마로 맞춰 하나의 Table로 읽기"""
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow가 설치되어 있지 않습니다.")
+    schema = json.loads((Path(sheet_dir) / "_schema.json").read_text(encoding="utf-8"))
+    arrow_schema = pa.schema([(col, _ARROW_TYPES[t]()) for col, t in schema.items()])
+    tables = []
+    for part in sorted(Path(sheet_dir).glob("refreshed_date=*/*.parquet")):
+        table = pq.read_table(part)
+        columns = [
+            table.column(field.name).cast(field.type) if field.name in table.column_names
+            else pa.nulls(table.num_rows, field.type)
+            for field in arrow_schema
+        ]
+        tables.append(pa.Table.from_arrays(columns, schema=arrow_schema))
+    return pa.concat_tables(tables) if tables else arrow_schema.empty_table()
+
+
+def read_arrow_cache(arrow_path: str) -> "pa.Table":
+    """Arrow IPC 캐시를 memory-map으로 읽기 (버퍼 복사 없음)"""
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow가 설치되어 있지 않습니다.")
+    with pa.memory_map(arrow_path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def list_arrow_caches(arrow_dir: str) -> Dict[str, str]:
+    """캐시 이름(<파일명>__<시트명>) -> 최신 버전 파일 경로"""
+    latest: Dict[str, str] = {}
+    try:
+        paths = sorted(Path(arrow_dir).glob("*.arrow"))  # 버전(시각)이 이름에 있으므로 정렬 순서 = 오래된 순
+    except OSError:
+        return {}
+    for path in paths:
+        latest[path.name.split(".", 1)[0]] = str(path)
+    return latest
+
+
+_ARROW_FILTERS = {
+    "eq": lambda col, v: pc.equal(col, v),
+    "ne": lambda col, v: pc.not_equal(col, v),
+    "lt": lambda col, v: pc.less(col, v),
+    "le": lambda col, v: pc.less_equal(col, v),
+    "gt": lambda col, v: pc.greater(col, v),
+    "ge": lambda col, v: pc.greater_equal(col, v),
+    "like": lambda col, v: pc.match_like(pc.cast(col, pa.string()), str(v.as_py())),
+    "isnull": lambda col, v: pc.is_null(col),
+    "notnull": lambda col, v: pc.is_valid(col),
+}
+
+
+def query_arrow_cache(
+    arrow_path: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[tuple]] = None,
+    offset: int = 0,
+    limit: int = 100
+) -> Dict[str, Any]:
+    """
+    memory-map한 Arrow 캐시에서 바로 한 페이지 조회 (SQLite로 옮기지 않음)
+    컬럼 선택/페이지 자르기는 복사 없이 처리하고, 파이썬 객체로 바꾸는 것은 반환하는 행뿐
+    (필터가 있으면 조건에 맞는 행만 새 버퍼로 모음)
+
+    Args:
+        arrow_path: Arrow IPC 캐시 경로
+        columns: 조회할 컬럼 (None이면 전체)
+        filters: (컬럼, 연산자, 값) 리스트 - 연산자는 data_loader.FILTER_OPERATORS와 같음
+        offset: 건너뛸 행 수
+        limit: 페이지 크기
+
+    Returns:
+        {"columns", "data", "total_rows", "next_offset"} - next_offset이 None이면 마지막 페이지
+    """
+    table = read_arrow_cache(arrow_path)
+    selected = columns or table.column_names
+    missing = [col for col in selected + [f[0] for f in filters or []] if col not in table.column_names]
+    if missing:
+        raise ValueError(f"존재하지 않는 컬럼: {', '.join(missing)}")
+
+    for col, op, value in filters or []:
+        if op not in _ARROW_FILTERS:
+            raise ValueError(f"지원하지 않는 필터 연산자: {op}")
+        column = table.column(col)
+        scalar = None
+        if op not in ("isnull", "notnull"):
+            try:
+                scalar = pa.scalar(value).cast(pa.string() if op == "like" else column.type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                raise ValueError(f"{col} 컬럼({column.type})과 비교할 수 없는 값: {value}")
+        table = table.filter(_ARROW_FILTERS[op](column, scalar))
+
+    offset, limit = max(0, offset), max(1, limit)
+    page = table.select(selected).slice(offset, limit)
+    next_offset = offset + page.num_rows
+    return {
+        "columns": selected,
+        "data": page.to_pylist(),
+        "total_rows": table.num_rows,
+        "next_offset": next_offset if next_offset < table.num_rows else None
+    }
+
+
+def benchmark_export(file_path: str, output_dir: str, sheet_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    기존 CSV + to_sql 경로와 Parquet + Arrow 경로의 시간/용량 비교 (같은 시트 1개 기준)
+
+    Returns:
+        {"csv_sqlite": {...}, "parquet_arrow": {...}}
+    """
+    if not PANDAS_AVAILABLE or not PYARROW_AVAILABLE:
+        raise ImportError("pandas와 pyarrow가 필요합니다.")
+
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    # 두 방식 모두 같은 시트 1개로 비교 (지정하지 않으면 첫 시트)
+    if sheet_name is None:
+        sheet_name = pd.ExcelFile(file_path).sheet_names[0]
+
+    # 1. 기존 방식 (backup/xlsmtodb_backup.py와 동일)
+    start = time.perf_counter()
+    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    read_time = time.perf_counter() - start
+
+    csv_path, db_path = out / "bench.csv", out / "bench.db"
+    start = time.perf_counter()
+    df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    with sqlite3.connect(db_path) as conn:
+        df.to_sql("Combined", conn, if_exists="replace", index=False)
+    legacy_write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        pd.read_sql_query("SELECT * FROM Combined", conn)
+    legacy_read = time.perf_counter() - start
+
+    # 2. Parquet + Arrow IPC
+    start = time.perf_counter()
+    results = export_workbook(file_path, str(out / "export"), [sheet_name])
+    export_time = time.perf_counter() - start
+    first = results[0]
+
+    start = time.perf_counter()
+    read_arrow_cache(first["arrow_path"])
+    arrow_read = time.perf_counter() - start
+
+    return {
+        "rows": len(df),
+        "excel_read_sec": round(read_time, 3),
+        "csv_sqlite": {
+            "write_sec": round(legacy_write, 3),
+            "read_sec": round(legacy_read, 3),
+            "csv_bytes": csv_path.stat().st_size,
+            "sqlite_bytes": db_path.stat().st_size
+        },
+        "parquet_arrow": {
+            # export_workbook은 엑셀 읽기 시간을 포함하므로 별도로 제외
+            "write_sec": round(max(export_time - read_time, 0), 3),
+            "read_sec": round(arrow_read, 4),
+            "parquet_bytes": Path(first["parquet_path"]).stat().st_size,
+            "arrow_bytes": Path(first["arrow_path"]).stat().st_size
+        }
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("사용법: python -m src.excel.parquet_export <엑셀파일> <출력폴더> [시트명]")
+        sys.exit(1)
+    report = benchmark_export(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,147 @@
+"""
+Background refresh jobs.
+
+Runs run_all_refreshes on a job thread so the caller (terminal mode) gets control back
+right away. Each job carries a RefreshControl for live per-file progress, cancellation
+and moving a workbook to the front of the queue. Its log lines go to the job log
+(logs/jobs/<job_id>.jsonl, see src.utils.logging_setup).
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from src.excel.refresh_planner import RefreshControl
+from src.utils.logging_setup import job_context, new_job_id
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshJob:
+    """State of one background refresh run."""
+
+    def __init__(self, job_id: str, params: Dict[str, Any]):
+        self.job_id = job_id
+        self.params = params
+        self.status = "queued"  # queued / running / completed / cancelled / failed
+        self.control = RefreshControl()
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.report: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self, include_files: bool = False) -> Dict[str, Any]:
+        progress = self.control.snapshot()
+        counts: Dict[str, int] = {}
+        for item in progress["files"]:
+            counts[item["state"]] = counts.get(item["state"], 0) + 1
+        data = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "group": self.params.get("group_name"),
+            "workers": self.params.get("workers", 1),
+            "total": len(progress["files"]),
+            "counts": counts,
+            "elapsed_sec": round((self.finished_at or time.time()) - self.started_at, 1) if self.started_at else 0.0,
+            "eta_sec": progress["eta_sec"] if self.status == "running" else None,
+            "cancel_requested": self.control.cancelled.is_set(),
+            "created_at": self.created_at,
+            "error": self.error,
+        }
+        if include_files:
+            data["files"] = progress["files"]
+        return data
+
+
+class RefreshJobManager:
+    """Queue of background refresh jobs."""
+
+    def __init__(self, max_concurrent: int = 1, max_history: int = 50):
+        """
+        Args:
+            max_concurrent: jobs running at the same time (one job already drives several Excel instances)
+            max_history: finished jobs kept in memory
+        """
+        self.max_history = max_history
+        self._jobs: Dict[str, RefreshJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="refresh-job")
+
+    def submit(self, refresh_delay: int = 10, inter_file_delay: int = 5, export_dir: Optional[str] = None,
+               group_name: Optional[str] = None, workers: int = 1) -> RefreshJob:
+        """Queues a refresh run (same arguments as run_all_refreshes) and returns immediately."""
+        job = RefreshJob(new_job_id(), {
+            "refresh_delay": refresh_delay, "inter_file_delay": inter_file_delay,
+            "export_dir": export_dir, "group_name": group_name, "workers": workers,
+        })
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job)
+        self._trim_history()
+        return job
+
+    def _run(self, job: RefreshJob):
+        with job_context(job.job_id):
+            if job.control.cancelled.is_set():
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                return
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                from src.excel import excelrefresh_time_delay as excel_refresher
+
+                job.report = excel_refresher.run_all_refreshes(control=job.control, **job.params)
+                job.status = "cancelled" if job.control.cancelled.is_set() else "completed"
+            except Exception as e:
+                logger.exception("Background refresh error: %s", e)
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+
+    def _trim_history(self):
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.finished_at]
+            for job in sorted(finished, key=lambda j: j.finished_at)[:-self.max_history or None]:
+                self._jobs.pop(job.job_id, None)
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[RefreshJob]:
+        """Jobs, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def active_jobs(self) -> List[RefreshJob]:
+        return [job for job in self.list_jobs() if job.active]
+
+    def cancel(self, job_id: str) -> bool:
+        """Requests cancellation; workbooks already open in Excel finish first."""
+        job = self._jobs.get(job_id)
+        if job is None or not job.active:
+            return False
+        job.control.cancel()
+        return True
+
+    def bump(self, job_id: str, file_path: str) -> bool:
+        """Moves a not-yet-started workbook of a running job to the front of the queue."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status != "running":
+            return False
+        return job.control.bump(file_path)
+
+    def shutdown(self, cancel: bool = True):
+        """Stops the job thread pool (cancelling active jobs first if cancel is set) and waits."""
+        if cancel:
+            for job in self.active_jobs():
+                job.control.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,408 @@
+"""
+Refresh batch planner.
+
+Estimates how long each workbook takes (recent refresh history, or file size for
+files without history) and assigns workbooks to N Excel workers with
+longest-processing-time-first list scheduling, respecting dependencies.
+The MASTER_DB macro step is planned after everything else.
+After a run, the prediction is compared with the actual durations.
+"""
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import List, Dict, Any, Optional, Callable
+
+from src.utils.metrics import REFRESH_QUEUE_DEPTH
+from src.utils.profiling import profile_thread
+from src.utils.tracing import run_in_context, span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEC_PER_MB = 2.0   # open/calc/save cost per MB when there is no history to fit
+MASTER_SETTLE_SEC = 30     # pause before the MASTER_DB macro step (see run_all_refreshes)
+
+
+def _file_size_mb(path: str) -> Optional[float]:
+    try:
+        return os.path.getsize(path) / (1024 * 1024)
+    except OSError:
+        return None
+
+
+def estimate_durations(
+    entries: List[Dict[str, Any]],
+    duration_stats: Dict[str, Dict[str, Any]],
+    refresh_delay: int = 10
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Estimated seconds per workbook.
+    Files with history use their recent average. Other files use
+    wait time + seconds-per-MB * size, with seconds-per-MB fitted on files that have both.
+
+    Returns {file_path: {"estimate_sec", "source": "history" | "size" | "default", "size_mb"}}
+    """
+    sizes = {e["file_path"]: _file_size_mb(e["file_path"]) for e in entries}
+
+    def wait_time(entry):
+        return entry.get("timeout_sec") or refresh_delay
+
+    # Fit the per-MB cost on the part of the duration that is not the fixed wait
+    rates = []
+    for entry in entries:
+        avg = (duration_stats.get(entry["file_path"]) or {}).get("avg_sec")
+        size = sizes[entry["file_path"]]
+        if avg is not None and size:
+            rates.append(max(avg - wait_time(entry), 0.0) / size)
+    sec_per_mb = sum(rates) / len(rates) if rates else DEFAULT_SEC_PER_MB
+
+    estimates = {}
+    for entry in entries:
+        path = entry["file_path"]
+        avg = (duration_stats.get(path) or {}).get("avg_sec")
+        if avg is not None:
+            estimate, source = avg, "history"
+        elif sizes[path] is not None:
+            estimate, source = wait_time(entry) + sec_per_mb * sizes[path], "size"
+        else:
+            estimate, source = float(wait_time(entry)), "default"
+        estimates[path] = {
+            "estimate_sec": round(estimate, 2),
+            "source": source,
+            "size_mb": round(sizes[path], 2) if sizes[path] is not None else None,
+        }
+    return estimates
+
+
+def plan_refresh(
+    entries: List[Dict[str, Any]],
+    estimates: Dict[str, Dict[str, Any]],
+    workers: int = 1,
+    dependencies: Optional[Dict[str, List[str]]] = None,
+    inter_file_delay: int = 5,
+    final_file: Optional[str] = None,
+    final_estimate: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    List scheduling: whenever a worker becomes free, it takes the ready workbook with the
+    highest priority and, within that, the longest estimate (LPT). A workbook is ready when
+    all of its dependencies are planned to finish by the time it starts.
+
+    Args:
+        entries: enabled files (get_paths_detailed rows), final_file excluded
+        estimates: estimate_durations() result
+        workers: number of parallel Excel instances
+        dependencies: {file_path: [file_paths it must wait for]}
+        inter_file_delay: pause a worker takes after each workbook
+        final_file: workbook refreshed last, after every other workbook (MASTER_DB)
+        final_estimate: estimated seconds for the final step
+
+    Returns:
+        {"workers", "tasks": [{file_path, worker, start_sec, end_sec, estimate_sec, depends_on}],
+         "final": {...} | None, "predicted_makespan_sec"}
+    Raises ValueError on dependency cycles.
+    """
+    workers = max(1, workers)
+    dependencies = dependencies or {}
+    by_path = {e["file_path"]: e for e in entries}
+    deps = {p: [d for d in dependencies.get(p, []) if d in by_path] for p in by_path}
+
+    finish: Dict[str, float] = {}
+    free = [(0.0, w) for w in range(workers)]  # (time the worker becomes free, worker index)
+    heapq.heapify(free)
+    remaining = set(by_path)
+    tasks = []
+
+    def rank(path):
+        return (-by_path[path]["priority"], -estimates[path]["estimate_sec"], path)
+
+    while remaining:
+        now, worker = heapq.heappop(free)
+        scheduled = [p for p in remaining if all(d in finish for d in deps[p])]
+        if not scheduled:
+            raise ValueError(f"Dependency cycle between: {', '.join(sorted(remaining))}")
+        # Prefer work that can start now; otherwise the one whose dependencies finish first
+        startable = [p for p in scheduled if all(finish[d] <= now for d in deps[p])]
+        if startable:
+            path = min(startable, key=rank)
+            start = now
+        else:
+            path = min(scheduled, key=lambda p: (max(finish[d] for d in deps[p]),) + rank(p))
+            start = max(finish[d] for d in deps[path])
+        duration = estimates[path]["estimate_sec"]
+        end = start + duration
+        finish[path] = end
+        remaining.discard(path)
+        tasks.append({
+            "file_path": path,
+            "worker": worker,
+            "start_sec": round(start, 1),
+            "end_sec": round(end, 1),
+            "estimate_sec": duration,
+            "depends_on": deps[path],
+        })
+        heapq.heappush(free, (end + inter_file_delay, worker))
+
+    makespan = max((t["end_sec"] for t in tasks), default=0.0)
+    final = None
+    if final_file:
+        start = makespan + MASTER_SETTLE_SEC
+        duration = final_estimate or 0.0
+        final = {"file_path": final_file, "start_sec": round(start, 1), "end_sec": round(start + duration, 1),
+                 "estimate_sec": duration}
+        makespan = final["end_sec"]
+
+    tasks.sort(key=lambda t: (t["start_sec"], t["worker"]))
+    return {"workers": workers, "tasks": tasks, "final": final, "predicted_makespan_sec": round(makespan, 1)}
+
+
+class RefreshControl:
+    """
+    Live state and controls of one refresh run (passed to execute_plan / run_all_refreshes).
+
+    Per-file state: queued -> waiting (for dependencies) -> running -> done | failed,
+    or cancelled when the run is cancelled before the workbook started.
+    cancel() stops workers from starting new workbooks; workbooks already open in Excel finish.
+    bump(path) makes the next free worker take that workbook, whatever worker it was planned on,
+    once all of its dependencies have started.
+    """
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.workers = 1
+        self.started: Optional[float] = None
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._bumped: List[str] = []
+        self._claimed: set = set()
+
+    def attach(self, plan: Dict[str, Any]):
+        """Registers the planned workbooks (all queued); called when the run starts."""
+        with self._lock:
+            self.workers = plan["workers"]
+            self.started = time.monotonic()
+            for task in plan["tasks"] + ([plan["final"]] if plan.get("final") else []):
+                self._tasks[task["file_path"]] = task
+                self.files[task["file_path"]] = {
+                    "state": "queued", "worker": task.get("worker"), "estimate_sec": task["estimate_sec"],
+                    "started_at": None, "finished_at": None, "final": task is plan.get("final"),
+                }
+
+    def mark(self, path: str, state: str):
+        with self._lock:
+            info = self.files[path]
+            info["state"] = state
+            if state == "running":
+                info["started_at"] = time.monotonic()
+            elif state in ("done", "failed"):
+                info["finished_at"] = time.monotonic()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def bump(self, path: str) -> bool:
+        """Moves a queued workbook to the front of the queue; False if it already started or is unknown."""
+        with self._lock:
+            if path not in self.files or path in self._claimed or self.files[path]["final"]:
+                return False
+            if path in self._bumped:
+                self._bumped.remove(path)
+            self._bumped.insert(0, path)
+            return True
+
+    def next_task(self, own: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        The next workbook for a worker: a bumped workbook whose dependencies have all started
+        (running, done or failed), otherwise the next unclaimed workbook of the worker's own
+        planned list. None when the worker is done or cancelled.
+        A dependency that is merely claimed may itself be waiting on work still queued in this
+        worker's own list, so a bumped workbook is never released on a claim alone.
+        """
+        with self._lock:
+            if self.cancelled.is_set():
+                return None
+            self._bumped = [p for p in self._bumped if p not in self._claimed]
+            for path in self._bumped:
+                if all(self.files[dep]["state"] in ("running", "done", "failed")
+                       for dep in self._tasks[path]["depends_on"]):
+                    self._bumped.remove(path)
+                    self._claimed.add(path)
+                    return self._tasks[path]
+            while own:
+                task = own.pop(0)
+                if task["file_path"] not in self._claimed:
+                    self._claimed.add(task["file_path"])
+                    return task
+            return None
+
+    def unclaimed(self) -> List[str]:
+        with self._lock:
+            return [p for p, info in self.files.items() if p not in self._claimed and not info["final"]]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Per-file state with elapsed time and a rough ETA: remaining estimated work spread over
+        the workers, plus the final step (which runs alone after everything else).
+        """
+        now = time.monotonic()
+        with self._lock:
+            files, parallel_left, final_left = [], 0.0, 0.0
+            for path, info in self.files.items():
+                elapsed = None
+                if info["started_at"] is not None:
+                    elapsed = (info["finished_at"] or now) - info["started_at"]
+                if info["state"] in ("queued", "waiting"):
+                    left = info["estimate_sec"]
+                elif info["state"] == "running":
+                    left = max(info["estimate_sec"] - elapsed, 0.0)
+                else:
+                    left = 0.0
+                if info["final"]:
+                    final_left += left
+                else:
+                    parallel_left += left
+                files.append({
+                    "file_path": path,
+                    "state": info["state"],
+                    "worker": info["worker"],
+                    "estimate_sec": info["estimate_sec"],
+                    "elapsed_sec": round(elapsed, 1) if elapsed is not None else None,
+                    "eta_sec": round(left, 1) if info["state"] in ("queued", "waiting", "running") else None,
+                })
+        return {
+            "elapsed_sec": round(now - self.started, 1) if self.started else 0.0,
+            "eta_sec": round(parallel_left / max(self.workers, 1) + final_left, 1),
+            "files": files,
+        }
+
+
+def execute_plan(
+    plan: Dict[str, Any],
+    run_task: Callable[[str], bool],
+    inter_file_delay: int = 5,
+    control: Optional[RefreshControl] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs the planned tasks: each worker thread processes its assigned workbooks in plan order,
+    waiting for dependencies to finish first (a failed dependency does not block dependents).
+    With a control, workers also take bumped workbooks first, stop starting new workbooks once
+    the run is cancelled, and report per-file state.
+
+    Returns {file_path: {"ok", "start_sec", "end_sec", "actual_sec"}} (seconds since the run started)
+    """
+    control = control or RefreshControl()
+    control.attach(plan)
+    per_worker: Dict[int, List[Dict[str, Any]]] = {}
+    for task in plan["tasks"]:
+        per_worker.setdefault(task["worker"], []).append(task)
+    done = {task["file_path"]: threading.Event() for task in plan["tasks"]}
+    results: Dict[str, Dict[str, Any]] = {}
+    started = time.monotonic()
+    REFRESH_QUEUE_DEPTH.set(len(plan["tasks"]))
+
+    def worker_loop(worker, tasks):
+        with span("worker", worker=worker), profile_thread():
+            while True:
+                task = control.next_task(tasks)
+                if task is None:
+                    break
+                path = task["file_path"]
+                if task["depends_on"]:
+                    control.mark(path, "waiting")
+                    with span("wait_dependencies"):
+                        for dep in task["depends_on"]:
+                            while not done[dep].wait(0.5) and not control.cancelled.is_set():
+                                pass
+                REFRESH_QUEUE_DEPTH.dec()
+                if control.cancelled.is_set():
+                    control.mark(path, "cancelled")
+                    done[path].set()
+                    break
+                control.mark(path, "running")
+                t0 = time.monotonic()
+                try:
+                    ok = bool(run_task(path))
+                except Exception as e:
+                    logger.exception("오류 발생 - %s: %s", path, e)
+                    ok = False
+                t1 = time.monotonic()
+                results[path] = {
+                    "ok": ok,
+                    "start_sec": round(t0 - started, 1),
+                    "end_sec": round(t1 - started, 1),
+                    "actual_sec": round(t1 - t0, 1),
+                }
+                control.mark(path, "done" if ok else "failed")
+                done[path].set()
+                if inter_file_delay and not control.cancelled.is_set():
+                    logger.info("다음 파일까지 %s초 대기 중...", inter_file_delay)
+                    with span("inter_file_delay"):
+                        control.cancelled.wait(inter_file_delay)
+
+    # 작업자 스레드가 현재 trace(새로고침 작업)의 하위 span을 기록하도록 context를 복사해 실행
+    threads = [
+        threading.Thread(target=run_in_context(worker_loop), args=(w, tasks), name=f"refresh-worker-{w}")
+        for w, tasks in sorted(per_worker.items())
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for path in control.unclaimed():
+        control.mark(path, "cancelled")
+        done[path].set()
+    REFRESH_QUEUE_DEPTH.set(0)
+    return results
+
+
+def compare_plan(plan: Dict[str, Any], results: Dict[str, Dict[str, Any]], actual_makespan: float) -> Dict[str, Any]:
+    """Predicted vs. actual per workbook and for the whole run."""
+    files = []
+    for task in plan["tasks"] + ([plan["final"]] if plan.get("final") else []):
+        result = results.get(task["file_path"], {})
+        actual = result.get("actual_sec")
+        files.append({
+            "file_path": task["file_path"],
+            "ok": bool(result.get("ok")),  # False for failed and for never-run workbooks
+            "predicted_sec": task["estimate_sec"],
+            "actual_sec": actual,
+            "error_sec": round(actual - task["estimate_sec"], 1) if actual is not None else None,
+        })
+    predicted = plan["predicted_makespan_sec"]
+    return {
+        "workers": plan["workers"],
+        "predicted_makespan_sec": predicted,
+        "actual_makespan_sec": round(actual_makespan, 1),
+        "error_pct": round((actual_makespan - predicted) / predicted * 100, 1) if predicted else None,
+        "files": files,
+    }
+
+
+def build_plan(refresh_delay: int = 10, inter_file_delay: int = 5, workers: int = 1,
+               group_name: Optional[str] = None, master_db: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Plan for the enabled files in the database (optionally one group).
+    master_db, if enabled, is taken out of the parallel phase and planned as the final step.
+
+    Returns the plan_refresh() result plus "entries" ({file_path: row}) and "estimates".
+    """
+    from src.database import db_manager
+
+    rows = db_manager.get_paths_detailed(enabled_only=True, group_name=group_name)
+    estimates = estimate_durations(rows, db_manager.get_duration_stats(), refresh_delay)
+    entries = {row["file_path"]: row for row in rows}
+    final = master_db if master_db in entries else None
+    plan = plan_refresh(
+        [row for row in rows if row["file_path"] != final],
+        estimates,
+        workers=workers,
+        dependencies=db_manager.get_dependencies(),
+        inter_file_delay=inter_file_delay,
+        final_file=final,
+        final_estimate=estimates[final]["estimate_sec"] if final else None
+    )
+    plan["entries"] = entries
+    plan["estimates"] = estimates
+    return plan
@@ -0,0 +1,227 @@
+"""
+폴더 목록 조회 캐시
+os.scandir로 한 번에 항목 종류까지 읽고, 결과를 짧은 시간 동안 캐시 (폴더 수정 시각이 바뀌면 다시 읽음)
+네트워크 공유 폴더(SMB)처럼 항목 조회가 느린 경로에서 페이지 이동/검색 시 재조회를 줄임
+
+벤치마크: python -m src.utils.dir_listing [항목 수]
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+
+class DirectoryListingCache:
+    """폴더별 (폴더 + 엑셀 파일) 목록 캐시 (TTL + 수정 시각 검증, LRU 제거)"""
+
+    def __init__(self, ttl: float = 10.0, max_dirs: int = 256, extensions: Tuple[str, ...] = EXCEL_EXTENSIONS):
+        """
+        Args:
+            ttl: 이 시간(초) 이내에는 검증 없이 캐시 사용, 지나면 폴더 수정 시각을 확인
+            max_dirs: 캐시할 최대 폴더 수
+            extensions: 목록에 포함할 파일 확장자 (폴더는 항상 포함)
+        """
+        self.ttl = ttl
+        self.max_dirs = max_dirs
+        self.extensions = extensions
+        # 경로 -> (확인 시각, 폴더 수정 시각, 정렬된 항목 리스트)
+        self._entries: "OrderedDict[str, Tuple[float, float, List[Dict[str, str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _scan(self, path: str) -> List[Dict[str, str]]:
+        items = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # Windows/SMB에서는 디렉터리 조회 결과에 종류가 포함되어 추가 stat 호출이 없음
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir or entry.name.lower().endswith(self.extensions):
+                    items.append({"name": entry.name, "path": entry.path, "type": "folder" if is_dir else "file"})
+        # 폴더 먼저, 그 다음 파일 (이름순 정렬)
+        items.sort(key=lambda x: (x["type"] != "folder", x["name"].lower()))
+        return items
+
+    def list(self, path: str) -> List[Dict[str, str]]:
+        """
+        폴더의 하위 폴더/파일 목록 (정렬됨)
+        PermissionError / FileNotFoundError는 그대로 전달
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and now - cached[0] < self.ttl:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return cached[2]
+
+        mtime = os.stat(path).st_mtime
+        if cached is not None and cached[1] == mtime:
+            with self._lock:
+                self._entries[path] = (now, mtime, cached[2])
+                self._entries.move_to_end(path)
+                self.hits += 1
+            return cached[2]
+
+        items = self._scan(path)
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = (now, mtime, items)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_dirs:
+                self._entries.popitem(last=False)
+        return items
+
+    def page(self, path: str, offset: int = 0, limit: int = 200, prefix: Optional[str] = None) -> Dict[str, Any]:
+        """목록의 한 페이지 (prefix: 이름 시작 문자열, 대소문자 무시)"""
+        items = self.list(path)
+        if prefix:
+            lowered = prefix.lower()
+            items = [item for item in items if item["name"].lower().startswith(lowered)]
+        page = items[offset:offset + limit]
+        next_offset = offset + limit if offset + limit < len(items) else None
+        return {"items": page, "total": len(items), "offset": offset, "limit": limit, "next_offset": next_offset}
+
+    def search_files(
+        self,
+        root: str,
+        query: Optional[str] = None,
+        max_results: int = 500,
+        max_depth: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        하위 폴더까지 파일 검색 (폴더 목록은 캐시를 통해 조회)
+
+        Args:
+            root: 검색 시작 폴더
+            query: 파일명에 포함될 문자열 (대소문자 무시, None이면 전체)
+            max_results: 최대 결과 수
+            max_depth: 최대 깊이 (None이면 제한 없음)
+
+        Returns:
+            {"items": [...], "truncated": bool, "scanned_dirs": int}
+        """
+        lowered = query.lower() if query else None
+        results: List[Dict[str, str]] = []
+        stack = [(root, 0)]
+        scanned = 0
+        while stack:
+            directory, depth = stack.pop()
+            try:
+                items = self.list(directory)
+            except OSError:
+                continue  # 권한 없는 폴더 등은 건너뜀
+            scanned += 1
+            subdirs = []
+            for item in items:
+                if item["type"] == "folder":
+                    if max_depth is None or depth < max_depth:
+                        subdirs.append((item["path"], depth + 1))
+                elif lowered is None or lowered in item["name"].lower():
+                    results.append(item)
+                    if len(results) >= max_results:
+                        return {"items": results, "truncated": True, "scanned_dirs": scanned}
+            stack.extend(reversed(subdirs))  # 이름순으로 탐색
+        return {"items": results, "truncated": False, "scanned_dirs": scanned}
+
+    def invalidate(self, path: Optional[str] = None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "dirs": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# --- 벤치마크 ---
+
+def generate_tree(root: str, n_entries: int = 100_000, files_per_dir: int = 1000, flat_ratio: float = 0.2) -> str:
+    """
+    벤치마크용 폴더 트리 생성
+    - flat/ : 전체의 flat_ratio 만큼 항목이 한 폴더에 있음 (큰 공유 폴더)
+    - tree/dNNNN/ : 나머지를 files_per_dir 개씩 나눠 담음 (10개 중 1개는 엑셀 파일)
+    """
+    flat = os.path.join(root, "flat")
+    os.makedirs(flat, exist_ok=True)
+    n_flat = int(n_entries * flat_ratio)
+    for i in range(n_flat):
+        name = f"report_{i:06d}.xlsx" if i % 10 == 0 else f"doc_{i:06d}.pdf"
+        open(os.path.join(flat, name), "wb").close()
+    remaining = n_entries - n_flat
+    for d in range((remaining + files_per_dir - 1) // files_per_dir):
+        sub = os.path.join(root, "tree", f"d{d:04d}")
+        os.makedirs(sub, exist_ok=True)
+        for i in range(min(files_per_dir, remaining - d * files_per_dir)):
+            name = f"book_{d}_{i:04d}.xlsx" if i % 10 == 0 else f"scan_{d}_{i:04d}.jpg"
+            open(os.path.join(sub, name), "wb").close()
+    return root
+
+
+def _legacy_list(path: str) -> List[Dict[str, str]]:
+    """기존 browse_folder 방식: listdir + 항목마다 isdir"""
+    items = []
+    for name in os.listdir(path):
+        full_path = os.path.join(path, name)
+        is_dir = os.path.isdir(full_path)
+        if is_dir or name.lower().endswith(EXCEL_EXTENSIONS):
+            items.append({"name": name, "path": full_path, "type": "folder" if is_dir else "file"})
+    items.sort(key=lambda x: (x["type"] != "folder", x["name"].lower()))
+    return items
+
+
+def benchmark_listing(root: str, repeats: int = 5) -> Dict[str, float]:
+    """기존 방식 / scandir 첫 조회 / 캐시 조회 / 재귀 엑셀 검색 지연 시간(ms)"""
+    flat = os.path.join(root, "flat")
+
+    def timed(fn) -> float:
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) * 1000
+
+    legacy = min(timed(lambda: _legacy_list(flat)) for _ in range(repeats))
+    cold = min(timed(lambda: DirectoryListingCache().page(flat)) for _ in range(repeats))
+    cache = DirectoryListingCache(ttl=0)  # TTL 0: 매번 수정 시각만 확인
+    cache.list(flat)
+    validated = min(timed(lambda: cache.page(flat, offset=1000)) for _ in range(repeats))
+    cache.ttl = 10.0
+    cached = min(timed(lambda: cache.page(flat, offset=1000)) for _ in range(repeats))
+    prefixed = min(timed(lambda: cache.page(flat, prefix="report_0001")) for _ in range(repeats))
+    search = DirectoryListingCache(max_dirs=1024)
+    search_cold = timed(lambda: search.search_files(root, max_results=1_000_000))
+    search_warm = timed(lambda: search.search_files(root, max_results=1_000_000))
+
+    return {
+        "legacy_listdir_isdir_ms": round(legacy, 2),
+        "scandir_cold_page_ms": round(cold, 2),
+        "cached_page_mtime_check_ms": round(validated, 3),
+        "cached_page_within_ttl_ms": round(cached, 3),
+        "cached_prefix_filter_ms": round(prefixed, 3),
+        "recursive_search_cold_ms": round(search_cold, 2),
+        "recursive_search_cached_ms": round(search_warm, 2),
+        "excel_files_found": len(search.search_files(root, max_results=1_000_000)["items"]),
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import tempfile
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_tree(tmp, n)
+        print(json.dumps(benchmark_listing(tmp), indent=2))
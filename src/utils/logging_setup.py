@@ -0,0 +1,236 @@
+"""
+로그 설정
+- 모든 모듈은 logging.getLogger(__name__) 사용, 메시지는 %-형식 인자로 전달 (꺼진 레벨은 문자열을 만들지 않음)
+- 루트 로거에는 QueueHandler만 연결: 호출 스레드는 큐에 넣기만 하고, 콘솔/파일 쓰기는 QueueListener 스레드 1개가 담당
+  (여러 작업자 스레드의 출력이 섞이거나 콘솔 쓰기에서 멈추지 않음)
+- 출력: 콘솔(사람이 읽는 형식), LOG_DIR/app.jsonl (JSON, 크기 기준 회전), LOG_DIR/jobs/<job_id>.jsonl (작업별)
+- job_context(job_id) 안에서 남긴 로그(하위 스레드 포함, tracing.run_in_context 사용 시)는 작업별 파일에도 기록되어
+  API로 조회 가능 (read_job_log)
+
+환경 변수: LOG_LEVEL (기본 INFO), LOG_DIR (기본 logs), LOG_CONSOLE=0 이면 콘솔 출력 안 함
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator
+
+LOG_DIR = os.environ.get("LOG_DIR", "logs")
+LOG_FILE = "app.jsonl"
+JOB_DIR = "jobs"
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+MAX_JOB_FILES = 200
+
+_job_id: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("log_job_id", default=None)
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+# LogRecord 기본 속성 (이 외의 속성은 extra로 넘긴 값이므로 JSON에 포함)
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """호출 스레드에서 작업/trace ID를 붙이고 메시지를 확정한 뒤 큐에 넣음"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        from src.utils.tracing import current_trace_id
+
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.job_id = _job_id.get()
+        record.trace_id = current_trace_id()
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class JobLogHandler(logging.Handler):
+    """job_id가 있는 로그를 LOG_DIR/jobs/<job_id>.jsonl 에 추가 (QueueListener 스레드에서만 호출됨)"""
+
+    def __init__(self, directory: str, max_open: int = 16):
+        super().__init__()
+        self.directory = directory
+        self.max_open = max_open
+        self._files: "OrderedDict[str, Any]" = OrderedDict()
+        self.setFormatter(JsonFormatter())
+
+    def _file(self, job_id: str):
+        handle = self._files.get(job_id)
+        if handle is not None:
+            self._files.move_to_end(job_id)
+            return handle
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{job_id}.jsonl")
+        if not os.path.exists(path):
+            self._prune()
+        handle = self._files[job_id] = open(path, "a", encoding="utf-8")
+        while len(self._files) > self.max_open:
+            self._files.popitem(last=False)[1].close()
+        return handle
+
+    def _prune(self):
+        """오래된 작업 로그 파일 삭제 (MAX_JOB_FILES 개 유지)"""
+        try:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:max(0, len(paths) - MAX_JOB_FILES + 1)]:
+                os.remove(path)
+        except OSError:
+            pass
+
+    def emit(self, record: logging.LogRecord):
+        job_id = getattr(record, "job_id", None)
+        if not job_id:
+            return
+        try:
+            handle = self._file(job_id)
+            handle.write(self.format(record) + "\n")
+            handle.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        for handle in self._files.values():
+            handle.close()
+        self._files.clear()
+        super().close()
+
+
+def setup_logging(level: Optional[str] = None, log_dir: Optional[str] = None, console: Optional[bool] = None):
+    """루트 로거 설정 (여러 번 호출해도 한 번만 적용)"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+        log_dir = log_dir or LOG_DIR
+        if console is None:
+            console = os.environ.get("LOG_CONSOLE", "1") != "0"
+
+        handlers: List[logging.Handler] = []
+        if console:
+            # 콘솔 인코딩으로 표현할 수 없는 문자는 이스케이프 (sys.stdout을 바꾸지 않음)
+            if hasattr(sys.stderr, "reconfigure"):
+                sys.stderr.reconfigure(errors="backslashreplace")
+            stream_handler = logging.StreamHandler(sys.stderr)
+            stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S"))
+            handlers.append(stream_handler)
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, LOG_FILE), maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"
+            )
+            file_handler.setFormatter(JsonFormatter())
+            handlers += [file_handler, JobLogHandler(os.path.join(log_dir, JOB_DIR))]
+        except OSError as e:
+            sys.stderr.write(f"로그 파일을 열 수 없습니다 ({log_dir}): {e}\n")
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        root = logging.getLogger()
+        root.setLevel(level)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_ContextQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 쓰고 리스너 종료"""
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def job_context(job_id: str) -> Iterator[str]:
+    """이 블록 안에서 남긴 로그를 작업 job_id의 로그에도 기록"""
+    token = _job_id.set(job_id)
+    try:
+        yield job_id
+    finally:
+        _job_id.reset(token)
+
+
+def read_job_log(
+    job_id: str,
+    after: int = 0,
+    limit: int = 500,
+    min_level: Optional[str] = None,
+    log_dir: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    작업 로그 조회 (줄 번호 기준 이어 읽기)
+
+    Args:
+        job_id: 작업 ID
+        after: 이전 응답의 next 값 (이 줄부터 읽음)
+        limit: 최대 항목 수
+        min_level: 이 레벨 이상만 (예: "WARNING")
+
+    Returns:
+        {"job_id", "entries", "next"} - 작업 로그가 없으면 None
+    """
+    if not job_id.isalnum():
+        return None
+    path = os.path.join(log_dir or LOG_DIR, JOB_DIR, f"{job_id}.jsonl")
+    if not os.path.exists(path):
+        return None
+    threshold = logging.getLevelName(min_level.upper()) if min_level else 0
+    if not isinstance(threshold, int):
+        threshold = 0
+    entries = []
+    position = after
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f):
+            if number < after:
+                continue
+            if len(entries) >= limit or not line.endswith("\n"):
+                break  # 마지막 줄이 아직 쓰이는 중이면 다음 조회에서 읽음
+            position = number + 1
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if logging.getLevelName(entry.get("level", "INFO")) >= threshold:
+                entries.append(entry)
+    return {"job_id": job_id, "entries": entries, "next": position}
@@ -0,0 +1,280 @@
+"""
+In-process metrics (Prometheus text exposition format)
+
+Counter / Gauge / Histogram with labels. Each labelled series keeps its own small lock,
+so recording from worker threads costs one dict lookup, a bisect and a locked add.
+Work done in worker processes (OCR recognition pool) is recorded in the parent
+process when its result comes back, so every metric lives in the server process.
+
+Usage:
+    REFRESH_SECONDS = histogram("excel_refresh_duration_seconds", "...", ["workbook", "outcome"])
+    REFRESH_SECONDS.labels(workbook="a.xlsx", outcome="success").observe(12.3)
+    with SQLITE_SECONDS.labels(operation="search").time():
+        ...
+    render()  # text for GET /metrics
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import List, Dict, Optional, Callable, Tuple, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Timer:
+    def __init__(self, series):
+        self._series = series
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._series.observe(time.perf_counter() - self._start)
+
+
+class _CounterSeries:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeSeries(_CounterSeries):
+    __slots__ = ("function",)
+
+    def __init__(self):
+        super().__init__()
+        self.function: Optional[Callable[[], float]] = None
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Value is computed when metrics are rendered (queue depth, cache hit ratio, ...)"""
+        self.function = function
+
+    def current(self) -> Optional[float]:
+        if self.function is None:
+            return self.value
+        try:
+            value = self.function()
+        except Exception:
+            return None
+        return None if value is None else float(value)
+
+
+class _HistogramSeries:
+    __slots__ = ("_lock", "_bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in sorted(self._series.items()):
+            lines.extend(self._render_series(key, series))
+        return lines
+
+    def _render_series(self, key, series) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def _render_series(self, key, series):
+        return [f"{self.name}{_label_text(self.labelnames, key)} {_format_value(series.value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default.set_function(function)
+
+    def _render_series(self, key, series):
+        value = series.current()
+        if value is None:
+            return []
+        return [f"{self.name}{_label_text(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def _render_series(self, key, series):
+        with series._lock:
+            counts, total, count = list(series.counts), series.sum, series.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            labels = _label_text(self.labelnames, key, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _label_text(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# --- Registry ---
+
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric_class, name: str, *args, **kwargs):
+    """Returns the existing metric with this name, so modules can declare metrics at import time."""
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = metric_class(name, *args, **kwargs)
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _register(Counter, name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return _register(Gauge, name, documentation, labelnames)
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text format (version 0.0.4)"""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# --- Metrics shared across modules ---
+
+REFRESH_SECONDS = histogram(
+    "excel_refresh_duration_seconds", "Workbook refresh duration", ["workbook", "outcome"],
+    buckets=(1, 5, 10, 20, 30, 60, 120, 300, 600, 1200)
+)
+REFRESH_TOTAL = counter("excel_refresh_total", "Workbook refresh attempts", ["outcome"])
+REFRESH_QUEUE_DEPTH = gauge("excel_refresh_queue_depth", "Workbooks waiting in the current refresh run")
+EXCEL_INSTANCES = gauge("excel_instances_alive", "Excel.Application instances currently open")
+SQLITE_SECONDS = histogram("sqlite_query_duration_seconds", "SQLite query latency", ["operation"])
+LLM_SECONDS = histogram("llm_request_duration_seconds", "LLM request latency", ["endpoint", "outcome"])
+LLM_TOKENS_PER_SECOND = histogram(
+    "llm_tokens_per_second", "LLM generation throughput (completion tokens / s)", ["endpoint"],
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 200)
+)
+LLM_TOKENS = counter("llm_completion_tokens_total", "LLM completion tokens", ["endpoint"])
+OCR_IMAGES = counter("ocr_images_total", "Images processed by OCR", ["status"])
+OCR_IMAGES_PER_SECOND = gauge("ocr_images_per_second", "OCR throughput of the last batch")
+WATCH_QUEUE_DEPTH = gauge("folder_watch_queue_depth", "Files waiting in the folder watcher", ["queue"])
+CACHE_HIT_RATIO = gauge("cache_hit_ratio", "Cache hit ratio since start", ["cache"])
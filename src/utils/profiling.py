@@ -0,0 +1,337 @@
+"""
+요청/작업 단위 프로파일링 (필요할 때만 켬)
+- API 요청: 헤더 X-Profile: cpu | memory | all  또는  ?_profile=cpu  (ProfilingMiddleware)
+  응답 헤더 X-Profile-Id 로 결과 ID 반환
+- 새로고침 / OCR 작업: profile 옵션 (결과 ID = 작업 ID)
+  (POST /run-refresh?profile=cpu, OCR 작업 요청 본문의 "profile")
+- cpu: cProfile (pyinstrument가 설치되어 있으면 호출 트리 HTML도 저장)
+  memory: tracemalloc 시작/종료 스냅샷 차이 (작업 중 늘어난 메모리 위치)
+- 결과: PROFILE_DIR/<id>/ (cpu.prof, cpu.txt, cpu.html, memory.txt, memory.snapshot, meta.json)
+  관리자 API로 목록 조회 / 다운로드 (ADMIN_TOKEN 환경 변수가 있으면 X-Admin-Token 헤더 필요,
+  없으면 같은 PC(127.0.0.1 / ::1)에서 온 요청만 허용)
+
+프로파일링을 요청하지 않으면 미들웨어는 헤더/쿼리 확인만 하고 그대로 통과하며,
+작업 코드는 profile(None) / profile_thread()에서 contextvar 조회 1번만 함
+작업자 스레드는 tracing.run_in_context로 시작되므로 같은 세션에 스레드별 cProfile이 추가됨
+(OCR 인식 프로세스 내부는 측정되지 않음)
+"""
+import contextvars
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import shutil
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator
+
+try:
+    from pyinstrument import Profiler as _WallProfiler
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+KINDS = ("cpu", "memory", "all")
+MAX_PROFILES = 100
+TOP_N = 60
+
+_session: "contextvars.ContextVar[Optional[ProfileSession]]" = contextvars.ContextVar("profile_session", default=None)
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class ProfileSession:
+    """작업 1개에 대한 프로파일 수집 (스레드별 cProfile + tracemalloc 스냅샷)"""
+
+    def __init__(self, kind: str, label: str, profile_id: Optional[str] = None):
+        if kind not in KINDS:
+            raise ValueError(f"profile은 {', '.join(KINDS)} 중 하나여야 합니다: {kind}")
+        self.kind = kind
+        self.label = label
+        self.profile_id = profile_id or uuid.uuid4().hex[:12]
+        self.cpu = kind in ("cpu", "all")
+        self.memory = kind in ("memory", "all")
+        self._profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._wall = None
+        self._snapshot = None
+        self._tracing = False
+        self.started = time.time()
+        self.notes: List[str] = []
+
+    # --- CPU ---
+
+    def _enable_cpu(self) -> Optional[cProfile.Profile]:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # 이 스레드에서 이미 다른 프로파일러가 동작 중
+            self.notes.append(f"{threading.current_thread().name}: 다른 프로파일러가 실행 중이라 CPU 측정 생략")
+            return None
+        with self._lock:
+            self._profilers.append(profiler)
+        return profiler
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """현재 스레드의 실행을 이 세션의 CPU 프로파일에 포함"""
+        profiler = self._enable_cpu() if self.cpu else None
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+    # --- 시작/종료 ---
+
+    def start(self):
+        if self.memory:
+            _start_tracemalloc()
+            self._tracing = True
+            self._snapshot = tracemalloc.take_snapshot()
+        if self.cpu and PYINSTRUMENT_AVAILABLE:
+            try:
+                self._wall = _WallProfiler(async_mode="enabled")
+                self._wall.start()
+            except Exception as e:
+                self._wall = None
+                self.notes.append(f"pyinstrument 시작 실패: {e}")
+
+    def finish(self, directory: Optional[str] = None) -> str:
+        """측정 종료 후 결과 파일 저장, 결과 폴더 경로 반환"""
+        elapsed = time.time() - self.started
+        # 결과 저장이 실패해도 tracemalloc은 반드시 멈춤 (켜 둔 채로 남으면 모든 할당이 느려짐)
+        end = None
+        try:
+            if self._snapshot is not None:
+                end = tracemalloc.take_snapshot()
+        finally:
+            if self._tracing:
+                self._tracing = False
+                _stop_tracemalloc()
+
+        output = os.path.join(directory or PROFILE_DIR, self.profile_id)
+        os.makedirs(output, exist_ok=True)
+        files = []
+
+        if self._wall is not None:
+            try:
+                self._wall.stop()
+                with open(os.path.join(output, "cpu.html"), "w", encoding="utf-8") as f:
+                    f.write(self._wall.output_html())
+                files.append("cpu.html")
+            except Exception as e:
+                self.notes.append(f"pyinstrument 저장 실패: {e}")
+
+        with self._lock:
+            profilers = list(self._profilers)
+        if profilers:
+            stats = pstats.Stats(profilers[0])
+            for profiler in profilers[1:]:
+                stats.add(profiler)
+            stats.dump_stats(os.path.join(output, "cpu.prof"))
+            text = io.StringIO()
+            stats.stream = text
+            stats.sort_stats("cumulative").print_stats(TOP_N)
+            with open(os.path.join(output, "cpu.txt"), "w", encoding="utf-8") as f:
+                f.write(text.getvalue())
+            files += ["cpu.prof", "cpu.txt"]
+
+        if end is not None:
+            end.dump(os.path.join(output, "memory.snapshot"))
+            lines = [f"{stat}" for stat in end.compare_to(self._snapshot, "lineno")[:TOP_N]]
+            with open(os.path.join(output, "memory.txt"), "w", encoding="utf-8") as f:
+                f.write("# 작업 중 늘어난 메모리 (위치별, 시작 스냅샷 대비)\n" + "\n".join(lines) + "\n")
+            files += ["memory.snapshot", "memory.txt"]
+
+        meta = {
+            "id": self.profile_id,
+            "kind": self.kind,
+            "label": self.label,
+            "created_at": self.started,
+            "duration_sec": round(elapsed, 3),
+            "threads": len(profilers),
+            "files": files,
+            "notes": self.notes,
+        }
+        with open(os.path.join(output, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        _prune(directory or PROFILE_DIR)
+        logger.info("프로파일 저장: %s (%s, %.2fs)", self.profile_id, self.label, elapsed)
+        return output
+
+
+@contextmanager
+def profile(kind: Optional[str], label: str, profile_id: Optional[str] = None) -> Iterator[Optional[ProfileSession]]:
+    """kind가 None이면 아무것도 하지 않음. 있으면 블록(과 run_in_context로 시작한 하위 스레드)을 측정"""
+    if not kind:
+        yield None
+        return
+    session = ProfileSession(kind, label, profile_id)
+    session.start()
+    token = _session.set(session)
+    try:
+        with session.thread():
+            yield session
+    finally:
+        _session.reset(token)
+        try:
+            session.finish()
+        except Exception:
+            logger.exception("프로파일 저장 실패: %s", session.profile_id)
+
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """작업자 스레드 본문을 감쌈: 현재 context에 프로파일 세션이 있으면 이 스레드도 측정"""
+    session = _session.get()
+    if session is None:
+        yield
+        return
+    with session.thread():
+        yield
+
+
+# --- 조회 ---
+
+def _prune(directory: str):
+    try:
+        entries = sorted((e for e in os.scandir(directory) if e.is_dir()), key=lambda e: e.stat().st_mtime)
+    except OSError:
+        return
+    for entry in entries[:max(0, len(entries) - MAX_PROFILES)]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def list_profiles(directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """저장된 프로파일 목록 (최신순)"""
+    directory = directory or PROFILE_DIR
+    profiles = []
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return []
+    for entry in entries:
+        meta = get_profile(entry.name, directory)
+        if meta is not None:
+            profiles.append(meta)
+    profiles.sort(key=lambda m: m["created_at"], reverse=True)
+    return profiles
+
+
+def get_profile(profile_id: str, directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    if not _ID_RE.match(profile_id):
+        return None
+    path = os.path.join(directory or PROFILE_DIR, profile_id, "meta.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def profile_file(profile_id: str, name: str, directory: Optional[str] = None) -> Optional[str]:
+    """다운로드할 결과 파일 경로 (meta.json에 기록된 파일만 허용)"""
+    meta = get_profile(profile_id, directory)
+    if meta is None or name not in meta["files"] + ["meta.json"]:
+        return None
+    return os.path.join(directory or PROFILE_DIR, profile_id, name)
+
+
+def delete_profile(profile_id: str, directory: Optional[str] = None) -> bool:
+    if get_profile(profile_id, directory) is None:
+        return False
+    shutil.rmtree(os.path.join(directory or PROFILE_DIR, profile_id), ignore_errors=True)
+    return True
+
+
+_LOOPBACK_HOSTS = frozenset({"127.0.0.1", "::1", "localhost"})
+
+
+def check_admin_token(token: Optional[str], client_host: Optional[str] = None) -> bool:
+    """ADMIN_TOKEN이 있으면 토큰 비교(hmac.compare_digest), 없으면 loopback 클라이언트만 허용"""
+    if ADMIN_TOKEN is None:
+        return client_host in _LOOPBACK_HOSTS
+    if token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+# --- API 미들웨어 ---
+
+def _requested_kind(scope) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == b"x-profile":
+            return value.decode("latin-1").strip().lower() or None
+    query = scope.get("query_string", b"")
+    if b"_profile=" in query:
+        for part in query.decode("latin-1").split("&"):
+            if part.startswith("_profile="):
+                return part[len("_profile="):].lower() or None
+    return None
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI 미들웨어: 프로파일을 요청한 HTTP 요청만 측정
+    이벤트 루프 스레드에서 cProfile을 켜므로, 같은 시간에 처리된 다른 요청도 결과에 섞일 수 있음
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        kind = _requested_kind(scope)
+        if kind is None or kind not in KINDS or scope["path"].startswith("/admin/profiles"):
+            return await self.app(scope, receive, send)
+        client = scope.get("client")
+        if not check_admin_token(_header(scope, b"x-admin-token"), client[0] if client else None):
+            return await self.app(scope, receive, send)  # 권한이 없으면 프로파일 없이 처리
+
+        label = f"{scope['method']} {scope['path']}"
+        with profile(kind, label) as session:
+            async def send_with_id(message):
+                if message["type"] == "http.response.start":
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-id", session.profile_id.encode("latin-1"))
+                    ]
+                await send(message)
+            await self.app(scope, receive, send_with_id)
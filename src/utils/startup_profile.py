@@ -0,0 +1,66 @@
+"""
+서버 시작 시간 / 메모리(RSS) 측정
+OCR 모델을 로드하지 않은 경우와 로드한 경우를 각각 새 프로세스에서 측정
+
+사용법: python -m src.utils.startup_profile
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# 자식 프로세스에서 실행할 코드: main 앱 생성 시간과 최대 RSS 출력
+_PROBE = r"""
+import json, os, sys, time
+start = time.perf_counter()
+import main
+main.app  # main.py는 앱을 처음 접근할 때 만듦
+app_ready = time.perf_counter() - start
+ocr_ready = None
+if sys.argv[1] == "ocr":
+    from src.chatbot.chatbot_routes import ocr_engine
+    ocr_engine.warm_up(background=False)
+    ocr_ready = time.perf_counter() - start
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+        except (ImportError, AttributeError):
+            return None
+
+print("__RESULT__" + json.dumps({
+    "app_ready_sec": round(app_ready, 3),
+    "ocr_ready_sec": round(ocr_ready, 3) if ocr_ready is not None else None,
+    "peak_rss_mb": peak_rss_mb(),
+}))
+"""
+
+
+def measure(mode: str) -> dict:
+    """mode: 'no-ocr' 또는 'ocr'"""
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, mode],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8"
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("__RESULT__"):
+            return json.loads(line[len("__RESULT__"):])
+    raise RuntimeError(f"측정 실패 ({mode}):\n{proc.stderr[-2000:]}")
+
+
+def main():
+    report = {mode: measure(mode) for mode in ("no-ocr", "ocr")}
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
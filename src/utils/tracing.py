@@ -0,0 +1,365 @@
+"""
+구간 추적 (tracing)
+새로고침 작업 1회 / 챗봇 요청 1회마다 trace ID를 만들고, 그 안의 단계(워크북 열기, RefreshAll, 대기,
+저장, 매크로 / 검색, 프롬프트 생성, LLM 생성, SQL 실행)를 span으로 기록
+
+    with start_trace("refresh_run", workers=2) as root:
+        with span("open", file=path):
+            ...
+    root.trace_id  # 응답에 포함해 나중에 조회
+
+- span은 contextvars로 현재 부모를 찾음. 새 스레드는 context를 물려받지 않으므로 run_in_context()로 감쌈
+- span()은 진행 중인 trace 안에서만 기록 (start_trace 밖에서는 빈 객체만 반환)
+- 최상위 span이 끝나면 trace 전체를 TRACE_DIR/traces.jsonl 에 span 1개당 1줄로 추가
+  (MAX_BYTES를 넘으면 traces.jsonl.1 ~ .BACKUP_COUNT 로 회전 - logging_setup의 app.jsonl과 같은 방식)
+- 조회는 파일별 최상위 span 목록과 trace 위치를 기억해 두고, 그 뒤에 추가된 부분만 새로 읽음
+- TRACING=0 이면 기록하지 않음 (span은 빈 객체만 반환)
+
+CLI:
+    python -m src.utils.tracing list [개수]           최근 trace 목록
+    python -m src.utils.tracing show <trace_id>       단계별 소요 시간 (flame 형태)
+    python -m src.utils.tracing otlp <trace_id> [파일] OTLP JSON으로 내보내기
+"""
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Callable, Iterator
+
+TRACE_DIR = os.environ.get("TRACE_DIR", "traces")
+TRACE_FILE = "traces.jsonl"
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 3
+ENABLED = os.environ.get("TRACING", "1") != "0"
+SERVICE_NAME = "excel-refresh"
+
+logger = logging.getLogger(__name__)
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+_index_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns",
+                 "attributes", "status", "error", "_collector")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any],
+                 collector: List["Span"]):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._collector = collector  # 같은 trace의 span 목록 (최상위 span이 끝날 때 기록)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def _trace_path(directory: Optional[str] = None) -> str:
+    return os.path.join(directory or TRACE_DIR, TRACE_FILE)
+
+
+def _trace_files(directory: Optional[str] = None) -> List[str]:
+    """오래된 파일부터: traces.jsonl.N, ..., traces.jsonl.1, traces.jsonl"""
+    path = _trace_path(directory)
+    return [f"{path}.{i}" for i in range(BACKUP_COUNT, 0, -1)] + [path]
+
+
+def _rotate(path: str):
+    for i in range(BACKUP_COUNT - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    if BACKUP_COUNT > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+def _flush(spans: List[Span]):
+    # trace 1개 = 연속된 줄 묶음 1개 (최상위 span이 마지막 줄) - 회전해도 trace가 나뉘지 않음
+    data = "".join(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n" for s in spans).encode("utf-8")
+    try:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = _trace_path()
+        with _write_lock:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+            if size and size + len(data) > MAX_BYTES:
+                try:
+                    _rotate(path)
+                except OSError as e:  # Windows에서 다른 곳이 파일을 열고 있으면 다음 기록 때 다시 시도
+                    logger.debug("trace 파일 회전 실패: %s", e)
+            with open(path, "ab") as f:
+                f.write(data)
+    except OSError as e:
+        logger.warning("trace 기록 실패: %s", e)
+
+
+@contextmanager
+def _run_span(name: str, trace_id: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Iterator[Span]:
+    collector = parent._collector if parent is not None else []
+    current = Span(name, trace_id, parent.span_id if parent else None, attributes, collector)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current.reset(token)
+        collector.append(current)
+        if parent is None:
+            _flush(collector)
+
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None, **attributes) -> Iterator[Any]:
+    """새 trace의 최상위 span (새로고침 작업 / 챗봇 요청 단위)"""
+    if not ENABLED:
+        yield _NOOP
+        return
+    with _run_span(name, trace_id or secrets.token_hex(16), None, attributes) as root:
+        yield root
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """현재 span의 하위 단계 (진행 중인 trace가 없으면 기록하지 않음)"""
+    parent = _current.get() if ENABLED else None
+    if parent is None:
+        yield _NOOP
+        return
+    with _run_span(name, parent.trace_id, parent, attributes) as current:
+        yield current
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+def run_in_context(fn: Callable) -> Callable:
+    """현재 context(부모 span 포함)에서 fn을 실행하는 함수 - threading.Thread target 용"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+# --- 조회 / 내보내기 ---
+
+class _TraceIndex:
+    """trace 파일 1개에서 지금까지 읽은 위치와 최상위 span 목록 ((root, 묶음 시작, 묶음 끝) 바이트 위치)"""
+    __slots__ = ("head", "offset", "block_start", "roots")
+
+    def __init__(self, head: bytes):
+        self.head = head
+        self.offset = 0
+        self.block_start = 0
+        self.roots: List[tuple] = []
+
+
+# {디렉터리: {(st_dev, st_ino): _TraceIndex}} - 파일 이름이 아니라 파일 자체 기준이라 회전(이름 변경)해도 다시 읽지 않음
+_indexes: Dict[str, Dict[tuple, _TraceIndex]] = {}
+
+
+def _scan(f, index: _TraceIndex):
+    f.seek(index.offset)
+    for line in f:
+        if not line.endswith(b"\n"):
+            break  # 다른 프로세스가 쓰는 중인 줄
+        index.offset += len(line)
+        if b'"parent_id": null' not in line:
+            continue  # JSON 파싱 전에 빠르게 거름
+        try:
+            record = json.loads(line)
+        except ValueError:
+            index.block_start = index.offset
+            continue
+        if record.get("parent_id") is None:
+            index.roots.append((record, index.block_start, index.offset))
+            index.block_start = index.offset
+
+
+def _indexed_files(directory: Optional[str], trace_id: Optional[str] = None) -> Iterator[tuple]:
+    """(열린 파일, [(root, 시작, 끝)]) - trace_id가 있으면 앞부분이 일치하는 trace만"""
+    key = os.path.abspath(directory or TRACE_DIR)
+    seen: Dict[tuple, _TraceIndex] = {}
+    for path in _trace_files(directory):
+        try:
+            f = open(path, "rb")
+        except OSError:
+            continue
+        with f:
+            st = os.fstat(f.fileno())
+            head = f.read(64)
+            with _index_lock:
+                index = _indexes.get(key, {}).get((st.st_dev, st.st_ino))
+                if index is None or index.head != head[:len(index.head)] or st.st_size < index.offset:
+                    index = _TraceIndex(head)  # 처음 보는 파일, 또는 같은 inode를 새 파일이 다시 쓰는 경우
+                elif len(index.head) < len(head):
+                    index.head = head
+                _scan(f, index)
+                seen[(st.st_dev, st.st_ino)] = index
+                roots = [r for r in index.roots if trace_id is None or r[0]["trace_id"].startswith(trace_id)]
+            yield f, roots
+    with _index_lock:
+        _indexes[key] = seen
+
+
+def load_spans(trace_id: Optional[str] = None, directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """traces.jsonl(회전된 파일 포함)에서 span 읽기 (trace_id 앞부분만 줘도 됨) - 해당 trace의 줄만 읽음"""
+    spans = []
+    for f, roots in _indexed_files(directory, trace_id):
+        for _, start, end in roots:
+            f.seek(start)
+            for line in f.read(end - start).splitlines():
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    return spans
+
+
+def list_traces(limit: int = 20, directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """최근 trace 목록 (최상위 span 기준, 최신순)"""
+    roots = [root for _, items in _indexed_files(directory) for root, _, _ in items]
+    roots.sort(key=lambda s: s["start_ns"], reverse=True)
+    return [
+        {"trace_id": s["trace_id"], "name": s["name"], "duration_ms": s["duration_ms"], "status": s["status"],
+         "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(s["start_ns"] / 1e9))}
+        for s in roots[:limit]
+    ]
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """OTLP/JSON (ExportTraceServiceRequest) 형식 - collector의 otlpjsonfile 수신기 등으로 읽을 수 있음"""
+    otlp_spans = []
+    for s in spans:
+        item = {
+            "traceId": s["trace_id"],
+            "spanId": s["span_id"],
+            "name": s["name"],
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s["start_ns"]),
+            "endTimeUnixNano": str(s["end_ns"]),
+            "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in s["attributes"].items()],
+            "status": {"code": 2, "message": s["error"]} if s["status"] == "error" else {"code": 1},
+        }
+        if s["parent_id"]:
+            item["parentSpanId"] = s["parent_id"]
+        otlp_spans.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "src.utils.tracing"}, "spans": otlp_spans}],
+        }]
+    }
+
+
+def export_otlp(trace_id: str, output_path: str, directory: Optional[str] = None) -> int:
+    """trace 하나를 OTLP JSON 파일로 저장, 저장한 span 수 반환"""
+    spans = load_spans(trace_id, directory)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(to_otlp(spans), f, ensure_ascii=False)
+    return len(spans)
+
+
+def format_breakdown(spans: List[Dict[str, Any]], width: int = 40) -> str:
+    """
+    단계별 소요 시간을 트리 + 막대로 표시 (막대 위치/길이 = trace 안에서의 시작 시점/소요 시간)
+    같은 부모 아래 병렬 단계(작업자 여러 명)는 막대가 겹쳐 보임
+    """
+    if not spans:
+        return "trace를 찾을 수 없습니다."
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {s["span_id"] for s in spans}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+    for items in children.values():
+        items.sort(key=lambda s: s["start_ns"])
+
+    t0 = min(s["start_ns"] for s in spans)
+    total = max(s["end_ns"] for s in spans) - t0 or 1
+    lines = [f"trace {spans[0]['trace_id']}  total {total / 1e6:.1f} ms"]
+
+    def walk(s, depth):
+        offset = int((s["start_ns"] - t0) / total * width)
+        length = max(1, int((s["end_ns"] - s["start_ns"]) / total * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        label = ("  " * depth + s["name"])[:36]
+        mark = " !" if s["status"] == "error" else ""
+        detail = ", ".join(f"{k}={v}" for k, v in s["attributes"].items() if k in ("file", "table", "worker"))
+        lines.append(f"{label:<36} {bar:<{width}} {s['duration_ms']:>10.1f} ms {s['duration_ms'] * 1e6 / total:5.1%}"
+                     f"{mark}{'  ' + detail if detail else ''}")
+        for child in children.get(s["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    command = args[0] if args else "list"
+    if command == "list":
+        for t in list_traces(int(args[1]) if len(args) > 1 else 20):
+            print(f"{t['trace_id']}  {t['started']}  {t['name']:<20} {t['duration_ms']:>12.1f} ms  {t['status']}")
+    elif command == "show" and len(args) > 1:
+        print(format_breakdown(load_spans(args[1])))
+    elif command == "otlp" and len(args) > 1:
+        output = args[2] if len(args) > 2 else f"trace_{args[1]}.otlp.json"
+        print(f"{export_otlp(args[1], output)}개 span 저장: {output}")
+    else:
+        print(__doc__)
+        sys.exit(1)
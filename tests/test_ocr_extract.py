@@ -0,0 +1,30 @@
+from src.chatbot.ocr_extract import FieldExtractor
+
+
+def _box(text, row, col=0):
+    x, y = col * 120, row * 20
+    return {"text": text, "confidence": 0.9, "bbox": [[x, y], [x + 100, y], [x + 100, y + 18], [x, y + 18]]}
+
+
+def test_english_labels_need_word_boundaries():
+    extractor = FieldExtractor()
+    result = extractor.extract([_box("Hotel", 0), _box("02-123-4567", 0, 1),
+                                _box("update", 1), _box("2024.08.15", 1, 1)])
+    assert result["pairs"] == []
+
+    result = extractor.extract([_box("TEL:", 0), _box("02-123-4567", 0, 1)])
+    assert [(p["field"], p["value"]) for p in result["pairs"]] == [("phone", "02-123-4567")]
+
+
+def test_one_label_per_box_and_field():
+    extractor = FieldExtractor()
+    result = extractor.extract([_box("사업자등록번호", 0), _box("123-45-67890", 0, 1)])
+    assert len(result["pairs"]) == 1
+    assert result["fields"]["biz_num"] == "123-45-67890"
+
+
+def test_longest_label_wins_across_fields():
+    extractor = FieldExtractor()
+    extractor.register("deposit_date", r"\d{2}/\d{2}", ["입금일"])
+    result = extractor.extract([_box("입금일", 0), _box("08/15", 0, 1)])
+    assert [p["field"] for p in result["pairs"]] == ["deposit_date"]
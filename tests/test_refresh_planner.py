@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from src.excel.refresh_planner import (
+    MASTER_SETTLE_SEC, RefreshControl, compare_plan, estimate_durations, execute_plan, plan_refresh,
+)
+
+
+def _task(path, worker, depends_on=()):
+    return {"file_path": path, "worker": worker, "start_sec": 0.0, "end_sec": 0.0,
+            "estimate_sec": 1.0, "depends_on": list(depends_on)}
+
+
+def _entry(path, priority=0, timeout_sec=None):
+    return {"file_path": path, "priority": priority, "timeout_sec": timeout_sec}
+
+
+def _estimates(**seconds):
+    return {path: {"estimate_sec": sec, "source": "history", "size_mb": None} for path, sec in seconds.items()}
+
+
+def test_estimate_uses_history_then_size_then_default(tmp_path):
+    known = tmp_path / "known.xlsx"
+    known.write_bytes(b"x" * 1024 * 1024)
+    sized = tmp_path / "sized.xlsx"
+    sized.write_bytes(b"x" * 2 * 1024 * 1024)
+    missing = str(tmp_path / "missing.xlsx")
+    entries = [_entry(str(known)), _entry(str(sized), timeout_sec=4), _entry(missing)]
+
+    estimates = estimate_durations(entries, {str(known): {"avg_sec": 13.0}}, refresh_delay=10)
+
+    assert estimates[str(known)] == {"estimate_sec": 13.0, "source": "history", "size_mb": 1.0}
+    # 3 s/MB fitted on the file with history (13 s - 10 s wait over 1 MB)
+    assert estimates[str(sized)] == {"estimate_sec": 10.0, "source": "size", "size_mb": 2.0}
+    assert estimates[missing] == {"estimate_sec": 10.0, "source": "default", "size_mb": None}
+
+
+def test_plan_orders_by_priority_then_longest_first():
+    entries = [_entry("short"), _entry("long"), _entry("urgent", priority=1)]
+    plan = plan_refresh(entries, _estimates(short=1.0, long=5.0, urgent=2.0), workers=1, inter_file_delay=0)
+
+    assert [t["file_path"] for t in plan["tasks"]] == ["urgent", "long", "short"]
+    assert plan["predicted_makespan_sec"] == 8.0
+
+
+def test_plan_starts_dependents_after_their_dependencies_finish():
+    entries = [_entry("base"), _entry("report"), _entry("other")]
+    plan = plan_refresh(entries, _estimates(base=3.0, report=10.0, other=1.0), workers=2,
+                        dependencies={"report": ["base"]}, inter_file_delay=0)
+
+    tasks = {t["file_path"]: t for t in plan["tasks"]}
+    assert tasks["report"]["depends_on"] == ["base"]
+    assert tasks["report"]["start_sec"] >= tasks["base"]["end_sec"]
+    assert plan["predicted_makespan_sec"] == 13.0
+
+
+def test_plan_rejects_dependency_cycles():
+    entries = [_entry("a"), _entry("b"), _entry("c")]
+    with pytest.raises(ValueError, match="a, b"):
+        plan_refresh(entries, _estimates(a=1.0, b=1.0, c=1.0), dependencies={"a": ["b"], "b": ["a"]})
+
+
+def test_master_db_is_planned_last_after_settle_time():
+    entries = [_entry("a"), _entry("b")]
+    plan = plan_refresh(entries, _estimates(a=4.0, b=2.0), workers=2, inter_file_delay=0,
+                        final_file="master", final_estimate=5.0)
+
+    assert plan["final"]["start_sec"] == 4.0 + MASTER_SETTLE_SEC
+    assert all(t["end_sec"] <= plan["final"]["start_sec"] for t in plan["tasks"])
+    assert plan["predicted_makespan_sec"] == 4.0 + MASTER_SETTLE_SEC + 5.0
+
+    comparison = compare_plan(plan, {"a": {"ok": True, "actual_sec": 5.0}, "master": {"ok": False}},
+                              actual_makespan=plan["predicted_makespan_sec"])
+    files = {f["file_path"]: f for f in comparison["files"]}
+    assert [f["file_path"] for f in comparison["files"]][-1] == "master"
+    assert files["a"]["error_sec"] == 1.0
+    assert files["b"] == {"file_path": "b", "ok": False, "predicted_sec": 2.0, "actual_sec": None, "error_sec": None}
+    assert comparison["error_pct"] == 0.0
+
+
+def test_bumped_workbook_waits_until_dependencies_start():
+    """
+    Workers A:[P, E, X] and B:[Q, D<-E]; X<-D is bumped while P runs and D waits on E.
+    Releasing X because D is merely claimed would make A wait on D while D waits on E,
+    which is still queued behind X on A.
+    """
+    plan = {"workers": 2, "final": None, "predicted_makespan_sec": 0.0, "tasks": [
+        _task("P", 0), _task("E", 0), _task("X", 0, ["D"]),
+        _task("Q", 1), _task("D", 1, ["E"]),
+    ]}
+    durations = {"P": 0.5}
+    order = []
+
+    def run_task(path):
+        order.append(path)
+        time.sleep(durations.get(path, 0.02))
+        return True
+
+    control = RefreshControl()
+    results = {}
+    runner = threading.Thread(target=lambda: results.update(execute_plan(plan, run_task, 0, control)))
+    runner.start()
+
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and control.files.get("D", {}).get("state") != "waiting":
+        time.sleep(0.01)
+    assert control.files["P"]["state"] == "running"
+    assert control.bump("X")
+
+    runner.join(timeout=5)
+    if runner.is_alive():
+        control.cancel()
+        runner.join()
+        raise AssertionError("execute_plan deadlocked on a bumped workbook")
+    assert all(results[path]["ok"] for path in "PEXQD")
+    assert order.index("E") < order.index("D") < order.index("X")
+
+
+def test_bumped_workbook_runs_next_when_ready():
+    plan = {"workers": 1, "final": None, "predicted_makespan_sec": 0.0, "tasks": [
+        _task("A", 0), _task("B", 0), _task("C", 0),
+    ]}
+    order = []
+    control = RefreshControl()
+
+    def run_task(path):
+        if path == "A":
+            assert control.bump("C")
+        order.append(path)
+        return True
+
+    execute_plan(plan, run_task, 0, control)
+    assert order == ["A", "C", "B"]